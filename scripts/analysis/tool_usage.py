@@ -1,5 +1,5 @@
 """
-- [ ] log the tool usage into a seperate table? (w/ toocalling id)
+- [x] log the tool usage into a seperate table -> `tracing_toolcall_stat`, see `utu.tracing.ToolCallStatRunHook`
 - [x] analysis, on the axis of exp -> this script
 """
 
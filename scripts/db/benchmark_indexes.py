@@ -0,0 +1,119 @@
+"""
+Benchmark the query latency of evaluation / dataset / tracing tables before and after the index migration.
+
+Seeds a local database (SQLite by default, or any `--db_url`, e.g. postgres) with synthetic rows, drops the indexes
+added by `utu.db.migrations` to simulate an old schema, then times the hot queries before and after `migrate`.
+
+Usage:
+    python scripts/db/benchmark_indexes.py --num_exps 20 --samples_per_exp 2000
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlmodel import Session, SQLModel, delete, select
+
+from utu.db import DatasetSample, EvaluationSample, ToolTracingModel
+from utu.db.migrations import MIGRATIONS, SchemaVersionModel, migrate
+
+STAGES = ["init", "rollout", "judged"]
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db_url", type=str, default=None, help="Database URL, default to a temporary SQLite file.")
+    parser.add_argument("--num_exps", type=int, default=20, help="Number of exp_ids (and datasets) to seed.")
+    parser.add_argument("--samples_per_exp", type=int, default=2000, help="Number of samples per exp_id.")
+    parser.add_argument("--spans_per_trace", type=int, default=10, help="Number of tool spans per trace.")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of runs per query.")
+    args = parser.parse_args()
+    if args.db_url is None:
+        args.db_url = f"sqlite:///{tempfile.mkdtemp()}/benchmark_indexes.db"
+    return args
+
+
+def seed(engine, num_exps: int, samples_per_exp: int, spans_per_trace: int) -> None:
+    evaluation_rows, dataset_rows, tool_rows = [], [], []
+    for e in range(num_exps):
+        for i in range(samples_per_exp):
+            trace_id = f"trace_{e}_{i}"
+            evaluation_rows.append(
+                {
+                    "exp_id": f"exp_{e}",
+                    "dataset": f"dataset_{e}",
+                    "dataset_index": i,
+                    "stage": random.choice(STAGES),
+                    "raw_question": f"question {i}",
+                    "trace_id": trace_id,
+                    "trajectories": "x" * 200,
+                }
+            )
+            dataset_rows.append({"dataset": f"dataset_{e}", "index": i, "question": f"question {i}"})
+            for s in range(spans_per_trace):
+                tool_rows.append({"trace_id": trace_id, "span_id": f"span_{e}_{i}_{s}", "name": "search"})
+    with engine.begin() as conn:
+        conn.execute(EvaluationSample.__table__.insert(), evaluation_rows)
+        conn.execute(DatasetSample.__table__.insert(), dataset_rows)
+        conn.execute(ToolTracingModel.__table__.insert(), tool_rows)
+
+
+def drop_migrated_indexes(engine) -> None:
+    """Simulate the schema before the migrations."""
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.tables.values():
+            for index in table.indexes:
+                index.drop(conn, checkfirst=True)
+        conn.execute(delete(SchemaVersionModel))
+
+
+def bench(engine, args) -> dict[str, float]:
+    queries = {
+        "evaluation_data by (exp_id, stage) order by dataset_index": lambda e: (
+            select(EvaluationSample.id)
+            .where(EvaluationSample.exp_id == f"exp_{e}", EvaluationSample.stage == "rollout")
+            .order_by(EvaluationSample.dataset_index)
+        ),
+        "data by dataset": lambda e: select(DatasetSample.id).where(DatasetSample.dataset == f"dataset_{e}"),
+        "tracing_tool by trace_id": lambda e: select(ToolTracingModel.id).where(
+            ToolTracingModel.trace_id == f"trace_{e}_{random.randrange(args.samples_per_exp)}"
+        ),
+    }
+    results = {}
+    with Session(engine) as session:
+        for name, make_query in queries.items():
+            latencies = []
+            for _ in range(args.repeat):
+                stmt = make_query(random.randrange(args.num_exps))
+                start = time.perf_counter()
+                session.exec(stmt).all()
+                latencies.append((time.perf_counter() - start) * 1000)
+            results[name] = statistics.median(latencies)
+    return results
+
+
+def main():
+    args = get_args()
+    print(f"Using {args.db_url}")
+    engine = create_engine(args.db_url)
+    SQLModel.metadata.create_all(engine)
+    drop_migrated_indexes(engine)
+    print(f"Seeding {args.num_exps} x {args.samples_per_exp} samples...")
+    seed(engine, args.num_exps, args.samples_per_exp, args.spans_per_trace)
+
+    before = bench(engine, args)
+    start = time.perf_counter()
+    version = migrate(engine)
+    print(f"Migrated to version {version} ({len(MIGRATIONS)} migrations) in {time.perf_counter() - start:.2f}s")
+    after = bench(engine, args)
+
+    print(f"\n{'query':<60}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+    for name in before:
+        print(f"{name:<60}{before[name]:>14.3f}{after[name]:>14.3f}{before[name] / max(after[name], 1e-9):>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
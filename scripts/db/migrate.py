@@ -0,0 +1,29 @@
+"""
+Apply pending schema migrations to the database at `DB_URL`, see `utu.db.migrations`.
+"""
+
+import argparse
+
+from sqlmodel import SQLModel
+
+from utu.db.migrations import LATEST_VERSION, get_schema_version, migrate
+from utu.utils import SQLModelUtils
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target_version", type=int, default=LATEST_VERSION, help="Target schema version.")
+    parser.add_argument("--dry_run", action="store_true", help="Only print the current schema version.")
+    args = parser.parse_args()
+
+    engine = SQLModelUtils.get_engine()  # tables are created and migrated on first init
+    print(f"Current schema version: {get_schema_version(engine)}, latest: {LATEST_VERSION}")
+    if args.dry_run:
+        return
+    SQLModel.metadata.create_all(engine)
+    version = migrate(engine, target_version=args.target_version)
+    print(f"Schema migrated to version {version}")
+
+
+if __name__ == "__main__":
+    main()
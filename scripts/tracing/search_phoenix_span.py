@@ -40,6 +40,7 @@ def main():
             sample.trace_url = phoenix_url
             db_manager.save(sample)
             num_updated += 1
+    db_manager.flush()
     print(f"Updated {num_updated} samples.")
     print(f"Trace IDs not found: {trace_ids_not_found}")
 
@@ -1,11 +1,22 @@
 """Utils to inspect tools
 - load all tools in TOOLKIT_MAP;
-- save the tool infos into .xlsx;"""
+- save the tool infos into .xlsx;
+- with `--mcp`, list the tools of MCP servers and pre-warm their disk cache (see `MCPToolsCache`), so that agent
+  builds do not list them again. e.g.
+    python scripts/utils/dump_tool_schemas.py --mcp  # all MCP toolkits under configs/tools
+    python scripts/utils/dump_tool_schemas.py --mcp mcp/time --agent_config examples/mcp/stdio_example
+"""
+
+import argparse
+import asyncio
 
 import pandas as pd
 from agents.function_schema import FuncSchema
 
+from utu.config import ConfigLoader, ToolkitConfig
 from utu.tools import TOOLKIT_MAP, get_tools_schema
+from utu.tools.utils import get_mcp_tools_schema
+from utu.utils import DIR_ROOT
 
 
 def get_tool_schema() -> dict[str, FuncSchema]:
@@ -16,6 +27,36 @@ def get_tool_schema() -> dict[str, FuncSchema]:
     return tool_schemas
 
 
+def get_mcp_toolkit_configs(names: list[str], agent_configs: list[str]) -> list[ToolkitConfig]:
+    if not names and not agent_configs:
+        tools_dir = DIR_ROOT / "configs" / "tools"
+        names = [file.relative_to(tools_dir).with_suffix("").as_posix() for file in sorted(tools_dir.rglob("*.yaml"))]
+    configs = []
+    for name in names:
+        try:
+            configs.append(ConfigLoader.load_toolkit_config(name))
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"Skip toolkit config {name}: {e}")
+    for agent_config in agent_configs:
+        configs.extend(ConfigLoader.load_agent_config(agent_config).toolkits.values())
+    return [config for config in configs if config.mode == "mcp"]
+
+
+async def warmup_mcp_tool_schemas(configs: list[ToolkitConfig]) -> dict[str, FuncSchema]:
+    """List the tools of the MCP servers concurrently, and refresh their disk cache."""
+    results = await asyncio.gather(
+        *[get_mcp_tools_schema(config, refresh=True) for config in configs], return_exceptions=True
+    )
+    tool_schemas = {}
+    for config, result in zip(configs, results, strict=True):
+        if isinstance(result, BaseException):
+            print(f"Failed to list tools of MCP server `{config.name}`: {result!r}")
+            continue
+        print(f"Cached {len(result)} tools of MCP server `{config.name}`")
+        tool_schemas.update(result)
+    return tool_schemas
+
+
 def save_tools_info(tools: list[FuncSchema]):
     tools_schema_list = []
     for tool in tools:
@@ -32,5 +73,17 @@ def save_tools_info(tools: list[FuncSchema]):
     print(df)
 
 
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mcp", type=str, nargs="*", default=None, help="MCP toolkit configs, all if empty.")
+    parser.add_argument("--agent_config", type=str, nargs="*", default=[], help="Agent configs with MCP toolkits.")
+    args = parser.parse_args()
+
+    if args.mcp is None and not args.agent_config:
+        get_tool_schema()
+    else:
+        asyncio.run(warmup_mcp_tool_schemas(get_mcp_toolkit_configs(args.mcp or [], args.agent_config)))
+
+
 if __name__ == "__main__":
-    get_tool_schema()
+    main()
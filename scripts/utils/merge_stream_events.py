@@ -1,7 +1,16 @@
+"""Merge the text & reason deltas of a recorded event log into larger events, e.g. before replaying it.
+
+The log is streamed, merged events are written as they come:
+    python scripts/utils/merge_stream_events.py --events events.evlog.zst  # -> events_merged.evlog.zst
+Legacy pickled recordings (`.pkl`, only load trusted files) are converted to an event log on the way.
+"""
+
 import argparse
 import pickle
+from collections.abc import Iterable, Iterator
 
 from utu.ui.common import Event
+from utu.ui.event_log import EventLogWriter, read_event_log
 
 
 def _yield_current_event(current_event):
@@ -11,7 +20,8 @@ def _yield_current_event(current_event):
     return None
 
 
-def merged_event_stream(events: list[Event]):
+def merged_event_stream(events: Iterable[dict]) -> Iterator[dict]:
+    """Merge a stream of records `{"timestamp", "event"}`, a merged event keeps the timestamp of its first delta."""
     current_event = None
 
     for event in events:
@@ -28,10 +38,11 @@ def merged_event_stream(events: list[Event]):
                 if current_event is None:
                     current_event = event
                 elif current_event["event"].data.type == data.type:
-                    current_event["event"].data.delta += data.delta
-                    if len(current_event["event"].data.delta) > 600:
+                    if len(current_event["event"].data.delta) + len(data.delta) > 600:
                         yield current_event
                         current_event = event
+                    else:
+                        current_event["event"].data.delta += data.delta
                 else:
                     current_event["event"].data.delta += data.delta
                 continue
@@ -46,7 +57,18 @@ def merged_event_stream(events: list[Event]):
             raise ValueError(f"Unsupported raw event data type: {data.type}")
 
         # Handle other event types that just need to flush current event
-        if real_event.type in ("orchestra", "finish", "example"):
+        if real_event.type in (
+            "orchestra",
+            "finish",
+            "example",
+            "init",
+            "ask",
+            "error",
+            "list_agents",
+            "switch_agent",
+            "gen_agent",
+            "generated_agent_config",
+        ):
             yield from _yield_current_event(current_event)
             current_event = None
             yield event
@@ -72,9 +94,19 @@ def process_events(events: list[Event]):
     return list(merged_event_stream(events))
 
 
-def save_events(events: list[Event], output: str):
-    with open(output, "wb") as f:
-        pickle.dump(events, f)
+def load_events(path: str) -> Iterator[dict]:
+    if path.endswith(".pkl"):
+        with open(path, "rb") as f:
+            yield from pickle.load(f)
+    else:
+        yield from read_event_log(path)
+
+
+def save_events(events: Iterable[dict], output: str) -> int:
+    with EventLogWriter(output) as writer:
+        for event in events:
+            writer.write(event["event"], timestamp=event["timestamp"])
+        return writer.num_events
 
 
 if __name__ == "__main__":
@@ -82,8 +114,7 @@ if __name__ == "__main__":
     parser.add_argument("--events", type=str, required=True)
     parser.add_argument("--output", type=str, required=False)
     args = parser.parse_args()
-    with open(args.events, "rb") as f:
-        events = pickle.load(f)
-    events = process_events(events)
-    output_name = args.output or args.events.replace(".pkl", "_merged.pkl")
-    save_events(events, output_name)
+    stem = args.events.removesuffix(".pkl").removesuffix(".zst").removesuffix(".evlog")
+    output_name = args.output or f"{stem}_merged.evlog.zst"
+    num_events = save_events(merged_event_stream(load_events(args.events)), output_name)
+    print(f"Saved {num_events} merged events to {output_name}")
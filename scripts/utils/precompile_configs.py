@@ -0,0 +1,23 @@
+"""
+Compile all configs under `configs/` into one json snapshot, see `ConfigLoader.precompile`.
+Set `UTU_CONFIG_SNAPSHOT=<output>` in worker processes to load configs from the snapshot instead of Hydra compose.
+Entries are validated against the config files' mtimes and the interpolated env vars, stale ones are recompiled.
+"""
+
+import argparse
+
+from utu.config import ConfigLoader
+from utu.utils import CACHE_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=str, default=str(CACHE_DIR / "config_snapshot.json"), help="Output path.")
+    args = parser.parse_args()
+
+    num_configs = ConfigLoader.precompile(args.output)
+    print(f"Compiled {num_configs} configs into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
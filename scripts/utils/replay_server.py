@@ -1,38 +1,66 @@
+"""Replay a recorded event log (see `utu.ui.event_log`) in the web UI.
+
+The log is read lazily on each query. `--speed` sets the playback speed relative to the recording: 1 for real-time,
+larger to accelerate, 0 to send all events at once. e.g.
+    python scripts/utils/replay_server.py --events events.evlog.zst --query "..." --speed 4
+"""
+
 import argparse
 import asyncio
 import json
-import pickle
+import time
 import traceback
-from dataclasses import asdict
+from collections.abc import Awaitable, Callable, Iterable
 from importlib import resources
 
 import tornado.web
 import tornado.websocket
 
 from utu.ui.common import Event, ExampleContent, UserRequest
+from utu.ui.event_coalescer import EventCoalescer
+from utu.ui.event_log import read_event_log
+
+# wait until the coalescer has written the queued events every this many events. The log is read synchronously, so
+# without it a fast replay (e.g. `--speed 0`) would queue a whole big recording and the coalescer would drop the client
+DRAIN_EVERY = 256
+
 
-REPLAY_INTERVAL = 0.5
+async def replay_events(events: Iterable[dict], send: Callable[[Event], Awaitable[None]], speed: float = 1.0) -> None:
+    """Send the records `{"timestamp", "event"}` with their recorded pacing divided by `speed`, or at once if 0."""
+    start_time, first_timestamp = time.monotonic(), None
+    for record in events:
+        if speed > 0:
+            if first_timestamp is None:
+                first_timestamp = record["timestamp"]
+            delay = start_time + (record["timestamp"] - first_timestamp) / speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await send(record["event"])
 
 
 class ReplayWebSocketHandler(tornado.websocket.WebSocketHandler):
-    def initialize(self, example_query: str = "", events: list[Event] | None = None):
+    def initialize(self, example_query: str = "", events_file: str = "", speed: float = 1.0):
         self.example_query = example_query
-        if events is None:
-            events = []
-        self.events = events
+        self.events_file = events_file
+        self.speed = speed
 
     def check_origin(self, origin):
         # Allow all origins to connect
         return True
 
     def open(self):
+        self.coalescer = EventCoalescer(self.write_message)
+        self.num_sent = 0
         # send example query
-        self.write_message(asdict(Event("example", ExampleContent(type="example", query=self.example_query))))
+        self.coalescer.put(Event(type="example", data=ExampleContent(type="example", query=self.example_query)))
 
     async def send_event(self, event: Event):
         # print in green color
-        print(f"\033[92mSending event: {asdict(event)}\033[0m")
-        self.write_message(asdict(event))
+        print(f"\033[92mSending event: {event.model_dump()}\033[0m")
+        self.coalescer.put(event)
+        self.num_sent += 1
+        if self.num_sent % DRAIN_EVERY == 0:
+            await self.coalescer.drain()
 
     async def on_message(self, message: str):
         try:
@@ -45,13 +73,7 @@ class ReplayWebSocketHandler(tornado.websocket.WebSocketHandler):
                     if content.query.strip() == "":
                         raise ValueError("Query cannot be empty")
 
-                    # last_time = 0
-                    for event in self.events:
-                        # timestamp = event["timestamp"]
-                        real_event = event["event"]
-                        await asyncio.sleep(REPLAY_INTERVAL)
-                        await self.send_event(real_event)
-                        # last_time = timestamp
+                    await replay_events(read_event_log(self.events_file), self.send_event, speed=self.speed)
 
                 except TypeError as e:
                     print(f"Invalid query format: {e}")
@@ -68,15 +90,15 @@ class ReplayWebSocketHandler(tornado.websocket.WebSocketHandler):
             self.close(1002, "Error processing message")
 
     def on_close(self):
-        pass
+        if hasattr(self, "coalescer"):
+            self.coalescer.close()
 
 
 class ReplayWebUIChatbot:
-    def __init__(self, example_query: str = "", events_file: str = ""):
+    def __init__(self, example_query: str = "", events_file: str = "", speed: float = 1.0):
         self.example_query = example_query
         self.events_file = events_file
-        with open(events_file, "rb") as f:
-            self.events = pickle.load(f)
+        self.speed = speed
         # hack
         with resources.as_file(resources.files("utu_agent_ui.static").joinpath("index.html")) as static_dir:
             self.static_path = str(static_dir).replace("index.html", "")
@@ -84,7 +106,11 @@ class ReplayWebUIChatbot:
     def make_app(self) -> tornado.web.Application:
         return tornado.web.Application(
             [
-                (r"/ws", ReplayWebSocketHandler, {"example_query": self.example_query, "events": self.events}),
+                (
+                    r"/ws",
+                    ReplayWebSocketHandler,
+                    {"example_query": self.example_query, "events_file": self.events_file, "speed": self.speed},
+                ),
                 (
                     r"/",
                     tornado.web.RedirectHandler,
@@ -116,6 +142,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--events", type=str, required=True)
     parser.add_argument("--query", type=str, required=True)
+    parser.add_argument("--speed", type=float, default=1.0, help="1 for real-time, 0 for instant playback")
     args = parser.parse_args()
-    webui = ReplayWebUIChatbot(example_query=args.query, events_file=args.events)
+    webui = ReplayWebUIChatbot(example_query=args.query, events_file=args.events, speed=args.speed)
     webui.launch()
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from utu.agents import AgentPool
+
+
+class DummyAgent:
+    num_builds = 0
+
+    def __init__(self):
+        self.input_items = []
+        self.cleaned = False
+
+    async def build(self):
+        DummyAgent.num_builds += 1
+
+    async def cleanup(self):
+        self.cleaned = True
+
+    def clear_input_items(self):
+        self.input_items = []
+
+    async def run(self, input: str):
+        self.input_items.append(input)
+        await asyncio.sleep(0.01)
+        if input == "error":
+            raise RuntimeError("mock error")
+        return input
+
+
+async def test_agent_pool():
+    DummyAgent.num_builds = 0
+    pool = AgentPool(DummyAgent, size=4)
+
+    async def run_one(input: str):
+        async with pool.lease() as agent:
+            assert agent.input_items == []  # conversation state is reset
+            return await agent.run(input)
+
+    results = await asyncio.gather(*[run_one(str(i)) for i in range(20)])
+    assert results == [str(i) for i in range(20)]
+    assert DummyAgent.num_builds == 4  # built once per worker
+    assert pool.num_agents == 4
+
+    # unhealthy agents are recycled
+    with pytest.raises(RuntimeError):
+        await run_one("error")
+    assert pool.num_agents == 3
+    await asyncio.gather(*[run_one(str(i)) for i in range(4)])
+    assert DummyAgent.num_builds == 5
+
+    await pool.close()
+    assert pool.num_agents == 0
+
+
+async def test_agent_pool_max_uses():
+    DummyAgent.num_builds = 0
+    pool = AgentPool(DummyAgent, size=1, max_uses=2)
+    agents = []
+    for _ in range(4):
+        async with pool.lease() as agent:
+            agents.append(agent)
+    assert DummyAgent.num_builds == 2
+    assert agents[0] is agents[1] and agents[0].cleaned
+    await pool.close()
+
+
+class ResettableAgent(DummyAgent):
+    def __init__(self):
+        super().__init__()
+        self.trace_id = None
+        self.num_resets = 0
+
+    async def build(self, trace_id: str = None):
+        await super().build()
+        self.trace_id = trace_id
+
+    def reset(self):
+        self.clear_input_items()
+        self.num_resets += 1
+
+
+async def test_agent_pool_reset():
+    pool = AgentPool(ResettableAgent, size=1)
+    async with pool.lease(trace_id="trace-1") as agent:
+        assert agent.trace_id == "trace-1"  # new agents are built with the trace id of the lease
+        await agent.run("1")
+    async with pool.lease(trace_id="trace-2") as reused:
+        assert reused is agent and reused.num_resets == 1
+        assert reused.input_items == []
+    await pool.close()
@@ -1,6 +1,20 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
 import pytest
 
-from utu.agents import OrchestraAgent
+from utu.agents import AgentPool, OrchestraAgent
+from utu.agents.orchestra import (
+    AnalysisResult,
+    CreatePlanResult,
+    OrchestraStreamEvent,
+    OrchestraSubtaskEvent,
+    OrchestraTaskRecorder,
+    Subtask,
+    WorkerResult,
+)
+from utu.agents.orchestra.planner import OutputParser
 from utu.config import ConfigLoader
 
 
@@ -15,3 +29,118 @@ async def test_run_streamed(agent: OrchestraAgent):
     run_result = agent.run_streamed("Introduce the main architectures of CNN")
     async for event in run_result.stream_events():
         print(event)
+
+
+class DummyStream:
+    def __init__(self, task: str, delay: float):
+        self.task = task
+        self.delay = delay
+        self.final_output = None
+        self.last_agent = SimpleNamespace(name="worker")
+
+    async def stream_events(self):
+        yield f"start {self.task}"
+        DummyWorker.running += 1
+        DummyWorker.peak_running = max(DummyWorker.peak_running, DummyWorker.running)
+        DummyWorker.log.append(f"start {self.task}")
+        await asyncio.sleep(self.delay)
+        DummyWorker.running -= 1
+        DummyWorker.log.append(f"end {self.task}")
+        self.final_output = f"done {self.task}"
+        yield f"end {self.task}"
+
+    def to_input_list(self):
+        return []
+
+
+class DummyWorker:
+    num_builds = 0
+    running = peak_running = 0  # concurrently running subtasks
+    log: list[str] = []
+
+    async def build(self):
+        DummyWorker.num_builds += 1
+
+    def work_streamed(self, task_recorder: OrchestraTaskRecorder, subtask: Subtask) -> WorkerResult:
+        return WorkerResult(task=subtask.task, stream=DummyStream(subtask.task, delay=0.2))
+
+
+class DummyPlanner:
+    def __init__(self, todo: list[Subtask]):
+        self.todo = todo
+
+    async def create_plan(self, task_recorder: OrchestraTaskRecorder) -> CreatePlanResult:
+        return CreatePlanResult(todo=self.todo)
+
+
+class DummyReporter:
+    async def report(self, task_recorder: OrchestraTaskRecorder) -> AnalysisResult:
+        # the reporter starts after all subtasks
+        assert all(t.completed for t in task_recorder.plan.todo)
+        return AnalysisResult(output=task_recorder.get_trajectory_str())
+
+
+def test_parse_plan_with_dependencies():
+    parser = OutputParser()
+    plan = parser.parse(
+        "<analysis>search then compare</analysis>\n<plan>["
+        '{"agent_name": "SearchAgent", "task": "search A", "completed": false, "depends_on": []},\n'
+        '{"agent_name": "SearchAgent", "task": "search B", "completed": false, "depends_on": []},\n'
+        '{"agent_name": "SearchAgent", "task": "compare A and B", "completed": false, "depends_on": [1, 2, 3]}'
+        "]</plan>"
+    )
+    assert [t.depends_on for t in plan.todo] == [[], [], [1, 2, 3]]
+    assert plan.get_dependencies() == [set(), set(), {0, 1}]  # no self or forward dependency
+    # plans without `depends_on` are sequential
+    plan = parser.parse(
+        '<plan>[{"agent_name": "SearchAgent", "task": "search A", "completed": false}, '
+        '{"agent_name": "SearchAgent", "task": "search B", "completed": false}]</plan>'
+    )
+    assert plan.get_dependencies() == [set(), {0}]
+
+
+@pytest.mark.parametrize(
+    "depends_on, expected",
+    [("2", [2]), ('"1,2"', [1, 2]), ('"12"', [12]), ('[1, "2"]', [1, 2]), ("[]", []), ("null", None)],
+)
+def test_parse_plan_depends_on_shapes(depends_on: str, expected: list[int] | None):
+    plan = OutputParser().parse(
+        '<plan>[{"agent_name": "SearchAgent", "task": "search A", "completed": false}, '
+        f'{{"agent_name": "SearchAgent", "task": "search B", "completed": false, "depends_on": {depends_on}}}]</plan>'
+    )
+    assert [t.task for t in plan.todo] == ["search A", "search B"]
+    assert plan.todo[1].depends_on == expected
+
+
+@pytest.mark.parametrize("max_parallel_subtasks", [1, 3])
+async def test_run_subtasks_in_parallel(max_parallel_subtasks: int):
+    config = ConfigLoader.load_agent_config("orchestra/base")
+    config.max_parallel_subtasks = max_parallel_subtasks
+    agent = OrchestraAgent(config=config)
+    worker_name = next(iter(config.workers))
+    DummyWorker.num_builds = DummyWorker.peak_running = 0
+    DummyWorker.log = []
+    agent.worker_pools = {worker_name: AgentPool(DummyWorker, size=max_parallel_subtasks)}
+    todo = [Subtask(agent_name=worker_name, task=f"search source {i}", depends_on=[]) for i in range(1, 4)]
+    todo.append(Subtask(agent_name=worker_name, task="summarize", depends_on=[1, 2, 3]))
+    agent.set_planner(DummyPlanner(todo))
+    agent.reporter_agent = DummyReporter()
+
+    start = time.perf_counter()
+    task_recorder = agent.run_streamed("research")
+    events = [e async for e in task_recorder.stream_events(with_task_tags=True)]
+    elapsed = time.perf_counter() - start
+    await agent.cleanup()
+
+    tagged = [e for e in events if isinstance(e, OrchestraSubtaskEvent)]
+    assert {e.task_id for e in tagged} == {1, 2, 3, 4}
+    assert all(e.event.endswith(todo[e.task_id - 1].task) for e in tagged)
+    assert [e.item.task_id for e in events if isinstance(e, OrchestraStreamEvent)][-1] == 4
+    assert DummyWorker.num_builds == max_parallel_subtasks  # workers are built once
+    assert task_recorder.final_output.index("search source 3") < task_recorder.final_output.index("summarize")
+    print(f"max_parallel_subtasks={max_parallel_subtasks}: {elapsed:.2f}s")
+    assert DummyWorker.peak_running == max_parallel_subtasks  # 3 searches in parallel when allowed
+    # summarize starts after all the searches it depends on
+    assert DummyWorker.log.index("start summarize") > max(
+        DummyWorker.log.index(f"end search source {i}") for i in (1, 2, 3)
+    )
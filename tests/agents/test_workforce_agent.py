@@ -1,8 +1,13 @@
 # ruff: noqa
 
+import asyncio
+import time
+
 import pytest
 
 from utu.agents import WorkforceAgent
+from utu.agents.workforce import WorkspaceTaskRecorder
+from utu.agents.workforce.data import Subtask
 from utu.config import ConfigLoader
 
 overall_task = "It's May 2023, and I'm about to drive across the U.S. from California to Maine. I always recycle my water bottles at the end of a trip, and I drink 5 12-ounce water bottles for every 100 miles I travel, rounded to the nearest 100. Assuming I follow I-40 from Los Angeles to Cincinnati, then take I-90 from Cincinnati to Augusta, how many dollars will I get back according to Wikipedia?"
@@ -17,3 +22,152 @@ async def agent():
 async def test_run(agent: WorkforceAgent):
     recorder = await agent.run(overall_task)
     print(recorder)
+
+
+# ---------------------------------------------------------------------------
+# concurrent mode, with recorded plans replayed by stub subagents
+LATENCY = {"assign": 0.05, "execute": 0.2, "check": 0.05, "update": 0.05}
+# concurrently running executions, and plan updates requested while the next tasks run
+STATS = {"executing": 0, "peak_executing": 0, "overlapped_updates": 0}
+RECORDED_PLANS = {
+    # three independent searches, then a comparison
+    "fan_out": [
+        ("Search Wikipedia for the bottle deposit of Maine", ""),
+        ("Search the Maine government site for the bottle deposit", ""),
+        ("Compute the distance from Los Angeles to Augusta along I-40 and I-90", ""),
+        ("Combine the deposit and the distance into the refund", "1,2,3"),
+    ],
+    # a plan without dependencies runs in order
+    "chain": [
+        ("Find the winner of the tournament", None),
+        ("Find the birth year of the winner", None),
+    ],
+}
+
+
+class StubPlanner:
+    def __init__(self, config):
+        self.plan = RECORDED_PLANS[config.workforce_planner_config["recorded_plan"]]
+
+    async def plan_task(self, recorder: WorkspaceTaskRecorder) -> None:
+        recorder.plan_init(
+            [
+                Subtask(
+                    task_id=i,
+                    task_name=name,
+                    depends_on=None if depends_on is None else [int(j) for j in depends_on.split(",") if j],
+                )
+                for i, (name, depends_on) in enumerate(self.plan, 1)
+            ]
+        )
+
+    async def plan_check(self, recorder: WorkspaceTaskRecorder, task: Subtask) -> None:
+        await asyncio.sleep(LATENCY["check"])
+        task.task_status = "success"
+
+    async def plan_update(self, recorder: WorkspaceTaskRecorder, task: Subtask) -> str:
+        await asyncio.sleep(LATENCY["update"])
+        return "continue"
+
+    async def propose_plan_update(self, recorder: WorkspaceTaskRecorder):
+        STATS["overlapped_updates"] += any(t.task_status == "in progress" for t in recorder.task_plan)
+        await asyncio.sleep(LATENCY["update"])
+        return "continue", None, {t.task_id for t in recorder.task_plan if t.task_status == "not started"}
+
+
+class StubAssigner:
+    def __init__(self, config):
+        pass
+
+    async def assign_task(self, recorder: WorkspaceTaskRecorder, task: Subtask | None = None) -> Subtask:
+        task = task or recorder.get_next_task()
+        await asyncio.sleep(LATENCY["assign"])
+        task.assigned_agent = "SearchAgent"
+        return task
+
+
+class StubExecutor:
+    def __init__(self, config, workforce_config):
+        self.busy = False
+
+    async def execute_task(self, recorder: WorkspaceTaskRecorder, task: Subtask) -> None:
+        assert not self.busy, "executor instances must not be shared by concurrent tasks"
+        self.busy = True
+        # results of the dependencies are available
+        deps = task.depends_on if task.depends_on is not None else [task.task_id - 1]
+        assert all(t.task_result for t in recorder.task_plan if t.task_id in deps)
+        STATS["executing"] += 1
+        STATS["peak_executing"] = max(STATS["peak_executing"], STATS["executing"])
+        await asyncio.sleep(LATENCY["execute"])
+        STATS["executing"] -= 1
+        task.task_result = f"result of {task.task_id}"
+        task.task_status = "completed"
+        self.busy = False
+
+
+class StubAnswerer:
+    def __init__(self, config):
+        pass
+
+    async def extract_final_answer(self, recorder: WorkspaceTaskRecorder) -> str:
+        return "\n".join(t.task_result for t in recorder.task_plan)
+
+
+@pytest.mark.parametrize("recorded_plan", list(RECORDED_PLANS))
+async def test_concurrent_mode(monkeypatch, recorded_plan: str):
+    from utu.agents import workforce_agent
+
+    monkeypatch.setattr(workforce_agent, "PlannerAgent", StubPlanner)
+    monkeypatch.setattr(workforce_agent, "AssignerAgent", StubAssigner)
+    monkeypatch.setattr(workforce_agent, "ExecutorAgent", StubExecutor)
+    monkeypatch.setattr(workforce_agent, "AnswererAgent", StubAnswerer)
+    config = ConfigLoader.load_agent_config("workforce/base")
+    config.workforce_planner_config["recorded_plan"] = recorded_plan
+
+    elapsed, stats = {}, {}
+    for max_parallel_subtasks in (1, 4):
+        config.max_parallel_subtasks = max_parallel_subtasks
+        STATS.update(executing=0, peak_executing=0, overlapped_updates=0)
+        start = time.perf_counter()
+        recorder = await WorkforceAgent(config=config).run(overall_task)
+        elapsed[max_parallel_subtasks] = time.perf_counter() - start
+        stats[max_parallel_subtasks] = dict(STATS)
+        assert [t.task_status for t in recorder.task_plan] == ["success"] * len(RECORDED_PLANS[recorded_plan])
+    print(f"{recorded_plan}: sequential {elapsed[1]:.2f}s {stats[1]}, concurrent {elapsed[4]:.2f}s {stats[4]}")
+    assert stats[1]["peak_executing"] == 1
+    # the 3 independent searches run together, a chain runs one task at a time
+    assert stats[4]["peak_executing"] == (3 if recorded_plan == "fan_out" else 1)
+    # plan updates are off the critical path: the next tasks run while the plan is updated
+    assert stats[4]["overlapped_updates"] > 0
+
+
+def test_plan_dependencies():
+    recorder = WorkspaceTaskRecorder(overall_task=overall_task)
+    recorder.plan_init(
+        [
+            Subtask(task_id=1, task_name="a", depends_on=[]),
+            Subtask(task_id=2, task_name="b", depends_on=[]),
+            Subtask(task_id=3, task_name="c", depends_on=[1, 2]),
+            Subtask(task_id=4, task_name="d"),  # depends on the previous task
+        ]
+    )
+    assert [t.task_id for t in recorder.get_ready_tasks()] == [1, 2]
+    recorder.task_plan[0].task_status = "success"
+    recorder.task_plan[1].task_status = "in progress"
+    assert recorder.get_ready_tasks() == []
+    recorder.task_plan[1].task_status = "failed"
+    assert [t.task_id for t in recorder.get_ready_tasks()] == [3]
+    # plan updates keep the started tasks
+    recorder.task_plan[2].task_status = "in progress"
+    assert recorder.replace_unstarted_tasks(["e", "f"], unstarted_ids={4})
+    assert [(t.task_id, t.task_name) for t in recorder.task_plan] == [(1, "a"), (2, "b"), (3, "c"), (4, "e"), (5, "f")]
+
+
+def test_stale_plan_update():
+    recorder = WorkspaceTaskRecorder(overall_task=overall_task)
+    recorder.plan_init([Subtask(task_id=i, task_name=name) for i, name in enumerate("abc", 1)])
+    recorder.task_plan[0].task_status = "success"
+    unstarted_ids = {2, 3}  # when the update is requested
+    recorder.task_plan[1].task_status = "in progress"  # started before the update returns
+    assert not recorder.replace_unstarted_tasks(["b2", "c2"], unstarted_ids)
+    assert [t.task_name for t in recorder.task_plan] == ["a", "b", "c"]
@@ -0,0 +1,59 @@
+import asyncio
+
+from agents import RunContextWrapper
+
+from utu.context import CompactionContextManager
+from utu.utils import TokenUtils
+
+
+def _make_input(num_turns: int) -> list:
+    input = [{"role": "user", "content": "Find the answer."}]
+    for i in range(num_turns):
+        input.append({"type": "function_call", "call_id": f"call_{i}", "name": "crawl", "arguments": "{}"})
+        input.append({"type": "function_call_output", "call_id": f"call_{i}", "output": f"page {i} " * 1000})
+    return input
+
+
+def test_compaction():
+    input = _make_input(10)
+    snapshot = [dict(item) for item in input]
+    manager = CompactionContextManager(max_tokens=8_000, keep_recent_turns=2, truncate_tokens=50)
+    manager._summaries["call_1"] = "summary of page 1"
+    run_context = RunContextWrapper(context={})
+
+    compacted = manager.preprocess(input, run_context)
+    assert input == snapshot  # the shared input is not modified
+    assert compacted[0] == input[0]
+    assert compacted[-4:] == input[-4:]  # the most recent turns are intact
+    assert "summary of page 1" in compacted[4]["output"]
+    assert sum(TokenUtils.count_tokens(item.get("output", "")) for item in compacted) <= 8_000
+
+    stats = run_context.context["context_stats"]
+    assert stats["num_turns"] == 1 and stats["tokens_saved"] > 0 and stats["num_compacted"] > 0
+
+
+def test_compaction_under_budget():
+    input = _make_input(2)
+    manager = CompactionContextManager(max_tokens=100_000)
+    assert manager.preprocess(input, RunContextWrapper(context={})) is input
+
+
+async def test_compaction_summaries_bounded_and_reset():
+    class StubLLM:
+        async def query_one(self, messages: str) -> str:
+            await asyncio.sleep(10 if "page 3" in messages else 0.01)
+            return "summary"
+
+    manager = CompactionContextManager(summary_min_tokens=10, max_summaries=2)
+    manager.summary_llm = StubLLM()
+    for item in _make_input(3)[1:]:
+        if item["type"] == "function_call_output":
+            manager._schedule_summary(item, "crawl")
+    await asyncio.gather(*manager._summary_tasks)
+    assert list(manager._summaries) == ["call_1", "call_2"]  # the oldest is dropped
+
+    manager._schedule_summary(_make_input(4)[-1], "crawl")  # a slow one
+    task = next(iter(manager._summary_tasks))
+    manager.reset()
+    await asyncio.sleep(0)
+    assert task.cancelled() and not manager._summaries and not manager._summary_tasks
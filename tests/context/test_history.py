@@ -0,0 +1,92 @@
+"""Micro-benchmark of building the model input over a 200-turn synthetic tool trajectory:
+rebuild + deepcopy per turn (the previous runner & EnvContextManager) vs. `IncrementalHistory`."""
+
+import copy
+import time
+
+from agents import Agent, ItemHelpers, ToolCallItem, ToolCallOutputItem
+from agents.items import RunItemBase
+from openai.types.responses import ResponseFunctionToolCall
+
+from utu.context import IncrementalHistory
+
+NUM_TURNS = 200
+OUTPUT_SIZE = 20_000  # chars of each tool output, e.g. a crawled web page
+ORIGINAL_INPUT = [{"role": "user", "content": "Find the answer."}]
+
+
+def _make_turn(agent: Agent, i: int) -> list:
+    call = ResponseFunctionToolCall(
+        id=f"fc_{i}",
+        call_id=f"call_{i}",
+        name="web_qa",
+        arguments=f'{{"url": "https://example.com/{i}"}}',
+        type="function_call",
+    )
+    output = {"type": "function_call_output", "call_id": f"call_{i}", "output": str(i) * OUTPUT_SIZE}
+    return [
+        ToolCallItem(agent=agent, raw_item=call),
+        ToolCallOutputItem(agent=agent, raw_item=output, output=output["output"]),
+    ]
+
+
+def _state(i: int) -> dict:
+    return {"role": "user", "content": f"env state at turn {i}"}
+
+
+def _baseline_input(generated_items: list, i: int) -> list:
+    input = ItemHelpers.input_to_new_input_list(ORIGINAL_INPUT)
+    input.extend([item.to_input_item() for item in generated_items])
+    input = copy.deepcopy(input)
+    input.append(_state(i))
+    return input
+
+
+def test_incremental_history(monkeypatch):
+    agent = Agent(name="test")
+    history = IncrementalHistory()
+    generated_items = []
+    baseline_time, incremental_time = 0.0, 0.0
+    conversions = {"baseline": 0, "incremental": 0}
+    phase = "baseline"
+    to_input_item = RunItemBase.to_input_item
+
+    def counting_to_input_item(self):
+        conversions[phase] += 1
+        return to_input_item(self)
+
+    monkeypatch.setattr(RunItemBase, "to_input_item", counting_to_input_item)
+    for i in range(NUM_TURNS):
+        generated_items = generated_items + _make_turn(agent, i)  # the runner creates a new list each turn
+
+        phase = "baseline"
+        start = time.perf_counter()
+        expected = _baseline_input(generated_items, i)
+        baseline_time += time.perf_counter() - start
+
+        phase = "incremental"
+        start = time.perf_counter()
+        history.sync(ORIGINAL_INPUT, generated_items)
+        with history.ephemeral([_state(i)]) as input:
+            incremental_time += time.perf_counter() - start
+            if i % 50 == 0 or i == NUM_TURNS - 1:
+                assert input == expected
+        assert len(history.items) == len(expected) - 1  # ephemeral items are removed
+
+    print(
+        f"{NUM_TURNS} turns: rebuild+deepcopy {baseline_time:.3f}s ({conversions['baseline']} item conversions), "
+        f"incremental {incremental_time:.3f}s ({conversions['incremental']} item conversions)"
+    )
+    assert conversions["baseline"] == NUM_TURNS * (NUM_TURNS + 1)  # all the items, every turn
+    assert conversions["incremental"] == 2 * NUM_TURNS  # each item once
+
+
+def test_history_rewritten():
+    agent = Agent(name="test")
+    history = IncrementalHistory()
+    items = _make_turn(agent, 0) + _make_turn(agent, 1)
+    assert len(history.sync(ORIGINAL_INPUT, items)) == 5
+    # e.g. a handoff input filter drops items, the history is rebuilt
+    assert len(history.sync(ORIGINAL_INPUT, items[2:])) == 3
+    assert len(history.sync("new input", items[2:])) == 3
+    assert history.items[0] == {"role": "user", "content": "new input"}
@@ -0,0 +1,43 @@
+from sqlalchemy import create_engine, inspect
+from sqlmodel import SQLModel
+
+from utu.db.migrations import LATEST_VERSION, get_schema_version, migrate
+
+
+def test_migrate_existing_tables():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    # simulate tables created before the indexes were declared
+    for table in SQLModel.metadata.tables.values():
+        for index in table.indexes:
+            index.drop(engine)
+    assert inspect(engine).get_indexes("evaluation_data") == []
+    assert get_schema_version(engine) == 0
+
+    assert migrate(engine) == LATEST_VERSION
+    index_names = {index["name"] for index in inspect(engine).get_indexes("evaluation_data")}
+    assert "ix_evaluation_data_exp_id_stage_dataset_index" in index_names
+    assert {index["name"] for index in inspect(engine).get_indexes("tracing_tool")} == {
+        "ix_tracing_tool_trace_id",
+        "ix_tracing_tool_span_id",
+    }
+    # idempotent
+    assert migrate(engine) == LATEST_VERSION
+
+
+def test_migration_indexes_match_models():
+    """Migrations create the indexes declared on the models: a new model index needs a new migration."""
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    model_indexes = {}
+    for table in SQLModel.metadata.tables.values():
+        for index in table.indexes:
+            model_indexes[index.name] = (table.name, [column.name for column in index.columns])
+            index.drop(engine)
+    migrate(engine)
+    migrated_indexes = {
+        index["name"]: (table_name, index["column_names"])
+        for table_name in inspect(engine).get_table_names()
+        for index in inspect(engine).get_indexes(table_name)
+    }
+    assert migrated_indexes == model_indexes
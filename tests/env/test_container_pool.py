@@ -0,0 +1,89 @@
+import asyncio
+import sys
+import time
+
+from utu.env.utils import DockerManager, LocalProcessBackend, get_docker_manager, shutdown_docker_managers
+from utu.env.utils.port_manager import PortManager
+
+# a stand-in of the browser container: serves `/ping` after a start-up delay
+STANDIN_SERVER = """
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+time.sleep(0.5)
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200 if self.path == "/ping" else 404)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+HTTPServer(("127.0.0.1", int(sys.argv[1])), Handler).serve_forever()
+"""
+
+
+def get_manager(tmp_path, **kwargs) -> DockerManager:
+    (tmp_path / "server.py").write_text(STANDIN_SERVER)
+    backend = LocalProcessBackend([sys.executable, str(tmp_path / "server.py"), "{port}"])
+    return DockerManager(backend=backend, port_range=(20000, 20999), **kwargs)
+
+
+def test_port_manager():
+    port_manager = PortManager((20000, 20002))
+    ports = [port_manager.allocate_port() for _ in range(3)]
+    assert sorted(ports) == [20000, 20001, 20002] and port_manager.allocate_port() is None
+    port_manager.release_port(ports[1])
+    assert port_manager.allocate_port() == ports[1]
+
+
+async def test_container_pool(tmp_path):
+    manager = get_manager(tmp_path, num_preload=2, reuse_containers=True)
+    try:
+        start = time.perf_counter()
+        res = await manager.start_container("cold")
+        cold_latency = time.perf_counter() - start
+        assert res["success"] and manager.stats["cold_started"] == 1
+        await manager.stop_container("cold")  # recycled, preferred over the containers being started
+        await manager.warmup()
+        assert manager.num_idle == 2 and manager.stats["recycled"] == 1
+
+        preloaded = {info.container_id for info in manager._idle}
+        start = time.perf_counter()
+        results = await asyncio.gather(*[manager.start_container(f"trace_{i}") for i in range(2)])
+        warm_latency = (time.perf_counter() - start) / 2
+        print(f"env acquisition latency: {cold_latency * 1000:.0f}ms cold, {warm_latency * 1000:.0f}ms warm")
+        assert all(r["success"] for r in results) and manager.stats["cold_started"] == 1
+        # served by the preloaded containers, not started on demand
+        assert {manager.containers[f"trace_{i}"].container_id for i in range(2)} == preloaded
+        assert len({r["port"] for r in results}) == 2
+
+        # healthy containers are returned to the pool, dead ones are replaced
+        await manager.stop_container("trace_0")
+        assert manager.stats["recycled"] == 2
+        await manager.warmup()
+        for info in manager._idle:
+            manager.backend.stop(info.container_id)
+        res = await manager.start_container("after_crash")
+        assert res["success"] and manager.stats["discarded"] == 2 and manager.stats["cold_started"] == 2
+    finally:
+        await manager.warmup()  # wait for the containers being started
+        manager.cleanup()
+    assert not manager.backend.processes
+
+
+async def test_shutdown_docker_managers(tmp_path):
+    (tmp_path / "server.py").write_text(STANDIN_SERVER)
+    backend = LocalProcessBackend([sys.executable, str(tmp_path / "server.py"), "{port}"])
+    manager = get_docker_manager("standin", backend=backend, num_preload=2, port_range=(20000, 20999))
+    res = await manager.start_container("trace")
+    assert res["success"]
+    await asyncio.sleep(0.1)  # the warm containers are being started in background
+    await shutdown_docker_managers()
+    assert not backend.processes and not manager._background_tasks and not manager._starting
+    assert get_docker_manager("standin", backend=backend) is not manager
+    await shutdown_docker_managers()
@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import time
+
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+from mcp.types import TextContent
+
+from utu.env import browser_env
+from utu.env.browser_env import BrowserEnv
+from utu.env.utils import MCPClient, MCPSessionPool, get_mcp_session_pool, shutdown_mcp_session_pool
+
+
+def create_standin_app(stats: dict | None = None):
+    """A local stand-in of the browser MCP server. `stats["sessions"]` counts the opened MCP sessions."""
+    mcp = FastMCP("browser-standin")
+
+    @mcp.tool()
+    def go_to_url(url: str) -> list[TextContent]:
+        """Navigate to url."""
+        return [TextContent(type="text", text=f"navigated to {url}"), TextContent(type="text", text=f"state: {url}")]
+
+    @mcp.tool()
+    def scroll_down() -> str:
+        """Scroll down."""
+        return "scrolled"
+
+    app = mcp.streamable_http_app()
+    if stats is None:
+        return app
+
+    async def counting_app(scope, receive, send):
+        if scope["type"] != "http" or any(name == b"mcp-session-id" for name, _ in scope["headers"]):
+            return await app(scope, receive, send)
+
+        async def counting_send(message):
+            # a response with a session id to a request without one opens a new session
+            if message["type"] == "http.response.start" and any(
+                name == b"mcp-session-id" for name, _ in message.get("headers", [])
+            ):
+                stats["sessions"] = stats.get("sessions", 0) + 1
+            await send(message)
+
+        await app(scope, receive, counting_send)
+
+    return counting_app
+
+
+@contextlib.asynccontextmanager
+async def serve(port: int = 0, stats: dict | None = None):
+    server = uvicorn.Server(uvicorn.Config(create_standin_app(stats), port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}/mcp/", port
+    finally:
+        server.should_exit = True
+        await task
+
+
+async def test_session_pool_benchmark():
+    n = 20
+    stats = {"sessions": 0}
+    async with serve(stats=stats) as (url, _):
+        start = time.perf_counter()
+        for i in range(n):
+            async with MCPClient.get_mcp_client(url) as client:
+                await client.call_tool("go_to_url", {"url": f"https://example.com/{i}"})
+        per_call_session = (time.perf_counter() - start) / n
+        per_call_sessions, stats["sessions"] = stats["sessions"], 0
+
+        pool = MCPSessionPool(heartbeat_interval=0)
+        session = pool.get(url)
+        await session.call_tool("scroll_down")  # connect
+        start = time.perf_counter()
+        for i in range(n):
+            res = await session.call_tool("go_to_url", {"url": f"https://example.com/{i}"})
+        persistent = (time.perf_counter() - start) / n
+        await pool.shutdown()
+    print(f"per-action latency: {per_call_session * 1000:.1f}ms per-call session, {persistent * 1000:.1f}ms persistent")
+    assert res.content[0].text == f"navigated to https://example.com/{n - 1}"
+    assert session.stats == {"connects": 1, "reconnects": 0, "calls": n + 1}
+    assert per_call_sessions == n and stats["sessions"] == 1
+
+
+async def test_session_reconnect_and_heartbeat():
+    pool = MCPSessionPool(heartbeat_interval=0.2)
+    async with serve() as (url, port):
+        session = pool.get(url)
+        assert (await session.call_tool("scroll_down")).content[0].text == "scrolled"
+    # the server restarts and forgets the session: a new session is opened transparently
+    async with serve(port) as (url, _):
+        assert (await session.call_tool("scroll_down")).content[0].text == "scrolled"
+        assert session.stats["connects"] == 2
+        assert (await session.call_tool("unknown_tool")).isError  # tool errors keep the session
+        assert session.stats["connects"] == 2 and session.connected
+    # the heartbeat drops the dead session
+    await asyncio.sleep(0.6)
+    assert not session.connected
+    await pool.shutdown()
+
+
+async def test_session_pool_eviction():
+    pool = MCPSessionPool(max_sessions=2, heartbeat_interval=0)
+    async with serve() as (url, _):
+        urls = [url, url.replace("127.0.0.1", "localhost"), url.rstrip("/")]
+        for u in urls:
+            await pool.get(u).list_tools()
+        assert list(pool._sessions) == urls[1:]
+        await pool.shutdown()
+
+
+async def test_browser_env(monkeypatch):
+    class StandinDockerManager:
+        async def start_container(self, trace_id: str) -> dict:
+            return {"mcp_url": url}
+
+        async def stop_container(self, trace_id: str) -> dict:
+            return {"success": True}
+
+    monkeypatch.setattr(browser_env, "get_docker_manager", lambda **kwargs: StandinDockerManager())
+    async with serve() as (url, _):
+        async with BrowserEnv("test", {"mcp_heartbeat_interval": 0}) as env:
+            tools = {tool.name: tool for tool in await env.get_tools()}
+            assert set(tools) == {"go_to_url", "scroll_down"}
+            for i in range(3):
+                res = await tools["go_to_url"].on_invoke_tool(None, f'{{"url": "https://example.com/{i}"}}')
+            assert res == "navigated to https://example.com/2" and env.get_state() == "state: https://example.com/2"
+            assert env.session_pool.get(url).stats["connects"] == 1
+        assert url not in env.session_pool._sessions
+        session = get_mcp_session_pool().get(url)
+        await session.list_tools()
+        await shutdown_mcp_session_pool()
+        assert not session.connected and get_mcp_session_pool() is not env.session_pool
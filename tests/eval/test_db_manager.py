@@ -1,7 +1,9 @@
+import gc
 import uuid
 
-from utu.config import ConfigLoader
+from utu.config import ConfigLoader, EvalConfig
 from utu.eval import DBDataManager
+from utu.eval.data import EvaluationSample
 
 config = ConfigLoader.load_eval_config("ww")
 config.exp_id = f"test_{uuid.uuid4()}"  # ensure unique
@@ -16,3 +18,42 @@ async def test_db_manager():
     print(f"Get {len(data_state1)} samples from `init` stage")
     data_state2 = db_manager.get_samples("rollout")
     print(f"Get {len(data_state2)} samples from `rollout` stage")
+
+
+async def test_db_manager_buffered_save_and_iter():
+    config = EvalConfig(exp_id=f"test_{uuid.uuid4()}", db_write_batch_size=8, db_write_interval=3600)
+    manager = DBDataManager(config)
+    samples = [EvaluationSample(exp_id=config.exp_id, dataset_index=i, trajectories="x" * 100) for i in range(20)]
+    for sample in samples:
+        manager.save(sample)
+    assert len(manager._new_samples) == 4  # 2 batches of 8 are written
+    for sample in samples[:5]:
+        sample.update(stage="rollout")
+        manager.save(sample)
+    # reads flush the buffer first
+    assert len(manager.get_samples("rollout")) == 5
+    # saves of another copy of a written row replace the buffered one
+    copy = manager.get_samples()[0]
+    copy.update(stage="judged")
+    manager.save([samples[0], copy])
+    assert len(manager._buffer) == 1
+    assert [s.dataset_index for s in manager.get_samples("judged")] == [0]
+    streamed = list(manager.iter_samples(columns=["correct"], page_size=3))
+    assert [s.dataset_index for s in streamed] == list(range(20))
+    assert "trajectories" not in streamed[0].__dict__  # heavy column skipped
+    manager.delete_samples(manager.get_samples())
+
+
+async def test_db_manager_flush_on_exit():
+    config = EvalConfig(exp_id=f"test_{uuid.uuid4()}", db_write_batch_size=8, db_write_interval=3600)
+    with DBDataManager(config) as manager:
+        manager.save([EvaluationSample(exp_id=config.exp_id, dataset_index=i) for i in range(3)])
+    assert len(DBDataManager(config).get_samples()) == 3
+    # buffered samples are written when the manager is garbage collected
+    manager = DBDataManager(config)
+    manager.save(EvaluationSample(exp_id=config.exp_id, dataset_index=3))
+    del manager
+    gc.collect()
+    manager = DBDataManager(config)
+    assert len(manager.get_samples()) == 4
+    manager.delete_samples(manager.get_samples())
@@ -0,0 +1,91 @@
+import json
+import uuid
+
+from utu.config import EvalConfig
+from utu.eval.data import EvaluationSample
+from utu.eval.processer.base_llm_processor import BaseLLMJudgeProcesser
+from utu.eval.processer.web_walker import WebWalkerQAProcesser
+
+
+class MockJudgeClient:
+    """Judge client that records queries and judges `response == correct_answer` in batch format."""
+
+    def __init__(self, batch_reply: bool = True, reply: str | None = None) -> None:
+        self.default_config = {"model": f"mock-judge-{uuid.uuid4()}"}
+        self.batch_reply = batch_reply
+        self.reply = reply or "extracted_final_answer: a\nreasoning: mock\ncorrect: yes\nconfidence: 90"
+        self.num_queries = 0
+
+    async def query_one(self, messages: list, **kwargs) -> str:
+        self.num_queries += 1
+        prompt = messages[-1]["content"]
+        if "## Item" in prompt and self.batch_reply:
+            verdicts = [{"id": i, "correct": True, "reasoning": "mock"} for i in range(prompt.count("## Item"))]
+            return f"```json\n{json.dumps(verdicts)}\n```"
+        return self.reply
+
+
+def _get_processer(
+    batch_reply: bool = True, reply: str | None = None, processer_cls: type = BaseLLMJudgeProcesser
+) -> BaseLLMJudgeProcesser:
+    processer = processer_cls(EvalConfig(judge_cache=True))
+    processer.judge_client = MockJudgeClient(batch_reply=batch_reply, reply=reply)
+    return processer
+
+
+def _get_samples(n: int) -> list[EvaluationSample]:
+    return [
+        EvaluationSample(raw_question=f"q{i}", response=f"r{i}", correct_answer=f"a{i}", source="default")
+        for i in range(n)
+    ]
+
+
+async def test_judge_one_cached():
+    processer = _get_processer()
+    await processer.judge_one(_get_samples(1)[0])
+    sample = await processer.judge_one(_get_samples(1)[0])
+    assert processer.judge_client.num_queries == 1
+    assert sample.correct and sample.confidence == 90
+
+
+async def test_judge_cache_keyed_by_model_params():
+    processer = _get_processer()
+    await processer.judge_one(_get_samples(1)[0])
+    # another sampling config of the same judge model does not reuse the verdict
+    processer.config.judge_model.model_params.temperature = 0.7
+    await processer.judge_one(_get_samples(1)[0])
+    assert processer.judge_client.num_queries == 2
+
+
+async def test_judge_batch():
+    processer = _get_processer()
+    samples = await processer.judge_batch(_get_samples(4))
+    assert processer.judge_client.num_queries == 1
+    assert all(s.correct for s in samples)
+    # verdicts cached by batched judging are reused
+    await processer.judge_batch(_get_samples(4))
+    assert processer.judge_client.num_queries == 1
+
+
+async def test_judge_batch_fallback():
+    processer = _get_processer(batch_reply=False)
+    samples = await processer.judge_batch(_get_samples(3))
+    # 1 failed batch request + 3 single requests
+    assert processer.judge_client.num_queries == 4
+    assert all(s.correct for s in samples)
+
+
+async def test_judge_one_unparsed_not_cached():
+    processer = _get_processer(reply="I am not sure.")
+    sample = await processer.judge_one(_get_samples(1)[0])
+    assert sample.correct is False
+    await processer.judge_one(_get_samples(1)[0])
+    assert processer.judge_client.num_queries == 2
+
+
+async def test_judge_batch_custom_source():
+    # sources with their own judge template & parser are judged one by one
+    processer = _get_processer(reply="EXPLANATION: mock\nGRADE: CORRECT", processer_cls=WebWalkerQAProcesser)
+    samples = await processer.judge_batch(_get_samples(3))
+    assert processer.judge_client.num_queries == 3
+    assert all(s.correct for s in samples)
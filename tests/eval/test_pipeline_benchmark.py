@@ -0,0 +1,47 @@
+import asyncio
+import uuid
+
+from utu.config import EvalConfig
+from utu.config.eval_config import DataConfig
+from utu.db import DatasetSample
+from utu.eval import BaseBenchmark
+from utu.eval.data import EvaluationSample
+from utu.utils import SQLModelUtils
+
+
+class MockBenchmark(BaseBenchmark):
+    """Benchmark with mocked rollout & judge, records the order of events."""
+
+    def __init__(self, config: EvalConfig) -> None:
+        super().__init__(config)
+        self.events = []
+
+    async def rollout_one(self, sample: EvaluationSample) -> EvaluationSample:
+        await asyncio.sleep(0.05 * sample.dataset_index)  # long-tail rollouts
+        sample.update(response=str(sample.dataset_index), stage="rollout")
+        self.dataset.save(sample)
+        self.events.append(("rollout", sample.dataset_index))
+        return sample
+
+    async def judge_one(self, sample: EvaluationSample) -> EvaluationSample:
+        sample.update(correct=sample.dataset_index % 2 == 0, stage="judged")
+        self.dataset.save(sample)
+        self.events.append(("judge", sample.dataset_index))
+        return sample
+
+
+async def test_rollout_and_judge():
+    dataset = f"test_pipeline_{uuid.uuid4()}"
+    with SQLModelUtils.create_session() as session:
+        session.add_all([DatasetSample(dataset=dataset, index=i, question=f"q{i}") for i in range(6)])
+        session.commit()
+    config = EvalConfig(exp_id=dataset, data=DataConfig(dataset=dataset), concurrency=6, judge_concurrency=2)
+    benchmark = MockBenchmark(config)
+
+    results = await benchmark.rollout_and_judge()
+    assert len(results) == 6
+    # the first sample is judged before the long-tail rollouts finish
+    assert benchmark.events.index(("judge", 0)) < benchmark.events.index(("rollout", 5))
+    judged = benchmark.dataset.get_samples(stage="judged")
+    assert sum(s.correct for s in judged) == 3
+    await benchmark.cleanup()
@@ -41,3 +41,29 @@ def test_load_eval_config():
     config = ConfigLoader.load_eval_config("ww")
     config = ConfigLoader.load_eval_config("gaia")
     print(json.dumps(config.model_dump(), indent=2))
+
+
+def test_config_cache(tmp_path):
+    config = ConfigLoader.load_agent_config("simple/base")
+    config.agent.name = "modified"
+    # cached configs are returned as new copies
+    assert ConfigLoader.load_agent_config("simple/base").agent.name != "modified"
+
+    snapshot = tmp_path / "config_snapshot.json"
+    assert ConfigLoader.precompile(snapshot) > 0
+    ConfigLoader.clear_cache()
+    ConfigLoader.load_snapshot(snapshot)
+    assert ("agents/simple/base", ConfigLoader.config_path) in ConfigLoader._cache
+    assert ConfigLoader.load_agent_config("simple/base") == ConfigLoader.load_agent_config("simple/base")
+
+
+def test_config_snapshot_without_secrets(tmp_path, monkeypatch):
+    monkeypatch.setenv("UTU_LLM_MODEL", "secret-model")
+    snapshot = tmp_path / "config_snapshot.json"
+    ConfigLoader.precompile(snapshot)
+    assert "secret-model" not in snapshot.read_text()
+    ConfigLoader.clear_cache()
+    ConfigLoader.load_snapshot(snapshot)
+    # env vars are resolved on load
+    monkeypatch.setenv("UTU_LLM_MODEL", "another-model")
+    assert ConfigLoader.load_model_config("base").model_provider.model == "another-model"
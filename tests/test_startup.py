@@ -0,0 +1,40 @@
+"""Guard the cold-import cost of `import utu`, measured with `python -X importtime` in a fresh interpreter."""
+
+import os
+import subprocess
+import sys
+
+# cumulative import time budget of the `utu` package, override for slow machines
+IMPORT_BUDGET_MS = float(os.getenv("UTU_IMPORT_BUDGET_MS", "2500"))
+# heavy packages that should only be imported when a toolkit / feature actually uses them
+LAZY_MODULES = ["pandas", "matplotlib", "IPython", "pexpect", "phoenix", "opentelemetry.sdk"]
+
+
+def _importtime(statement: str) -> dict[str, float]:
+    """Return {module: cumulative import time in ms}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative) / 1000
+    return times
+
+
+def test_import_utu_budget():
+    times = _importtime("import utu")
+    print(f"`import utu` takes {times['utu']:.0f} ms")
+    assert times["utu"] < IMPORT_BUDGET_MS, f"`import utu` takes {times['utu']:.0f} ms > {IMPORT_BUDGET_MS} ms"
+
+
+def test_lazy_imports():
+    times = _importtime("import utu.agents, utu.tools")
+    imported = [m for m in LAZY_MODULES if m in times]
+    assert not imported, f"{imported} should not be imported by `import utu.agents, utu.tools`"
+
+    # toolkits are resolved by name on demand
+    times = _importtime("from utu.tools import TOOLKIT_MAP; TOOLKIT_MAP['python_executor']")
+    assert "matplotlib" in times
@@ -1,7 +1,10 @@
+import asyncio
+
 import pytest
 
 from utu.config import ConfigLoader
 from utu.tools import BashToolkit
+from utu.tools.bash_shell_pool import BashShell
 from utu.utils import DIR_ROOT
 
 
@@ -17,3 +20,48 @@ async def test_run_bash(bash_toolkit: BashToolkit):
     print(result)
     result = await bash_toolkit.run_bash("wget https://www.gnu.org/software/wget/manual/wget.html -O wget.html")
     print(result)
+
+
+def _make_toolkit(tmp_path, **config) -> BashToolkit:
+    return BashToolkit(config={"workspace_root": str(tmp_path), "timeout": 2, **config})
+
+
+async def test_bash_session(tmp_path):
+    toolkit = _make_toolkit(tmp_path, max_output_chars=1000)
+    await toolkit.run_bash("export FOO=bar && mkdir -p sub && cd sub")
+    assert "bar" in await toolkit.run_bash("echo $FOO")
+    assert str(tmp_path / "sub") in await toolkit.run_bash("pwd")
+    # huge outputs are capped
+    result = await toolkit.run_bash("seq 1 100000")
+    assert "chars truncated" in result and len(result) < 2_500
+    # timeout: the command is interrupted, the session survives
+    assert "interrupted" in await toolkit.run_bash("sleep 10")
+    assert "bar" in await toolkit.run_bash("echo $FOO")
+    # hung shell: ignores Ctrl-C, the shell is replaced
+    assert "restarted" in await toolkit.run_bash("trap '' INT; sleep 10")
+    assert str(tmp_path) in await toolkit.run_bash("pwd")
+    await toolkit.cleanup()
+
+
+async def test_bash_concurrent_sessions(tmp_path):
+    toolkits = [_make_toolkit(tmp_path / str(i)) for i in range(4)]
+    results = await asyncio.gather(*[t.run_bash(f"X={i}; sleep 0.5; echo $X-$(pwd)") for i, t in enumerate(toolkits)])
+    for i, result in enumerate(results):
+        assert f"{i}-{tmp_path / str(i)}" in result
+    for toolkit in toolkits:
+        await toolkit.cleanup()
+    # a returned shell is reset before being leased again
+    await asyncio.sleep(0.5)
+    toolkit = _make_toolkit(tmp_path)
+    assert "X=''" in await toolkit.run_bash("echo X=\\'$X\\'")
+    await toolkit.cleanup()
+
+
+async def test_bash_shell_reset(tmp_path):
+    shell = BashShell()
+    cwd = (await shell.run("pwd", timeout=2)).strip()
+    await shell.run(f"export X=1; cd {tmp_path}", timeout=2)
+    await shell.reset()
+    assert (await shell.run("echo X=$X", timeout=2)).strip() == "X="
+    assert (await shell.run("pwd", timeout=2)).strip() == cwd
+    shell.kill()
@@ -1,7 +1,10 @@
+import time
+
 import pytest
 
 from utu.config import ConfigLoader
 from utu.tools import DocumentToolkit
+from utu.tools.documents.pdf_parser import _parse_pages
 
 
 @pytest.fixture
@@ -17,3 +20,46 @@ async def test_document_toolkit(document_toolkit: DocumentToolkit):
         question=q,
     )
     print(result)
+
+
+def _make_pdf(path, num_pages: int) -> None:
+    import fitz  # pymupdf
+
+    doc = fitz.open()
+    for i in range(num_pages):
+        page = doc.new_page()
+        topic = "The X-ray time profile lasts 42 seconds." if i == 321 else f"Filler paragraph about topic {i}."
+        page.insert_text((72, 72), f"Section {i}. {topic}")
+        if i == 321:
+            page.insert_image(fitz.Rect(72, 100, 172, 200), pixmap=fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), 0))
+    doc.save(path)
+
+
+async def test_document_chunk_retrieval(tmp_path, monkeypatch):
+    import utu.tools.document_toolkit as document_toolkit_module
+
+    monkeypatch.setattr(document_toolkit_module, "CACHE_DIR", tmp_path / "cache")
+    pdf_path = str(tmp_path / "large.pdf")
+    _make_pdf(pdf_path, 500)
+    config = ConfigLoader.load_toolkit_config("document")
+    config.config.update({"text_limit": 5_000, "chunk_size": 500, "parse_workers": 2})
+    toolkit = DocumentToolkit(config=config)
+    toolkit.parser.cache_dir = tmp_path / "cache" / "documents"
+
+    start = time.perf_counter()
+    md5 = toolkit.handle_path(pdf_path)
+    context = await toolkit.get_document_context(md5, "How long is the X-ray time profile?")
+    first_time = time.perf_counter() - start
+    assert "42 seconds" in context and len(context) <= 5_500
+    # the image of the retrieved page is extracted, others are not
+    images = list((tmp_path / "cache" / "documents" / "images").rglob("*.png"))
+    assert [p.name for p in images] == ["page_321_img_0.png"]
+    # page-parallel parsing gives the same result as parsing in one process
+    parallel = (tmp_path / "cache" / "documents" / "parsed" / f"{md5}_{toolkit.parser_key}.md").read_text()
+    assert parallel == "".join(_parse_pages(pdf_path, 0, 500, str(toolkit.parser.get_image_dir(pdf_path))))
+
+    start = time.perf_counter()
+    context = await toolkit.get_document_context(toolkit.handle_path(pdf_path), "time profile of the X-ray?")
+    repeat_time = time.perf_counter() - start
+    print(f"first question {first_time:.3f}s, repeat question {repeat_time:.3f}s")
+    assert "42 seconds" in context and repeat_time < 0.1
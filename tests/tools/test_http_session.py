@@ -0,0 +1,108 @@
+"""Throughput of the shared session vs. a new `aiohttp.ClientSession` per request (the previous engines), against a
+local stand-in server; plus conditional revalidation."""
+
+import os
+import time
+import uuid
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from utu.tools.search.http_session import HTTPSessionPool, ValidatorStore
+from utu.tools.search.jina_crawl import JinaCrawl
+
+NUM_REQUESTS = 200
+BODY = "hello " * 1000
+
+
+async def _start_server() -> tuple[TestServer, dict]:
+    counter = {"full": 0, "not_modified": 0}
+    connections = set()  # client (host, port) of each connection
+
+    async def handle(request: web.Request) -> web.Response:
+        connections.add(request.transport.get_extra_info("peername"))
+        counter["connections"] = len(connections)
+        etag = '"v1"'
+        if request.headers.get("If-None-Match") == etag:
+            counter["not_modified"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        counter["full"] += 1
+        return web.Response(text=BODY, headers={"ETag": etag})
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle)
+    server = TestServer(app)
+    await server.start_server()
+    return server, counter
+
+
+async def test_shared_session_throughput():
+    server, counter = await _start_server()
+    url = str(server.make_url("/page"))
+    try:
+        start = time.perf_counter()
+        for _ in range(NUM_REQUESTS):
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url) as response:
+                    await response.text()
+        new_session_time = time.perf_counter() - start
+        new_session_connections = counter["connections"]
+
+        start = time.perf_counter()
+        num_requests = HTTPSessionPool.stats["requests"]
+        for _ in range(NUM_REQUESTS):
+            assert await HTTPSessionPool.request("GET", url) == BODY
+        shared_time = time.perf_counter() - start
+        shared_connections = counter["connections"] - new_session_connections
+        print(
+            f"{NUM_REQUESTS} requests: session per request {new_session_time:.3f}s "
+            f"({new_session_connections} connections), shared {shared_time:.3f}s ({shared_connections} connections)"
+        )
+        assert HTTPSessionPool.stats["requests"] - num_requests == NUM_REQUESTS
+        assert new_session_connections == NUM_REQUESTS
+        assert shared_connections == 1  # kept alive & reused
+    finally:
+        await HTTPSessionPool.aclose()
+        await server.close()
+
+
+async def test_conditional_revalidation(tmp_path, monkeypatch):
+    monkeypatch.setattr(HTTPSessionPool, "validator_store", ValidatorStore(tmp_path))
+    server, counter = await _start_server()
+    try:
+        jina_crawl = JinaCrawl(config={"crawl_cache_expire_time": 0})  # cached results expire immediately
+        jina_crawl.jina_url = str(server.make_url(""))
+        url = f"https://example.com/{uuid.uuid4().hex}"
+        assert await jina_crawl.crawl(url) == BODY
+        assert await jina_crawl.crawl(url) == BODY  # revalidated, served from the stored body
+        assert counter == {"full": 1, "not_modified": 1, "connections": 1}
+        # without expiry the crawl cache never revalidates, no body is stored
+        jina_crawl = JinaCrawl()
+        jina_crawl.jina_url = str(server.make_url(""))
+        assert await jina_crawl.crawl_jina(f"https://example.com/{uuid.uuid4().hex}") == BODY
+        assert len(list(tmp_path.glob("*.json"))) == 1
+    finally:
+        await HTTPSessionPool.aclose()
+        await server.close()
+
+
+def test_validator_store_bounds(tmp_path):
+    store = ValidatorStore(tmp_path, max_entries=3, max_age=3600, prune_every=1)
+    for i in range(5):
+        store.set(f"k{i}", {"etag": f'"{i}"', "body": str(i)})
+        os.utime(tmp_path / f"k{i}.json", (i, time.time() - 10 + i))
+    store.set("k5", {"etag": '"5"', "body": "5"})
+    assert sorted(p.stem for p in tmp_path.glob("*.json")) == ["k3", "k4", "k5"]  # oldest evicted
+    os.utime(tmp_path / "k5.json", (0, time.time() - 7200))
+    assert store.get("k5") is None and store.get("k4")["body"] == "4"  # expired
+
+
+async def test_session_config(monkeypatch):
+    monkeypatch.setattr(HTTPSessionPool, "_config", None)
+    session = HTTPSessionPool.get_session()
+    try:
+        assert session.connector.limit_per_host == 0  # no per-host cap
+        assert session.timeout.sock_connect and session.timeout.sock_read and session.timeout.total >= 300
+    finally:
+        await HTTPSessionPool.aclose()
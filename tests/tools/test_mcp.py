@@ -1,5 +1,14 @@
-from utu.config import ConfigLoader
-from utu.tools.utils import get_mcp_server, get_mcp_tools_schema
+import asyncio
+import json
+import pathlib
+import sys
+
+import pytest
+
+from utu.agents import SimpleAgent
+from utu.config import AgentConfig, ConfigLoader, ToolkitConfig
+from utu.tools.mcp_server_pool import get_mcp_server_pool, shutdown_mcp_server_pool
+from utu.tools.utils import MCPToolsCache, get_mcp_server, get_mcp_tools, get_mcp_tools_schema
 
 
 async def test_mcp():
@@ -33,3 +42,87 @@ async def test_get_mcp_tools_schema():
     tools_map = await get_mcp_tools_schema(config)
     for name, schema in tools_map.items():
         print(f"Tool: {name}, schema: {schema}")
+
+
+# ----------------------------------------------------------------------------
+STDIO_SERVER = """
+import sys
+from mcp.server.fastmcp import FastMCP
+
+with open(sys.argv[1], "a") as f:  # count the server starts
+    f.write("started\\n")
+mcp = FastMCP("standin")
+
+
+@mcp.tool()
+def echo(text: str) -> str:
+    \"\"\"Echo the text.\"\"\"
+    return text
+
+
+@mcp.tool()
+def add(a: int, b: int) -> int:
+    \"\"\"Add two numbers.\"\"\"
+    return a + b
+
+
+mcp.run()
+"""
+
+
+@pytest.fixture
+def stdio_config(tmp_path, monkeypatch) -> ToolkitConfig:
+    monkeypatch.setattr(MCPToolsCache, "cache_dir", tmp_path / "cache")
+    (tmp_path / "server.py").write_text(STDIO_SERVER)
+    return ToolkitConfig(
+        name="standin",
+        mode="mcp",
+        activated_tools=["echo"],
+        mcp_transport="stdio",
+        mcp_client_session_timeout_seconds=20,
+        config={"command": sys.executable, "args": [str(tmp_path / "server.py"), str(tmp_path / "starts.log")]},
+    )
+
+
+def num_starts(config: ToolkitConfig) -> int:
+    log = pathlib.Path(config.config["args"][1])
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+async def test_mcp_tools_cache(stdio_config: ToolkitConfig):
+    for _ in range(2):
+        tools_map = await get_mcp_tools_schema(stdio_config)
+        assert list(tools_map) == ["echo"]
+    assert num_starts(stdio_config) == 1  # the second listing is served from disk
+    # all the tools are cached, `activated_tools` is applied on read
+    assert [tool.name for tool in MCPToolsCache.get(stdio_config)] == ["echo", "add"]
+    stdio_config.activated_tools = None
+    assert len(await get_mcp_tools(stdio_config)) == 2 and num_starts(stdio_config) == 1
+
+    stdio_config.mcp_tools_cache_ttl_seconds = 1
+    with open(MCPToolsCache.cache_dir / f"{MCPToolsCache.get_key(stdio_config)}.json") as f:
+        entry = json.load(f)
+    entry["created_at"] -= 10
+    with open(MCPToolsCache.cache_dir / f"{MCPToolsCache.get_key(stdio_config)}.json", "w") as f:
+        json.dump(entry, f)
+    await get_mcp_tools(stdio_config)  # expired
+    assert num_starts(stdio_config) == 2
+
+
+async def test_mcp_server_reuse(stdio_config: ToolkitConfig):
+    stdio_config.mcp_reuse_server = True
+    config = AgentConfig(toolkits={"standin": stdio_config})
+
+    async def run_one(i: int) -> str:
+        async with SimpleAgent(config=config) as agent:
+            server = agent._mcp_servers[0]
+            assert [tool.name for tool in server._tools_list] == ["echo", "add"]  # seeded
+            res = await server.call_tool("echo", {"text": f"sample {i}"})
+            return res.content[0].text
+
+    assert await asyncio.gather(*[run_one(i) for i in range(4)]) == [f"sample {i}" for i in range(4)]
+    assert await run_one(4) == "sample 4"
+    assert num_starts(stdio_config) == 1  # one server for all the agent builds
+    pool = get_mcp_server_pool()
+    await shutdown_mcp_server_pool()
+    assert not pool._servers and get_mcp_server_pool() is not pool
@@ -0,0 +1,131 @@
+"""Throughput of the warm kernel pool vs. a fresh process per call (the previous executor), plus the kill / respawn
+and session behaviors."""
+
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from utu.tools import python_executor_toolkit
+from utu.tools.python_executor_toolkit import PythonExecutorToolkit
+from utu.tools.python_kernel_pool import KernelUnavailableError, PythonKernelPool
+
+NUM_CALLS = 16
+CODE = """
+import numpy as np
+import pandas as pd
+df = pd.DataFrame({"a": np.arange(10)})
+print(df["a"].sum())
+"""
+
+
+def _run_in_fresh_process(code: str) -> None:
+    exec(code, {})
+
+
+async def test_kernel_pool_throughput(tmp_path):
+    pool = PythonKernelPool(size=4, prefork=4)
+    start_kernel = pool._start_kernel
+    num_starts = 0
+
+    async def counting_start_kernel():
+        nonlocal num_starts
+        num_starts += 1
+        return await start_kernel()
+
+    pool._start_kernel = counting_start_kernel
+    try:
+        await pool.warmup()
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *[pool.execute(CODE, str(tmp_path), timeout=30, max_memory_MB=512) for _ in range(NUM_CALLS)]
+        )
+        pool_time = time.perf_counter() - start
+        assert all(r["success"] and "45" in r["message"] for r in results)
+        assert num_starts == 4  # the prefork kernels serve all the calls, none is started per call
+        assert sum(kernel.num_runs for kernel in pool._idle) == NUM_CALLS
+    finally:
+        pool.shutdown()
+
+    ctx = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    for _ in range(4):  # extrapolated, spawning a process per call is slow
+        process = ctx.Process(target=_run_in_fresh_process, args=(CODE,))
+        process.start()
+        process.join()
+    fresh_time = (time.perf_counter() - start) / 4 * NUM_CALLS
+    print(f"{NUM_CALLS} calls: warm pool {pool_time:.2f}s, fresh process (est.) {fresh_time:.2f}s")
+
+
+async def test_kernel_pool_timeout(tmp_path):
+    pool = PythonKernelPool(size=1, prefork=1)
+    try:
+        await pool.warmup()
+        pid = pool._idle[0].process.pid
+        try:
+            await pool.execute("while True: pass", str(tmp_path), timeout=1, max_memory_MB=512)
+            raise AssertionError("should time out")
+        except TimeoutError:
+            pass
+        # the hung kernel is killed and replaced
+        result = await pool.execute("print(1 + 1)", str(tmp_path), timeout=30, max_memory_MB=512)
+        assert "2" in result["message"]
+        assert pool._idle[0].process.pid != pid
+
+        result = await pool.execute("x = bytearray(1024 ** 3)", str(tmp_path), timeout=30, max_memory_MB=64)
+        assert not result["success"] and "MemoryError" in result["error"] + result["message"]
+    finally:
+        pool.shutdown()
+
+
+async def test_kernel_pool_session(tmp_path):
+    pool = PythonKernelPool(size=2, prefork=1)
+    try:
+        await pool.execute("x = 42", str(tmp_path), timeout=30, max_memory_MB=512, session_id="s")
+        result = await pool.execute("print(x)", str(tmp_path), timeout=30, max_memory_MB=512, session_id="s")
+        assert "42" in result["message"]
+        # state is not shared outside the session
+        result = await pool.execute("print(x)", str(tmp_path), timeout=30, max_memory_MB=512)
+        assert not result["success"]
+        await pool.close_session("s")
+        assert not pool._sessions
+    finally:
+        pool.shutdown()
+
+
+async def test_kernel_pool_session_eviction(tmp_path):
+    pool = PythonKernelPool(size=1, prefork=0, session_idle_timeout=60)
+    try:
+        await pool.execute("x = 42", str(tmp_path), timeout=30, max_memory_MB=512, session_id="s")
+        # the only kernel is held by the session: wait at most `acquire_timeout` for it
+        with pytest.raises(KernelUnavailableError):
+            await pool.execute("print(1)", str(tmp_path), timeout=30, max_memory_MB=512, acquire_timeout=0.5)
+        # sessions idle for `session_idle_timeout` are evicted
+        pool.session_idle_timeout = 0
+        result = await pool.execute("print(1)", str(tmp_path), timeout=30, max_memory_MB=512)
+        assert result["success"] and not pool._sessions
+    finally:
+        pool.shutdown()
+
+
+async def test_toolkit_persistent_session(tmp_path):
+    toolkit = PythonExecutorToolkit({"persistent_session": True})
+    await toolkit.execute_python_code("y = 'persisted'", workdir=str(tmp_path), timeout=30)
+    result = await toolkit.execute_python_code("print(y)", workdir=str(tmp_path), timeout=30)
+    assert "persisted" in result["message"]
+    await toolkit.cleanup()
+
+
+async def test_toolkit_no_kernel_available(tmp_path, monkeypatch):
+    pool = PythonKernelPool(size=1, prefork=0)
+    monkeypatch.setattr(python_executor_toolkit, "get_kernel_pool", lambda *args: pool)
+    try:
+        toolkit = PythonExecutorToolkit({"persistent_session": True})
+        await toolkit.execute_python_code("x = 1", workdir=str(tmp_path), timeout=30)
+        # the only kernel is held by the session, the code is not run
+        other = PythonExecutorToolkit({"acquire_timeout": 0.5})
+        result = await other.execute_python_code("print(1)", workdir=str(tmp_path), timeout=30)
+        assert not result["success"] and "No python kernel available" in result["message"]
+    finally:
+        pool.shutdown()
@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+from utu.config import ConfigLoader
+from utu.tools import SearchToolkit
+from utu.tools.utils import canonicalize_url, merge_search_results
+
+
+def test_canonicalize_url():
+    assert canonicalize_url("https://www.Example.com/a/?utm_source=x&b=2&a=1#top") == "example.com/a?a=1&b=2"
+    assert canonicalize_url("http://example.com/a") == canonicalize_url("https://example.com/a/")
+
+
+def test_merge_search_results():
+    merged = merge_search_results(
+        [
+            [{"url": "https://a.com/1"}, {"url": "https://b.com/"}],
+            [{"url": "https://www.b.com"}, {"url": "https://c.com"}],
+        ]
+    )
+    assert [r["url"] for r in merged] == ["https://b.com/", "https://a.com/1", "https://c.com"]
+    assert merged[0]["queries"] == [1, 2]
+
+
+async def test_search_batch(monkeypatch):
+    monkeypatch.setenv("SERPER_API_KEY", "unused")
+    config = ConfigLoader.load_toolkit_config("search")
+    config.config.update({"search_concurrency": 2, "search_banned_sites": ["https://banned.com"]})
+    toolkit = SearchToolkit(config=config)
+    inflight = {"now": 0, "peak": 0, "calls": 0}
+
+    async def get_results(query: str) -> list[dict]:
+        inflight["calls"] += 1
+        inflight["now"] += 1
+        inflight["peak"] = max(inflight["peak"], inflight["now"])
+        await asyncio.sleep(0.2)
+        inflight["now"] -= 1
+        return [
+            {"title": "shared", "url": "https://shared.com/page?utm_source=search", "snippet": ""},
+            {"title": query, "url": f"https://{query}.com", "snippet": f"about {query}"},
+            {"title": "banned", "url": "https://banned.com/x", "snippet": ""},
+        ]
+
+    toolkit.search_engine.get_results = get_results
+    start = time.perf_counter()
+    result = await toolkit.search_batch(["q1", "q2", "q3", "q4"])
+    print(f"search_batch of 4 queries: {time.perf_counter() - start:.2f}s, {inflight}")
+    assert inflight["calls"] == 4 and inflight["peak"] == 2  # concurrent, under the engine limit
+    assert result.startswith("1. shared (https://shared.com/page?utm_source=search) [queries: 1, 2, 3, 4]")
+    assert result.count("shared.com") == 1 and "banned" not in result and "https://q4.com" in result
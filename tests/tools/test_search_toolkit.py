@@ -97,3 +97,36 @@ async def test_web_qa(search_toolkit: SearchToolkit):
         print(f"query: {q}")
         result = await search_toolkit.web_qa(*q)
         print(f"result: {result}")
+
+
+async def test_web_qa_chunked(monkeypatch):
+    class RecordingLLM:
+        def __init__(self):
+            self.prompts = []
+
+        async def query_one(self, messages, **kwargs):
+            self.prompts.append(messages[0]["content"])
+            return f"answer {len(self.prompts)}"
+
+    monkeypatch.setenv("SERPER_API_KEY", "unused")
+    config = ConfigLoader.load_toolkit_config("search")
+    config.config.update({"search_engine": "google", "web_qa_mode": "chunked", "web_qa_chunk_tokens": 500})
+    toolkit = SearchToolkit(config=config)
+    toolkit.llm = RecordingLLM()
+    paragraphs = [f"Paragraph {i} about gardening and weather. " * 20 for i in range(100)]
+    paragraphs[42] = "The Eiffel Tower is 330 metres tall. " * 5
+    paragraphs.append("[Eiffel Tower facts](https://example.com/eiffel)")
+    content = "\n\n".join(paragraphs)
+
+    async def crawl(url: str) -> str:
+        return content
+
+    toolkit.crawl_engine.crawl = crawl
+
+    result = await toolkit.web_qa("https://example.com", "How tall is the Eiffel Tower?")
+    assert result.startswith("Summary: answer")
+    qa_prompts = [p for p in toolkit.llm.prompts if "Eiffel Tower is 330" in p]
+    assert qa_prompts and all(len(p) < len(content) / 4 for p in toolkit.llm.prompts)
+    link_prompt = next(p for p in toolkit.llm.prompts if "relevant links" in p)
+    assert "https://example.com/eiffel" in link_prompt and "gardening" not in link_prompt
+    assert toolkit.web_qa_stats["tokens_saved"] > toolkit.web_qa_stats["content_tokens"]
@@ -0,0 +1,41 @@
+import time
+
+import pandas as pd
+
+from utu.tools.tabular_data_toolkit import TabularDataToolkit
+
+
+def test_get_tabular_columns(tmp_path, monkeypatch):
+    file_path = tmp_path / "large.csv"
+    pd.DataFrame({"id": range(1_000_000), "name": ["x"] * 1_000_000, "score": [0.5] * 1_000_000}).to_csv(
+        file_path, index=False
+    )
+    toolkit = TabularDataToolkit()
+    load_tabular_data = TabularDataToolkit._load_tabular_data
+    rows_read = []
+
+    def counting_load(file_path: str, nrows: int | None = None) -> pd.DataFrame:
+        df = load_tabular_data(file_path, nrows=nrows)
+        rows_read.append(len(df))
+        return df
+
+    monkeypatch.setattr(TabularDataToolkit, "_load_tabular_data", staticmethod(counting_load))
+
+    start = time.perf_counter()
+    sampled = toolkit.get_tabular_columns(str(file_path))
+    sampled_time = time.perf_counter() - start
+    start = time.perf_counter()
+    df = toolkit._load_tabular_data(str(file_path))
+    full_time = time.perf_counter() - start
+    print(f"sampled schema {sampled_time:.3f}s, full load {full_time:.3f}s")
+    assert rows_read == [toolkit.sample_rows, 1_000_000]  # only a sample is read for the schema
+    assert '"column_name": "score", "type": "float64", "sample": "0.5"' in sampled
+    assert len(df) == 1_000_000
+
+    # cached, and shared by other toolkit instances
+    assert TabularDataToolkit().get_tabular_columns(str(file_path)) == sampled
+    assert len(rows_read) == 2  # not read again
+    assert TabularDataToolkit._infer_columns.cache_info().hits >= 1
+    # invalidated when the file changes
+    pd.DataFrame({"other": [1]}).to_csv(file_path, index=False)
+    assert "other" in toolkit.get_tabular_columns(str(file_path))
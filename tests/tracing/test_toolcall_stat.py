@@ -0,0 +1,48 @@
+import asyncio
+
+from agents import Agent, FunctionTool, RunContextWrapper
+from agents.tool_context import ToolContext
+
+from utu.tracing import ToolCallStatRunHook
+
+agent = Agent(name="dummy")
+
+
+def make_tool(name: str) -> FunctionTool:
+    return FunctionTool(name=name, description="", params_json_schema={}, on_invoke_tool=None)
+
+
+async def test_toolcall_stat():
+    flushed = []
+    hook = ToolCallStatRunHook(
+        run_id="test", flush_interval=0, exporter=lambda run_id, stats: flushed.append(stats), save_to_db=False
+    )
+    search, crawl = make_tool("search"), make_tool("crawl")
+
+    async def call(tool: FunctionTool, call_id: str, result: str, delay: float):
+        context = ToolContext(context=None, tool_name=tool.name, tool_call_id=call_id)
+        await hook.on_tool_start(context, agent, tool)
+        await asyncio.sleep(delay)
+        await hook.on_tool_end(context, agent, tool, result)
+
+    await asyncio.gather(
+        call(search, "call_1", "result", 0.02),
+        call(search, "call_2", "An error occurred while running the tool. Please try again. Error: xxx", 0.01),
+        call(crawl, "call_3", "x" * 100, 0.2),
+    )
+    await hook.aflush()
+
+    summary = hook.summary()
+    print(summary)
+    assert list(summary.keys()) == ["crawl", "search"]  # sorted by total latency
+    assert summary["search"]["count"] == 2
+    assert summary["search"]["error_rate"] == 0.5
+    assert summary["crawl"]["max_output_size"] == 100
+    assert summary["crawl"]["latency_histogram"] == {"le_0.5s": 1}
+    assert sum(stat.count for stats in flushed for stat in stats.values()) == 3
+
+
+async def test_toolcall_stat_without_start():
+    hook = ToolCallStatRunHook(save_to_db=False)
+    await hook.on_tool_end(RunContextWrapper(context=None), agent, make_tool("search"), "result")
+    assert hook.summary() == {}
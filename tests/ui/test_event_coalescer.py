@@ -0,0 +1,143 @@
+import asyncio
+import json
+import time
+
+import tornado.web
+import tornado.websocket
+
+from utu.ui.common import Event, TextDeltaContent
+from utu.ui.event_coalescer import EventCoalescer
+
+
+def record_events() -> list[Event]:
+    """A recorded stream of a reasoning model: reasoning & text in tiny deltas, with a tool call in between."""
+    events = [Event(type="new", data={"type": "new", "name": "SearchAgent"})]
+    for turn in range(2):
+        events.append(Event(type="raw", data=TextDeltaContent(type="reason", delta="", inprogress=True)))
+        events += [
+            Event(type="raw", data=TextDeltaContent(type="reason", delta=f"r{i % 10}", inprogress=True))
+            for i in range(1500)
+        ]
+        events.append(Event(type="raw", data=TextDeltaContent(type="reason", delta="", inprogress=False)))
+        if turn == 0:
+            events.append(
+                Event(
+                    type="raw",
+                    data=TextDeltaContent(
+                        type="tool_call", delta="search", argument="{}", callid="c1", inprogress=True
+                    ),
+                )
+            )
+            events.append(
+                Event(
+                    type="raw",
+                    data=TextDeltaContent(type="tool_call_output", delta="results", callid="c1", inprogress=False),
+                )
+            )
+    events.append(Event(type="raw", data=TextDeltaContent(type="text", delta="", inprogress=True)))
+    events += [
+        Event(type="raw", data=TextDeltaContent(type="text", delta=f"t{i % 10} ", inprogress=True)) for i in range(3000)
+    ]
+    events.append(Event(type="raw", data=TextDeltaContent(type="text", delta="", inprogress=False)))
+    events.append(Event(type="finish"))
+    return events
+
+
+def reconstruct(messages: list[dict]) -> list[tuple[str, str]]:
+    """Merge consecutive deltas as the frontend renders them."""
+    rendered = []
+    for message in messages:
+        data = message.get("data") or {}
+        key = (message["type"], data.get("type"), data.get("inprogress"), data.get("callid"))
+        if rendered and rendered[-1][0] == key and key[1] in ("text", "reason") and key[2]:
+            rendered[-1] = (key, rendered[-1][1] + data["delta"])
+        else:
+            rendered.append((key, data.get("delta", "")))
+    return [(key[1] or key[0], text) for key, text in rendered]
+
+
+class ReplayHandler(tornado.websocket.WebSocketHandler):
+    def initialize(self, events: list[Event], coalesce: bool):
+        self.events = events
+        self.coalesce = coalesce
+
+    async def open(self):
+        coalescer = EventCoalescer(self.write_message) if self.coalesce else None
+        for i, event in enumerate(self.events):
+            if coalescer:
+                coalescer.put(event.model_copy(deep=True))
+            else:
+                self.write_message(event.model_dump())
+            if i % 20 == 0:
+                await asyncio.sleep(0.001)  # the model streams ~20 deltas per ms
+        if coalescer:
+            await coalescer.drain()
+            coalescer.close()
+
+
+async def replay(port: int, events: list[Event], coalesce: bool) -> tuple[list[dict], float]:
+    app = tornado.web.Application([(r"/ws", ReplayHandler, {"events": events, "coalesce": coalesce})])
+    server = app.listen(port, address="127.0.0.1")
+    try:
+        start = time.perf_counter()
+        conn = await tornado.websocket.websocket_connect(f"ws://127.0.0.1:{port}/ws")
+        messages = []
+        while True:
+            message = json.loads(await conn.read_message())
+            messages.append(message)
+            if message["type"] == "finish":
+                break
+        elapsed = time.perf_counter() - start
+        conn.close()
+        return messages, elapsed
+    finally:
+        server.stop()
+
+
+async def test_replay_recorded_events():
+    events = record_events()
+    expected = reconstruct([e.model_dump() for e in events])
+    raw_messages, raw_elapsed = await replay(18931, events, coalesce=False)
+    messages, elapsed = await replay(18932, events, coalesce=True)
+    print(
+        f"{len(events)} events: {len(raw_messages)} messages in {raw_elapsed:.2f}s without coalescing, "
+        f"{len(messages)} messages in {elapsed:.2f}s with coalescing"
+    )
+    assert reconstruct(raw_messages) == expected
+    assert reconstruct(messages) == expected  # same content & order
+    assert len(messages) < len(raw_messages) / 20
+
+
+async def test_slow_client():
+    written = []
+
+    async def slow_write(message: dict):
+        await asyncio.sleep(0.01)  # e.g. a client on a slow network
+        written.append(message)
+
+    events = record_events()
+    coalescer = EventCoalescer(slow_write, flush_interval=0.001)
+    for event in events:
+        coalescer.put(event)
+        await asyncio.sleep(0)
+    await coalescer.drain()
+    coalescer.close()
+    print(f"slow client: {coalescer.stats}")
+    assert reconstruct(written) == reconstruct([e.model_dump() for e in record_events()])
+    assert len(written) < 50  # merged while the writes are pending
+
+
+async def test_stalled_client():
+    stalled = asyncio.Event()
+    coalescer = EventCoalescer(
+        lambda message: asyncio.get_running_loop().create_future(),  # never flushed
+        flush_interval=0,
+        max_backlog_size=1000,
+        on_stalled=stalled.set,
+    )
+    for i in range(1000):
+        coalescer.put(Event(type="raw", data=TextDeltaContent(type="text", delta=f"t{i} ", inprogress=True)))
+        await asyncio.sleep(0)
+    assert stalled.is_set()
+    coalescer.put(Event(type="finish"))  # ignored
+    assert coalescer.stats["events"] < 1000
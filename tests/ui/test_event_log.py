@@ -0,0 +1,113 @@
+import asyncio
+import pickle
+from functools import partial
+from types import SimpleNamespace
+
+import pytest
+
+from scripts.utils import replay_server
+from scripts.utils.merge_stream_events import merged_event_stream, save_events
+from scripts.utils.replay_server import ReplayWebSocketHandler, replay_events
+from utu.ui.common import Event, TextDeltaContent
+from utu.ui.event_coalescer import EventCoalescer
+from utu.ui.event_log import EventLogWriter, read_event_log
+
+
+def make_events(num_deltas: int = 3000) -> list[Event]:
+    events = [Event(type="raw", data=TextDeltaContent(type="text", delta="", inprogress=True))]
+    events += [
+        Event(type="raw", data=TextDeltaContent(type="text", delta=f"token{i % 50} ", inprogress=True))
+        for i in range(num_deltas)
+    ]
+    events.append(Event(type="raw", data=TextDeltaContent(type="text", delta="", inprogress=False)))
+    events.append(Event(type="finish"))
+    return events
+
+
+def test_event_log(tmp_path):
+    events = make_events()
+    path = tmp_path / "events.evlog.zst"
+    with EventLogWriter(path, flush_every=100) as writer:
+        for i, event in enumerate(events):
+            writer.write(event, timestamp=i * 0.01)
+            if i == 1000:  # readable while being written, up to the last flushed block
+                records = list(read_event_log(path))
+                assert 900 <= len(records) <= 1001
+                assert [r["event"] for r in records] == events[: len(records)]
+    records = read_event_log(path)
+    assert next(records) == {"timestamp": 0.0, "event": events[0]}  # lazy
+    assert [r["event"] for r in records] == events[1:]
+
+    with open(tmp_path / "events.pkl", "wb") as f:
+        pickle.dump([{"timestamp": i * 0.01, "event": e} for i, e in enumerate(events)], f)
+    size, pickle_size = path.stat().st_size, (tmp_path / "events.pkl").stat().st_size
+    print(f"{len(events)} events: {size} bytes as event log, {pickle_size} bytes as pickle")
+    assert size < pickle_size / 5
+
+    # a truncated log ends at the last complete record
+    truncated = tmp_path / "truncated.evlog.zst"
+    truncated.write_bytes(path.read_bytes()[: size // 2])
+    records = list(read_event_log(truncated))
+    assert 0 < len(records) < len(events)
+    assert [r["event"] for r in records] == events[: len(records)]
+
+
+def test_merge_stream_events(tmp_path):
+    events = make_events()
+    path = tmp_path / "events.evlog.zst"
+    with EventLogWriter(path) as writer:
+        for i, event in enumerate(events):
+            writer.write(event, timestamp=i * 0.01)
+    output = tmp_path / "merged.evlog.zst"
+    num_events = save_events(merged_event_stream(read_event_log(path)), str(output))
+    merged = list(read_event_log(output))
+    assert num_events == len(merged) < len(events) / 50
+    text = "".join(r["event"].data.delta for r in merged if r["event"].type == "raw")
+    assert text == "".join(e.data.delta for e in events if e.type == "raw")
+    assert merged[-1]["event"].type == "finish"
+
+
+async def test_replay_speed(monkeypatch):
+    records = [{"timestamp": i * 0.1, "event": event} for i, event in enumerate(make_events(8))]
+    sent, clock = [], {"now": 0.0, "sleeps": []}
+
+    async def send(event: Event):
+        sent.append(event)
+
+    async def fake_sleep(delay: float):
+        clock["sleeps"].append(delay)
+        clock["now"] += delay
+
+    # a fake clock, the pacing is checked without waiting
+    monkeypatch.setattr(replay_server, "asyncio", SimpleNamespace(sleep=fake_sleep))
+    monkeypatch.setattr(replay_server, "time", SimpleNamespace(monotonic=lambda: clock["now"]))
+    for speed, expected in [(1, 1.0), (4, 0.25), (0, 0)]:
+        clock["now"], clock["sleeps"] = 0.0, []
+        await replay_events(iter(records), send, speed=speed)
+        print(f"speed {speed}: {len(clock['sleeps'])} sleeps, {sum(clock['sleeps']):.2f}s")
+        assert len(clock["sleeps"]) == (len(records) - 1 if speed else 0)  # paced per record
+        assert sum(clock["sleeps"]) == pytest.approx(expected)
+    assert sent == [r["event"] for r in records] * 3
+
+
+async def test_replay_backpressure():
+    written, stalled = [], []
+
+    async def slow_write(message: dict):
+        await asyncio.sleep(0.001)
+        written.append(message)
+
+    # a big recording replayed at once, larger than the backlog the coalescer accepts
+    records = [{"timestamp": 0, "event": event} for event in make_events(3000)]
+    for record in records[1:-2]:
+        record["event"].data.delta *= 10
+    handler = SimpleNamespace(
+        coalescer=EventCoalescer(slow_write, max_backlog_size=100_000, on_stalled=lambda: stalled.append(True)),
+        num_sent=0,
+    )
+    await replay_events(iter(records), partial(ReplayWebSocketHandler.send_event, handler), speed=0)
+    await handler.coalescer.drain()
+    handler.coalescer.close()
+    assert not stalled
+    text = "".join(m["data"]["delta"] for m in written if m["type"] == "raw")
+    assert text == "".join(r["event"].data.delta for r in records if r["event"].type == "raw")
@@ -0,0 +1,56 @@
+import asyncio
+import uuid
+
+import httpx
+
+from utu.utils import OpenAIClientRegistry, SimplifiedAsyncOpenAI
+from utu.utils.openai_utils.client_registry import _SharedTransport
+
+
+class MockHandler:
+    """Hold requests until released."""
+
+    def __init__(self) -> None:
+        self.num_arrived = 0
+        self.released = asyncio.Event()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.num_arrived += 1
+        await self.released.wait()
+        return httpx.Response(
+            200,
+            json={
+                "id": "mock",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "mock",
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "ok"}}],
+            },
+        )
+
+
+def test_shared_http_client():
+    base_url = f"http://{uuid.uuid4()}.local/v1"
+    client1 = SimplifiedAsyncOpenAI(type="chat.completions", base_url=base_url, api_key="k", model="m1")
+    client2 = SimplifiedAsyncOpenAI(type="chat.completions", base_url=base_url, api_key="k", model="m2")
+    assert client1._client is client2._client
+    assert client1.default_config["model"] == "m1"
+    client3 = SimplifiedAsyncOpenAI(type="chat.completions", base_url=base_url, api_key="other", model="m1")
+    assert client3._client is not client1._client
+    assert OpenAIClientRegistry.get_client(base_url, "k") is OpenAIClientRegistry.get_client(base_url, "k")
+
+
+async def test_inflight_gauge(monkeypatch):
+    handler = MockHandler()
+    monkeypatch.setattr(_SharedTransport, "_get_transport", lambda self: httpx.MockTransport(handler))
+    base_url = f"http://{uuid.uuid4()}.local/v1"
+    client = SimplifiedAsyncOpenAI(type="chat.completions", base_url=base_url, api_key="k", model="m")
+
+    tasks = [asyncio.create_task(client.query_one(messages="hi")) for _ in range(5)]
+    while handler.num_arrived < 5:
+        await asyncio.sleep(0.01)
+    assert OpenAIClientRegistry.get_inflight()[base_url] == 5
+    handler.released.set()
+    assert await asyncio.gather(*tasks) == ["ok"] * 5
+    assert OpenAIClientRegistry.get_inflight()[base_url] == 0
+    assert OpenAIClientRegistry.get_peak_inflight()[base_url] == 5
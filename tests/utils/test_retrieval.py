@@ -0,0 +1,17 @@
+from utu.utils import BM25Index, RetrievalUtils
+
+
+def test_split_text():
+    text = "\n\n".join(f"paragraph {i} " + "x" * 300 for i in range(10)) + "\n\n" + "y" * 2_500
+    chunks = RetrievalUtils.split_text(text, chunk_size=1_000)
+    assert all(len(chunk) <= 1_000 for chunk in chunks)
+    assert "".join(chunks).replace("\n", "") == text.replace("\n", "")
+
+
+def test_bm25():
+    docs = ["the cat sat on the mat", "dogs chase cats", "X-ray time profile of 42 seconds", "量子计算的基本原理"]
+    index = BM25Index(docs)
+    assert index.search("how long is the x-ray profile", top_k=1) == [2]
+    assert index.search("量子", top_k=1) == [3]
+    assert index.search("unrelated words") == []
+    assert index.select("cat mat dogs", max_chars=40) == [0, 1]
@@ -1,4 +1,5 @@
 from ..config import AgentConfig
+from .agent_pool import AgentPool
 from .llm_agent import LLMAgent
 from .orchestra_agent import OrchestraAgent
 from .simple_agent import SimpleAgent
@@ -22,4 +23,5 @@ __all__ = [
     "LLMAgent",
     "WorkforceAgent",
     "get_agent",
+    "AgentPool",
 ]
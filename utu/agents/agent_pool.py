@@ -0,0 +1,122 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from ..utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class AgentPool:
+    """A bounded pool of built agents, so that the build cost (toolkits, MCP servers, env) is paid once per worker
+    instead of once per run.
+
+    - Agents are created & built lazily, at most `size` agents exist at the same time.
+    - Per-task state is reset when an agent is checked back in (`reset()`, or `clear_input_items()`). Note that the
+      env & toolkits of a reused agent are kept, use `max_uses=1` to build a fresh agent for every lease.
+    - Agents that raised during a lease, or have been used `max_uses` times, are cleaned up and replaced.
+
+    Usage:
+        pool = AgentPool(lambda: SimpleAgent(config=config), size=8)
+        async with pool.lease() as agent:
+            result = await agent.run(question)
+        ...
+        await pool.close()
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 1, max_uses: int | None = None) -> None:
+        """
+        Args:
+            factory (Callable): function to create a new (unbuilt) agent, e.g. `functools.partial(get_agent, config)`
+            size (int): max number of agents in the pool
+            max_uses (int, optional): recycle an agent after it has been leased this many times, None for never
+        """
+        assert size > 0, f"size must be positive, get {size}"
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._semaphore = asyncio.Semaphore(size)
+        self._num_uses: dict[int, int] = {}  # id(agent) -> number of leases
+        self._closed = False
+
+    @property
+    def num_agents(self) -> int:
+        """Number of live agents (idle + leased)."""
+        return len(self._num_uses)
+
+    async def acquire(self, trace_id: str | None = None) -> Any:
+        """Check out an agent, wait if all agents are leased.
+
+        Args:
+            trace_id (str, optional): passed to `agent.build()` if a new agent is created, e.g. to name its env
+        """
+        if self._closed:
+            raise RuntimeError("AgentPool is closed!")
+        await self._semaphore.acquire()
+        try:
+            try:
+                return self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                # holding the semaphore with no idle agent means there are less than `size` agents
+                return await self._create(trace_id)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def release(self, agent: Any, healthy: bool = True) -> None:
+        """Check in an agent. Unhealthy or worn-out agents are cleaned up instead of being reused."""
+        try:
+            self._num_uses[id(agent)] += 1
+            if self._closed or not healthy or (self.max_uses and self._num_uses[id(agent)] >= self.max_uses):
+                await self._destroy(agent)
+            else:
+                self._reset(agent)
+                self._idle.put_nowait(agent)
+        finally:
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def lease(self, trace_id: str | None = None) -> AsyncIterator[Any]:
+        """Check out an agent and check it in when done. The agent is recycled if the block raises."""
+        agent = await self.acquire(trace_id)
+        healthy = True
+        try:
+            yield agent
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            await self.release(agent, healthy=healthy)
+
+    async def close(self) -> None:
+        """Cleanup all idle agents. Leased agents are cleaned up when they are checked in."""
+        self._closed = True
+        while not self._idle.empty():
+            await self._destroy(self._idle.get_nowait())
+
+    async def _create(self, trace_id: str | None = None) -> Any:
+        agent = self.factory()
+        if hasattr(agent, "build"):
+            await (agent.build() if trace_id is None else agent.build(trace_id=trace_id))
+        self._num_uses[id(agent)] = 0
+        logger.info(f"Created agent {agent.__class__.__name__} ({self.num_agents}/{self.size})")
+        return agent
+
+    async def _destroy(self, agent: Any) -> None:
+        self._num_uses.pop(id(agent), None)
+        if not hasattr(agent, "cleanup"):
+            return
+        try:
+            await agent.cleanup()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"Error cleaning up agent {agent.__class__.__name__}: {e}")
+
+    @staticmethod
+    def _reset(agent: Any) -> None:
+        if hasattr(agent, "reset"):
+            agent.reset()
+        elif hasattr(agent, "clear_input_items"):
+            agent.clear_input_items()
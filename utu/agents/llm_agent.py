@@ -3,6 +3,7 @@ from typing import Any
 from agents import Agent, AgentOutputSchemaBase, Runner, RunResultStreaming, TResponseInputItem, trace
 
 from ..config import ModelConfigs
+from ..tracing import ensure_tracing
 from ..utils import AgentsUtils, get_logger
 from .common import TaskRecorder
 
@@ -32,17 +33,23 @@ class LLMAgent:
         logger.info(f"Set instructions for LLMAgent: {instructions[:50]}...")
         self.agent.instructions = instructions
 
-    async def run(self, input: str | list[TResponseInputItem], trace_id: str = None) -> TaskRecorder:
+    async def run(
+        self, input: str | list[TResponseInputItem], trace_id: str = None, instructions: str = None
+    ) -> TaskRecorder:
+        """Run the model. `instructions` overrides the agent instructions for this run only, unlike
+        `set_instructions` it is safe for concurrent runs."""
         # TODO: customized the agent name
         trace_id = trace_id or AgentsUtils.gen_trace_id()
         task_recorder = TaskRecorder(input, trace_id)
+        agent = self.agent if instructions is None else self.agent.clone(instructions=instructions)
 
         if AgentsUtils.get_current_trace():
-            run_result = await Runner.run(self.agent, input)
+            run_result = await Runner.run(agent, input)
         else:
             trace_id = trace_id or AgentsUtils.gen_trace_id()
+            ensure_tracing()
             with trace(workflow_name="llm_agent", trace_id=trace_id):
-                run_result = await Runner.run(self.agent, input)
+                run_result = await Runner.run(agent, input)
         task_recorder.add_run_result(run_result)
         task_recorder.set_final_output(run_result.final_output)
         return task_recorder
@@ -52,5 +59,6 @@ class LLMAgent:
             return Runner.run_streamed(self.agent, input)
         else:
             trace_id = trace_id or AgentsUtils.gen_trace_id()
+            ensure_tracing()
             with trace(workflow_name="llm_agent", trace_id=trace_id):
                 return Runner.run_streamed(self.agent, input)
@@ -1,4 +1,12 @@
-from .common import AnalysisResult, CreatePlanResult, OrchestraStreamEvent, OrchestraTaskRecorder, Subtask, WorkerResult
+from .common import (
+    AnalysisResult,
+    CreatePlanResult,
+    OrchestraStreamEvent,
+    OrchestraSubtaskEvent,
+    OrchestraTaskRecorder,
+    Subtask,
+    WorkerResult,
+)
 from .planner import PlannerAgent
 from .reporter import ReporterAgent
 from .worker import SimpleWorkerAgent
@@ -12,5 +20,6 @@ __all__ = [
     "SimpleWorkerAgent",
     "OrchestraTaskRecorder",
     "OrchestraStreamEvent",
+    "OrchestraSubtaskEvent",
     "Subtask",
 ]
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from typing import Literal
 
-from agents import RunResultStreaming
+from agents import RunResultStreaming, StreamEvent
 
 from ..common import DataClassWithStreamEvents, TaskRecorder
 
@@ -21,6 +21,8 @@ class Subtask:
     agent_name: str
     task: str
     completed: bool | None = None
+    depends_on: list[int] | None = None
+    """1-based indices of the subtasks this one depends on. None for the previous subtask (sequential plan)."""
 
 
 @dataclass
@@ -28,6 +30,17 @@ class CreatePlanResult(DataClassWithStreamEvents):
     analysis: str = ""
     todo: list[Subtask] = field(default_factory=list)
 
+    def get_dependencies(self) -> list[set[int]]:
+        """0-based indices of the dependencies of each subtask. Only earlier subtasks are kept, so that the plan is a
+        DAG which can be executed in order."""
+        dependencies = []
+        for i, subtask in enumerate(self.todo):
+            if subtask.depends_on is None:
+                dependencies.append({i - 1} if i > 0 else set())
+            else:
+                dependencies.append({j - 1 for j in subtask.depends_on if 0 < j <= i})
+        return dependencies
+
     @property
     def trajectory(self):
         todos_str = []
@@ -46,6 +59,8 @@ class CreatePlanResult(DataClassWithStreamEvents):
 @dataclass
 class WorkerResult(DataClassWithStreamEvents):
     task: str = ""
+    task_id: int | None = None
+    """1-based index of the subtask in the plan"""
     output: str = ""
     trajectory: dict = field(default_factory=dict)
 
@@ -81,12 +96,18 @@ class OrchestraTaskRecorder(TaskRecorder):
         return "\n".join([f"{i}. {t.task}" for i, t in enumerate(self.plan.todo, 1)])
 
     def get_trajectory_str(self) -> str:
-        return "\n".join(
-            [
-                f"<subtask>{t.task}</subtask>\n<output>{r.output}</output>"
-                for i, (r, t) in enumerate(zip(self.task_records, self.plan.todo, strict=False), 1)
-            ]
-        )
+        # subtasks may finish out of order when run in parallel, list them in plan order
+        records = sorted(self.task_records, key=lambda r: r.task_id or 0)
+        return "\n".join([f"<subtask>{r.task}</subtask>\n<output>{r.output}</output>" for r in records])
+
+    async def stream_events(self, with_task_tags: bool = False):
+        """Stream events. Worker events are wrapped in `OrchestraSubtaskEvent` with the subtask they belong to, which
+        are unwrapped unless `with_task_tags` is set."""
+        async for event in super().stream_events():
+            if isinstance(event, OrchestraSubtaskEvent) and not with_task_tags:
+                yield event.event
+            else:
+                yield event
 
 
 @dataclass
@@ -94,3 +115,12 @@ class OrchestraStreamEvent:
     name: Literal["plan_start", "plan", "worker", "report_start", "report"]
     item: CreatePlanResult | WorkerResult | AnalysisResult | None = None
     type: Literal["orchestra_stream_event"] = "orchestra_stream_event"
+
+
+@dataclass
+class OrchestraSubtaskEvent:
+    """A stream event of the worker running the `task_id`-th (1-based) subtask."""
+
+    task_id: int
+    event: StreamEvent
+    type: Literal["orchestra_subtask_event"] = "orchestra_subtask_event"
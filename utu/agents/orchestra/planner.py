@@ -33,9 +33,12 @@ class OutputParser:
         if not match:
             return []
         plan_content = match.group(1).strip()
-        tasks = []
+        tasks = self._parse_plan_json(plan_content)
+        if tasks:
+            return tasks
         task_pattern = r'\{"agent_name":\s*"([^"]+)",\s*"task":\s*"([^"]+)",\s*"completed":\s*(true|false)\s*\}'
         task_matches = re.findall(task_pattern, plan_content, re.IGNORECASE)
+        tasks = []
         for agent_name, task_desc, completed_str in task_matches:
             completed = completed_str.lower() == "true"
             tasks.append(Subtask(agent_name=agent_name, task=task_desc, completed=completed))
@@ -43,6 +46,36 @@ class OutputParser:
         assert len(tasks) > 0, "No tasks parsed from plan"
         return tasks
 
+    def _parse_plan_json(self, plan_content: str) -> list[Subtask]:
+        """Parse the plan as a json list, with optional `depends_on` (1-based indices) in each subtask."""
+        try:
+            items = json.loads(f"[{plan_content}]")
+        except json.JSONDecodeError:
+            return []
+        tasks = []
+        for item in items:
+            if not isinstance(item, dict) or "agent_name" not in item or "task" not in item:
+                return []
+            depends_on = self._parse_depends_on(item.get("depends_on"))
+            tasks.append(
+                Subtask(
+                    agent_name=item["agent_name"],
+                    task=item["task"],
+                    completed=bool(item.get("completed", False)),
+                    depends_on=depends_on,
+                )
+            )
+        return tasks
+
+    @staticmethod
+    def _parse_depends_on(depends_on) -> list[int] | None:
+        """Accept an int, a list or a comma-separated string of indices, e.g. `2`, `[1, "2"]` or `"1, 2"`."""
+        if depends_on is None:
+            return None
+        if isinstance(depends_on, list):
+            depends_on = ",".join(str(i) for i in depends_on)
+        return [int(i) for i in re.findall(r"\d+", str(depends_on))]
+
 
 class PlannerAgent:
     def __init__(self, config: AgentConfig):
@@ -83,7 +116,9 @@ class PlannerAgent:
                 f"<plan>{json.dumps(example['plan'], ensure_ascii=False)}</plan>\n"
             )
         examples_str = "\n".join(examples_str)
-        sp = FileUtils.get_jinja_template_str(self.prompts["PLANNER_SP"]).render(planning_examples=examples_str)
+        sp = FileUtils.get_jinja_template_str(self.prompts["PLANNER_SP"]).render(
+            planning_examples=examples_str, parallel=self.config.max_parallel_subtasks > 1
+        )
         llm = LLMAgent(
             name="planner",
             instructions=sp,
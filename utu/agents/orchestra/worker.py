@@ -23,6 +23,15 @@ class SimpleWorkerAgent:
     async def build(self):
         await self.agent.build()
 
+    async def cleanup(self):
+        await self.agent.cleanup()
+
+    def clear_input_items(self):
+        self.agent.clear_input_items()
+
+    def reset(self):
+        self.agent.reset()
+
     def _format_task(self, task_recorder: OrchestraTaskRecorder, subtask: Subtask) -> str:
         str_plan = task_recorder.get_plan_str()
         str_traj = task_recorder.get_trajectory_str()
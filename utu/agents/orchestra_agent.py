@@ -1,17 +1,23 @@
 """
 - [x] support streaming for planner & reporter
+- [x] run independent subtasks in parallel (`max_parallel_subtasks`)
 """
 
 import asyncio
+from functools import partial
 
 from agents import trace
 
 from ..config import AgentConfig, ConfigLoader
+from ..tracing import ensure_tracing
 from ..utils import AgentsUtils, get_logger
+from .agent_pool import AgentPool
 from .common import QueueCompleteSentinel
 from .orchestra import (
     AnalysisResult,
     CreatePlanResult,
+    OrchestraStreamEvent,
+    OrchestraSubtaskEvent,
     OrchestraTaskRecorder,
     PlannerAgent,
     ReporterAgent,
@@ -31,17 +37,26 @@ class OrchestraAgent:
         self.config = config
         # init subagents
         self.planner_agent = PlannerAgent(config)
-        self.worker_agents = self._setup_workers()
+        self.worker_pools = self._setup_workers()
         self.reporter_agent = ReporterAgent(config)
 
+    @property
+    def max_parallel_subtasks(self) -> int:
+        return max(1, self.config.max_parallel_subtasks)
+
+    async def cleanup(self):
+        for worker_pool in self.worker_pools.values():
+            await worker_pool.close()
+
     def set_planner(self, planner: PlannerAgent):
         self.planner_agent = planner
 
-    def _setup_workers(self) -> dict[str, SimpleWorkerAgent]:
+    def _setup_workers(self) -> dict[str, AgentPool]:
+        """One pool of worker instances per worker, which are built once and reused across subtasks."""
         workers = {}
         for name, config in self.config.workers.items():
             assert config.type == "simple", f"Only support SimpleAgent as worker in orchestra agent, get {config}"
-            workers[name] = SimpleWorkerAgent(config=config)
+            workers[name] = AgentPool(partial(SimpleWorkerAgent, config=config), size=self.max_parallel_subtasks)
         return workers
 
     async def run(self, input: str, trace_id: str = None) -> OrchestraTaskRecorder:
@@ -61,22 +76,12 @@ class OrchestraAgent:
         return task_recorder
 
     async def _start_streaming(self, task_recorder: OrchestraTaskRecorder):
+        ensure_tracing()
         with trace(workflow_name="orchestra_agent", trace_id=task_recorder.trace_id):
             try:
                 await self.plan(task_recorder)
-
-                for task in task_recorder.plan.todo:
-                    # print(f"> processing {task}")
-                    worker_agent = self.worker_agents[task.agent_name]
-                    await worker_agent.build()
-                    result_streaming = worker_agent.work_streamed(task_recorder, task)
-                    async for event in result_streaming.stream.stream_events():
-                        task_recorder._event_queue.put_nowait(event)
-                    result_streaming.output = result_streaming.stream.final_output
-                    result_streaming.trajectory = AgentsUtils.get_trajectory_from_agent_result(result_streaming.stream)
-                    task_recorder.add_worker_result(result_streaming)
-                    # print(f"< processed {task}")
-
+                await self._run_subtasks(task_recorder)
+                # all the leaves are done, so are the subtasks they depend on
                 await self.report(task_recorder)
 
                 task_recorder._event_queue.put_nowait(QueueCompleteSentinel())
@@ -89,8 +94,8 @@ class OrchestraAgent:
     async def plan(self, task_recorder: OrchestraTaskRecorder) -> CreatePlanResult:
         """Step1: Plan"""
         plan = await self.planner_agent.create_plan(task_recorder)
-        assert all(t.agent_name in self.worker_agents for t in plan.todo), (
-            f"agent_name in plan.todo must be in worker_agents, get {plan.todo}"
+        assert all(t.agent_name in self.worker_pools for t in plan.todo), (
+            f"agent_name in plan.todo must be in workers, get {plan.todo}"
         )
         logger.info(f"plan: {plan}")
         task_recorder.set_plan(plan)
@@ -98,11 +103,49 @@ class OrchestraAgent:
 
     async def work(self, task_recorder: OrchestraTaskRecorder, task: Subtask) -> WorkerResult:
         """Step2: Work"""
-        worker_agent = self.worker_agents[task.agent_name]
-        result = await worker_agent.work(task_recorder, task)
+        async with self.worker_pools[task.agent_name].lease() as worker_agent:
+            result = await worker_agent.work(task_recorder, task)
         task_recorder.add_worker_result(result)
         return result
 
+    async def _run_subtasks(self, task_recorder: OrchestraTaskRecorder) -> None:
+        """Run the subtasks of the plan, each as soon as its dependencies are done, at most `max_parallel_subtasks`
+        at a time. Ready subtasks are started in plan order."""
+        todo = task_recorder.plan.todo
+        dependencies = task_recorder.plan.get_dependencies()
+        pending = list(range(len(todo)))
+        finished: set[int] = set()
+        running: dict[asyncio.Task, int] = {}
+        try:
+            while pending or running:
+                for i in [i for i in pending if dependencies[i] <= finished]:
+                    if len(running) >= self.max_parallel_subtasks:
+                        break
+                    pending.remove(i)
+                    running[asyncio.create_task(self._run_subtask(task_recorder, i + 1, todo[i]))] = i
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    i = running.pop(task)
+                    task.result()  # raise the error of the subtask
+                    finished.add(i)
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def _run_subtask(self, task_recorder: OrchestraTaskRecorder, task_id: int, task: Subtask) -> WorkerResult:
+        async with self.worker_pools[task.agent_name].lease() as worker_agent:
+            result_streaming = worker_agent.work_streamed(task_recorder, task)
+            result_streaming.task_id = task_id
+            async for event in result_streaming.stream.stream_events():
+                task_recorder._event_queue.put_nowait(OrchestraSubtaskEvent(task_id=task_id, event=event))
+            result_streaming.output = result_streaming.stream.final_output
+            result_streaming.trajectory = AgentsUtils.get_trajectory_from_agent_result(result_streaming.stream)
+        task.completed = True
+        task_recorder.add_worker_result(result_streaming)
+        task_recorder._event_queue.put_nowait(OrchestraStreamEvent(name="worker", item=result_streaming))
+        return result_streaming
+
     async def report(self, task_recorder: OrchestraTaskRecorder) -> AnalysisResult:
         """Step3: Report"""
         analysis_result = await self.reporter_agent.report(task_recorder)
@@ -24,7 +24,9 @@ from ..config import AgentConfig, ConfigLoader, ToolkitConfig
 from ..context import BaseContextManager, build_context_manager
 from ..env import BaseEnv, get_env
 from ..tools import TOOLKIT_MAP, AsyncBaseToolkit
-from ..tools.utils import get_mcp_server
+from ..tools.mcp_server_pool import get_mcp_server_pool
+from ..tools.utils import MCPToolsCache, get_mcp_server
+from ..tracing import ensure_tracing
 from ..utils import AgentsUtils, get_logger, load_class_from_file
 from .common import TaskRecorder
 
@@ -117,13 +119,18 @@ class SimpleAgent:
 
     async def cleanup(self):
         """Cleanup"""
+        if not self._initialized:
+            return
         logger.info("Cleaning up MCP servers...")
         await self._mcps_exit_stack.aclose()
         self._mcp_servers = []
         logger.info("Cleaning up tools...")
+        for toolkit in self._toolkits.values():
+            await toolkit.cleanup()
         self._toolkits = {}
         logger.info("Cleaning up env...")
         await self.env.cleanup()
+        self.context_manager.reset()  # e.g. cancel background tasks
         self._initialized = False
 
     async def get_tools(self) -> list[Tool]:
@@ -182,8 +189,14 @@ class SimpleAgent:
 
     async def _load_mcp_server(self, toolkit_config: ToolkitConfig) -> MCPServer:
         logger.info(f"Loading MCP server `{toolkit_config.name}` with params {toolkit_config.config}")
-        mcp_server = get_mcp_server(toolkit_config)
-        server = await self._mcps_exit_stack.enter_async_context(mcp_server)
+        if toolkit_config.mcp_reuse_server and toolkit_config.mcp_transport == "stdio":
+            pool = get_mcp_server_pool()
+            server = await pool.acquire(toolkit_config)
+            self._mcps_exit_stack.callback(pool.release, server)
+        else:
+            mcp_server = get_mcp_server(toolkit_config)
+            server = await self._mcps_exit_stack.enter_async_context(mcp_server)
+            await MCPToolsCache.seed_server(server, toolkit_config)
         self._mcp_servers.append(server)
         return server
 
@@ -232,9 +245,12 @@ class SimpleAgent:
         if AgentsUtils.get_current_trace():
             run_result = await Runner.run(**run_kwargs)
         else:
+            ensure_tracing()
             with trace(workflow_name="simple_agent", trace_id=trace_id):
                 run_result = await Runner.run(**run_kwargs)
 
+        if context_stats := run_result.context_wrapper.context.get("context_stats"):
+            logger.info(f"> context stats: {context_stats}")
         task_recorder = TaskRecorder(input, trace_id)
         task_recorder.add_run_result(run_result)
         task_recorder.set_final_output(run_result.final_output)
@@ -260,6 +276,7 @@ class SimpleAgent:
         if AgentsUtils.get_current_trace():
             return Runner.run_streamed(**run_kwargs)
         else:
+            ensure_tracing()
             with trace(workflow_name="simple_agent", trace_id=trace_id):
                 return Runner.run_streamed(**run_kwargs)
 
@@ -286,6 +303,16 @@ class SimpleAgent:
         # reset chat history
         self.input_items = []
 
+    def reset(self):
+        """Reset the per-task state (chat history & context manager) of a built agent before reusing it.
+
+        NOTE: the env and toolkits are kept, so their state (e.g. files in the workspace, browser pages) is carried
+        over to the next task. Build a new agent if tasks must be isolated.
+        """
+        self.clear_input_items()
+        if self.context_manager is not None:
+            self.context_manager.reset()
+
     def set_run_hooks(self, run_hooks: RunHooks):
         # WIP
         self._run_hooks = run_hooks
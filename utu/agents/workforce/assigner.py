@@ -23,9 +23,9 @@ class AssignerAgent:
         self.config = config
         self.llm = LLMAgent(model_config=config.workforce_planner_model)
 
-    async def assign_task(self, recorder: WorkspaceTaskRecorder) -> Subtask:
-        """Assigns a task to a worker node with the best capability."""
-        next_task = recorder.get_next_task()
+    async def assign_task(self, recorder: WorkspaceTaskRecorder, task: Subtask | None = None) -> Subtask:
+        """Assigns a task (the next one by default) to a worker node with the best capability."""
+        next_task = task or recorder.get_next_task()
 
         sp = PROMPTS["TASK_ASSIGN_SYS_PROMPT"].format(
             overall_task=recorder.overall_task,
@@ -36,8 +36,7 @@ class AssignerAgent:
             next_task=next_task.task_name,
             executor_agents_names=recorder.executor_agents_names,
         )
-        self.llm.set_instructions(sp)
-        assign_recorder = await self.llm.run(up)
+        assign_recorder = await self.llm.run(up, instructions=sp)  # tasks may be assigned concurrently
         recorder.add_run_result(assign_recorder.get_run_result(), "assigner")  # add assigner trajectory
 
         # parse assign result
@@ -15,6 +15,8 @@ class Subtask:
     task_result: str = None
     task_result_detailed: str = None
     assigned_agent: str = None
+    depends_on: list[int] | None = None
+    """Ids of the tasks this one depends on. None for the previous task (sequential plan)."""
 
     @property
     def formatted_with_result(self) -> str:
@@ -68,6 +70,25 @@ class WorkspaceTaskRecorder(TaskRecorder):
         new_tasks = [Subtask(task_id=task.task_id + i, task_name=t) for i, t in enumerate(updated_plan)]
         self.task_plan = finished_tasks + new_tasks
 
+    def replace_unstarted_tasks(self, updated_plan: list[str], unstarted_ids: set[int]) -> bool:
+        """Plan update of the concurrent mode: started tasks are kept, the not started ones are replaced.
+
+        Args:
+            updated_plan (list[str]): the new tasks
+            unstarted_ids (set[int]): ids of the not started tasks the update is based on. If any of them has started
+                since, the update is stale (it would run the task twice) and is not applied.
+
+        Returns:
+            bool: whether the update is applied
+        """
+        started_tasks = [task for task in self.task_plan if task.task_status != "not started"]
+        if any(task.task_id in unstarted_ids for task in started_tasks):
+            return False
+        next_id = max((task.task_id for task in started_tasks), default=0) + 1
+        new_tasks = [Subtask(task_id=next_id + i, task_name=t) for i, t in enumerate(updated_plan)]
+        self.task_plan = started_tasks + new_tasks
+        return True
+
     # -----------------------------------------------------------
     @property
     def has_uncompleted_tasks(self) -> bool:
@@ -78,6 +99,24 @@ class WorkspaceTaskRecorder(TaskRecorder):
                 return True
         return False
 
+    def get_ready_tasks(self) -> list[Subtask]:
+        """Not started tasks whose dependencies are done, in plan order. Only dependencies on earlier tasks count,
+        so that there is always a ready task until all tasks are started."""
+        ready_tasks = []
+        earlier_ids, done_ids = set(), set()
+        for i, task in enumerate(self.task_plan):
+            if task.task_status == "not started":
+                if task.depends_on is None:
+                    dependencies = {self.task_plan[i - 1].task_id} if i > 0 else set()
+                else:
+                    dependencies = set(task.depends_on) & earlier_ids
+                if dependencies <= done_ids:
+                    ready_tasks.append(task)
+            elif task.task_status != "in progress":
+                done_ids.add(task.task_id)
+            earlier_ids.add(task.task_id)
+        return ready_tasks
+
     def get_next_task(self) -> Subtask:
         assert self.task_plan is not None, "No task plan available."
         for task in self.task_plan:
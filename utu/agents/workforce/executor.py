@@ -30,6 +30,9 @@ class ExecutorAgent:
 
         self.reflection_history = []
 
+    async def cleanup(self):
+        await self.executor_agent.cleanup()
+
     async def execute_task(
         self,
         recorder: WorkspaceTaskRecorder,
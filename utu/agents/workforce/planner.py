@@ -28,22 +28,56 @@ class PlannerAgent:
             overall_task=recorder.overall_task,
             executor_agents_info=recorder.executor_agents_info,
         )
+        if self.config.max_parallel_subtasks > 1:
+            plan_prompt += PROMPTS["TASK_PLAN_PARALLEL_PROMPT"]
         plan_recorder = await self.llm.run(plan_prompt)
         recorder.add_run_result(plan_recorder.get_run_result(), "planner")  # add planner trajectory
 
-        # parse tasks
-        pattern = "<task>(.*?)</task>"
-        tasks_content: list[str] = re.findall(pattern, plan_recorder.final_output, re.DOTALL)
-        tasks_content = [task.strip() for task in tasks_content if task.strip()]
-        tasks = [Subtask(task_id=i + 1, task_name=task) for i, task in enumerate(tasks_content)]
+        # parse tasks, with optional dependencies `<task depends_on="1,2">`
+        pattern = r'<task(?:\s+depends_on="([^"]*)")?\s*>(.*?)</task>'
+        tasks = []
+        for match in re.finditer(pattern, plan_recorder.final_output, re.DOTALL):
+            depends_on, task_name = match.group(1), match.group(2).strip()
+            if not task_name:
+                continue
+            if depends_on is not None:
+                depends_on = [int(i) for i in re.findall(r"\d+", depends_on)]
+            tasks.append(Subtask(task_id=len(tasks) + 1, task_name=task_name, depends_on=depends_on))
         recorder.plan_init(tasks)
 
     async def plan_update(self, recorder: WorkspaceTaskRecorder, task: Subtask) -> str:
         """Update the task plan based on completed tasks."""
         task_plan_list = recorder.formatted_task_plan_list_with_task_results
         last_task_id = task.task_id
-        previous_task_plan = "\n".join(f"{task}" for task in task_plan_list[: last_task_id + 1])
-        unfinished_task_plan = "\n".join(f"{task}" for task in task_plan_list[last_task_id + 1 :])
+        choice, updated_plan = await self._request_plan_update(
+            recorder, task_plan_list[: last_task_id + 1], task_plan_list[last_task_id + 1 :]
+        )
+        # choice: continue, update, stop
+        if choice == "update":
+            recorder.plan_update(task, updated_plan)
+        return choice
+
+    async def propose_plan_update(self, recorder: WorkspaceTaskRecorder) -> tuple[str, list[str] | None, set[int]]:
+        """Plan update of the concurrent mode, based on all started tasks. The caller applies it at a sync point,
+        see `WorkspaceTaskRecorder.replace_unstarted_tasks`.
+
+        Returns:
+            tuple: (choice, updated plan, ids of the not started tasks the update is based on)
+        """
+        previous_tasks = [
+            task.formatted_with_result for task in recorder.task_plan if task.task_status != "not started"
+        ]
+        unstarted_tasks = [task for task in recorder.task_plan if task.task_status == "not started"]
+        choice, updated_plan = await self._request_plan_update(
+            recorder, previous_tasks, [task.formatted_with_result for task in unstarted_tasks]
+        )
+        return choice, updated_plan, {task.task_id for task in unstarted_tasks}
+
+    async def _request_plan_update(
+        self, recorder: WorkspaceTaskRecorder, previous_tasks: list[str], unfinished_tasks: list[str]
+    ) -> tuple[str, list[str] | None]:
+        previous_task_plan = "\n".join(f"{task}" for task in previous_tasks)
+        unfinished_task_plan = "\n".join(f"{task}" for task in unfinished_tasks)
 
         task_update_plan_prompt = (
             PROMPTS["TASK_UPDATE_PLAN_PROMPT"]
@@ -56,11 +90,7 @@ class PlannerAgent:
         )
         plan_update_recorder = await self.llm.run(task_update_plan_prompt)
         recorder.add_run_result(plan_update_recorder.get_run_result(), "planner")  # add planner trajectory
-        choice, updated_plan = self._parse_update_response(plan_update_recorder.final_output)
-        # choice: continue, update, stop
-        if choice == "update":
-            recorder.plan_update(task, updated_plan)
-        return choice
+        return self._parse_update_response(plan_update_recorder.final_output)
 
     def _parse_update_response(self, response: str) -> tuple[str, list[str] | None]:
         # TODO: split "stop" into "early_completion" and "task_collapse"
@@ -2,13 +2,20 @@
 - [x] setup tracing
 - [x] purify logging
 - [ ] support stream?
+- [x] concurrent mode (`max_parallel_subtasks`)
 """
 
+import asyncio
+from functools import partial
+
 from agents import trace
 
 from ..config import AgentConfig, ConfigLoader
+from ..tracing import ensure_tracing
 from ..utils import AgentsUtils, get_logger
+from .agent_pool import AgentPool
 from .workforce import AnswererAgent, AssignerAgent, ExecutorAgent, PlannerAgent, WorkspaceTaskRecorder
+from .workforce.data import Subtask
 
 logger = get_logger(__name__)
 
@@ -29,43 +36,22 @@ class WorkforceAgent:
         planner_agent = PlannerAgent(config=self.config)
         assigner_agent = AssignerAgent(config=self.config)
         answerer_agent = AnswererAgent(config=self.config)
-        executor_agent_group: dict[str, ExecutorAgent] = {}
-        for name, config in self.config.workforce_executor_agents.items():
-            executor_agent_group[name] = ExecutorAgent(config=config, workforce_config=self.config)
 
         recorder = WorkspaceTaskRecorder(
             overall_task=input, executor_agent_kwargs_list=self.config.workforce_executor_infos
         )
 
+        ensure_tracing()
         with trace(workflow_name=self.name, trace_id=trace_id):
             # * 1. generate plan
             logger.info("Generating plan...")
             await planner_agent.plan_task(recorder)
             logger.info(f"Plan: {recorder.task_plan}")
 
-            # DISCUSS: merge .get_next_task and .has_uncompleted_tasks? (while True)
-            while recorder.has_uncompleted_tasks:
-                # * 2. assign tasks
-                next_task = await assigner_agent.assign_task(recorder)
-                logger.info(f"Assign task: {next_task.task_id} assigned to {next_task.assigned_agent}")
-
-                # * 3. execute task
-                logger.info(f"Executing task: {next_task.task_id}")
-                await executor_agent_group[next_task.assigned_agent].execute_task(recorder=recorder, task=next_task)
-                logger.info(f"Task {next_task.task_id} result: {next_task.task_result}")
-                await planner_agent.plan_check(recorder, next_task)
-                logger.info(f"Task {next_task.task_id} checked: {next_task.task_status}")
-
-                # * 4. update plan
-                if not recorder.has_uncompleted_tasks:  # early stop
-                    break
-                plan_update_choice = await planner_agent.plan_update(recorder, next_task)
-                logger.info(f"Plan update choice: {plan_update_choice}")
-                if plan_update_choice == "stop":
-                    logger.info("Planner determined overall task is complete, stopping execution")
-                    break
-                elif plan_update_choice == "update":
-                    logger.info(f"Task plan updated: {recorder.task_plan}")
+            if self.config.max_parallel_subtasks > 1:
+                await self._run_tasks_concurrently(recorder, planner_agent, assigner_agent)
+            else:
+                await self._run_tasks(recorder, planner_agent, assigner_agent)
 
             final_answer = await answerer_agent.extract_final_answer(recorder)
             logger.info(f"Extracted final answer: {final_answer}")
@@ -78,3 +64,110 @@ class WorkforceAgent:
             #     ground_truth=task["Final answer"]
             # )
         return recorder
+
+    async def _run_tasks(
+        self, recorder: WorkspaceTaskRecorder, planner_agent: PlannerAgent, assigner_agent: AssignerAgent
+    ) -> None:
+        executor_agent_group: dict[str, ExecutorAgent] = {}
+        for name, config in self.config.workforce_executor_agents.items():
+            executor_agent_group[name] = ExecutorAgent(config=config, workforce_config=self.config)
+
+        # DISCUSS: merge .get_next_task and .has_uncompleted_tasks? (while True)
+        while recorder.has_uncompleted_tasks:
+            # * 2. assign tasks
+            next_task = await assigner_agent.assign_task(recorder)
+            logger.info(f"Assign task: {next_task.task_id} assigned to {next_task.assigned_agent}")
+
+            # * 3. execute task
+            logger.info(f"Executing task: {next_task.task_id}")
+            await executor_agent_group[next_task.assigned_agent].execute_task(recorder=recorder, task=next_task)
+            logger.info(f"Task {next_task.task_id} result: {next_task.task_result}")
+            await planner_agent.plan_check(recorder, next_task)
+            logger.info(f"Task {next_task.task_id} checked: {next_task.task_status}")
+
+            # * 4. update plan
+            if not recorder.has_uncompleted_tasks:  # early stop
+                break
+            plan_update_choice = await planner_agent.plan_update(recorder, next_task)
+            logger.info(f"Plan update choice: {plan_update_choice}")
+            if plan_update_choice == "stop":
+                logger.info("Planner determined overall task is complete, stopping execution")
+                break
+            elif plan_update_choice == "update":
+                logger.info(f"Task plan updated: {recorder.task_plan}")
+
+    async def _run_tasks_concurrently(
+        self, recorder: WorkspaceTaskRecorder, planner_agent: PlannerAgent, assigner_agent: AssignerAgent
+    ) -> None:
+        """Concurrent mode: ready tasks (see `WorkspaceTaskRecorder.get_ready_tasks`) are assigned, executed by
+        separate executor instances and checked at the same time, at most `max_parallel_subtasks` of them.
+
+        Plan updates are speculative: dependent tasks start without waiting for the update of the tasks they depend
+        on. The tasks finished meanwhile are batched into one update request, which is applied when it returns (the
+        sync point) to the tasks not started yet. An update is dropped and requested again if some of the tasks it
+        would replace have started in the meantime.
+        """
+        max_parallel = self.config.max_parallel_subtasks
+        executor_pools = {
+            name: AgentPool(partial(ExecutorAgent, config=config, workforce_config=self.config), size=max_parallel)
+            for name, config in self.config.workforce_executor_agents.items()
+        }
+        running: dict[asyncio.Task, Subtask] = {}
+        plan_update: asyncio.Task | None = None
+        num_unsynced = 0  # tasks finished since the last plan update request
+        try:
+            while True:
+                for task in recorder.get_ready_tasks()[: max_parallel - len(running)]:
+                    task.task_status = "in progress"
+                    job = asyncio.create_task(
+                        self._process_task(recorder, task, planner_agent, assigner_agent, executor_pools)
+                    )
+                    running[job] = task
+                if not running:  # there is always a ready task before all tasks are started
+                    break
+                waiting = set(running) | ({plan_update} if plan_update else set())
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for job in done - {plan_update}:
+                    running.pop(job)
+                    job.result()  # raise the error of the task
+                    num_unsynced += 1
+
+                if plan_update in done:
+                    choice, updated_plan, unstarted_ids = plan_update.result()
+                    plan_update = None
+                    logger.info(f"Plan update choice: {choice}")
+                    if choice == "stop":
+                        logger.info("Planner determined overall task is complete, stopping execution")
+                        break
+                    elif choice == "update" and updated_plan:
+                        if recorder.replace_unstarted_tasks(updated_plan, unstarted_ids):
+                            logger.info(f"Task plan updated: {recorder.task_plan}")
+                        else:
+                            logger.info("Stale plan update dropped, some of the replaced tasks have started")
+                            num_unsynced += 1  # request it again based on the current plan
+                if plan_update is None and num_unsynced and recorder.has_uncompleted_tasks:
+                    plan_update = asyncio.create_task(planner_agent.propose_plan_update(recorder))
+                    num_unsynced = 0
+        finally:
+            pending = list(running) + ([plan_update] if plan_update else [])
+            for job in pending:
+                job.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for pool in executor_pools.values():
+                await pool.close()
+
+    async def _process_task(
+        self,
+        recorder: WorkspaceTaskRecorder,
+        task: Subtask,
+        planner_agent: PlannerAgent,
+        assigner_agent: AssignerAgent,
+        executor_pools: dict[str, AgentPool],
+    ) -> None:
+        await assigner_agent.assign_task(recorder, task)
+        logger.info(f"Assign task: {task.task_id} assigned to {task.assigned_agent}")
+        async with executor_pools[task.assigned_agent].lease() as executor_agent:
+            await executor_agent.execute_task(recorder=recorder, task=task)
+        logger.info(f"Task {task.task_id} result: {task.task_result}")
+        await planner_agent.plan_check(recorder, task)
+        logger.info(f"Task {task.task_id} checked: {task.task_status}")
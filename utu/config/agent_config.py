@@ -35,6 +35,10 @@ class ToolkitConfig(ConfigBaseModel):
     """MCP transport."""
     mcp_client_session_timeout_seconds: int = 5
     """The read timeout passed to the MCP ClientSession."""
+    mcp_tools_cache_ttl_seconds: int = 24 * 3600
+    """TTL of the tools list of the MCP server cached on disk, 0 to disable the cache."""
+    mcp_reuse_server: bool = False
+    """Share one connected server across agent builds in the process (stdio only). Only for stateless servers."""
 
 
 class ContextManagerConfig(ConfigBaseModel):
@@ -81,6 +85,10 @@ class AgentConfig(ConfigBaseModel):
     - `desc`: worker description
     - `strengths`: worker strengths
     - `weaknesses`: worker weaknesses"""
+    max_parallel_subtasks: int = 1
+    """Max number of subtasks run at the same time, also the number of instances of each worker (orchestra and
+    workforce agents). With more than 1, the planner may declare the dependencies of the subtasks (`depends_on`), and
+    ready subtasks run concurrently"""
     reporter_model: ModelConfigs = Field(default_factory=ModelConfigs)
     """Reporter model config"""
     reporter_config: dict = Field(default_factory=dict)
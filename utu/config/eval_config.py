@@ -31,17 +31,31 @@ class EvalConfig(ConfigBaseModel):
     """Database URL"""
     data: DataConfig = None
     """Data config"""
+    db_write_batch_size: int = 32
+    """Number of saved samples buffered before they are written into db in one batch"""
+    db_write_interval: float = 10.0
+    """Max seconds that saved samples stay in the write buffer"""
 
     # rollout
     agent: AgentConfig | None = None
     """Agent config for rollout"""
     concurrency: int = 1
-    """Rollout parallelism"""
+    """Rollout parallelism, also the size of the rollout agent pool"""
+    agent_max_uses: int | None = 1
+    """Recycle a pooled rollout agent after it has run this many samples, None for never. Defaults to 1, i.e. a fresh
+    agent (and env, named by the sample's trace_id) for every sample. Reused agents only reset their chat history and
+    context manager, the env & toolkit state is carried over to the next sample"""
 
     # judgement
     judge_model: ModelConfigs = Field(default_factory=ModelConfigs)
     """Judge model config"""
     judge_concurrency: int = 1
     """Judgement parallelism"""
+    pipeline: bool = False
+    """Judge each sample as soon as its rollout is saved, instead of judging after all rollouts are done"""
+    judge_cache: bool = True
+    """Whether to cache LLM-judge verdicts persistently, keyed by (judge model, template, question, response, answer)"""
+    judge_batch_size: int = 1
+    """Number of samples judged in one LLM request, 1 to disable batched judging"""
     eval_method: str = None
     """Evaluation method"""
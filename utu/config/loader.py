@@ -1,30 +1,147 @@
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from dataclasses import asdict, dataclass
 from typing import TypeVar
 
 from hydra import compose, initialize
 from omegaconf import OmegaConf
 from pydantic import BaseModel
 
+from ..utils.log import get_logger
 from .agent_config import AgentConfig, ToolkitConfig
 from .eval_config import EvalConfig
 from .model_config import ModelConfigs
 
 TConfig = TypeVar("TConfig", bound=BaseModel)
 
+logger = get_logger(__name__)
+
+
+@dataclass
+class CompiledConfig:
+    """A composed config, stored as a json string so that the cached value can never be mutated."""
+
+    fingerprint: str
+    """Fingerprint (paths & mtimes) of the yaml files in the config dir when compiled"""
+    data: str
+    """The composed config in json. Interpolations (e.g. `${oc.env:...}`) are kept unresolved, so that no secret is
+    cached or written into a snapshot, they are resolved on each load"""
+
+    def is_valid(self, fingerprint: str) -> bool:
+        return self.fingerprint == fingerprint
+
 
 class ConfigLoader:
-    """Config loader"""
+    """Config loader
+
+    Composed configs are memoized by (name, config_path), and invalidated when any yaml file in the config dir is
+    modified. Interpolations (e.g. env vars) are resolved on each load, which returns a new copy, callers are free to
+    modify it. Use `precompile` to snapshot all configs into a json file, and set `UTU_CONFIG_SNAPSHOT` to load it in
+    worker processes to skip Hydra compose on cold start.
+    """
 
     config_path = "../../configs"
     version_base = "1.3"
 
+    _cache: dict[tuple[str, str], CompiledConfig] = {}
+    _lock = threading.Lock()
+    _snapshot_loaded = False
+
     @classmethod
     def _load_config_to_dict(cls, name: str = "default", config_path: str = None) -> dict:
-        config_path = config_path or cls.config_path
+        compiled = cls._get_compiled(name, config_path or cls.config_path)
+        # return dict instead of DictConfig -- avoid JSON serialization error
+        return OmegaConf.to_container(OmegaConf.create(json.loads(compiled.data)), resolve=True)
+
+    @classmethod
+    def _get_compiled(cls, name: str, config_path: str) -> CompiledConfig:
+        cls._maybe_load_snapshot()
+        key = (name, config_path)
+        fingerprint = cls._get_fingerprint(config_path)
+        compiled = cls._cache.get(key)
+        if compiled is None or not compiled.is_valid(fingerprint):
+            with cls._lock:  # Hydra's global state is not thread-safe
+                compiled = cls._compile(name, config_path, fingerprint)
+            cls._cache[key] = compiled
+        return compiled
+
+    @classmethod
+    def _compile(cls, name: str, config_path: str, fingerprint: str) -> CompiledConfig:
         with initialize(config_path=config_path, version_base=cls.version_base):
             cfg = compose(config_name=name)
-            OmegaConf.resolve(cfg)
-        # return dict instead of DictConfig -- avoid JSON serialization error
-        return OmegaConf.to_container(cfg, resolve=True)
+        data = OmegaConf.to_container(cfg, resolve=False)
+        return CompiledConfig(fingerprint=fingerprint, data=json.dumps(data, ensure_ascii=False))
+
+    @classmethod
+    def _get_config_dir(cls, config_path: str) -> pathlib.Path:
+        # Hydra resolves `config_path` relative to this file
+        return (pathlib.Path(__file__).parent / config_path).resolve()
+
+    @classmethod
+    def _get_fingerprint(cls, config_path: str) -> str:
+        config_dir = cls._get_config_dir(config_path)
+        stats = []
+        for file in config_dir.rglob("*.yaml"):
+            stat = file.stat()
+            stats.append((str(file.relative_to(config_dir)), stat.st_mtime_ns, stat.st_size))
+        return hashlib.md5(json.dumps(sorted(stats)).encode()).hexdigest()
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._cache.clear()
+
+    @classmethod
+    def precompile(cls, output_path: str | pathlib.Path) -> int:
+        """Compile all configs under `configs/` and save them into a json snapshot. Return the number of configs.
+        Interpolations are not resolved, i.e. the snapshot contains no env var values (API keys etc.).
+
+        Configs that cannot be compiled (e.g. config groups that are not standalone configs) are skipped.
+        """
+        entries = []
+        config_dir = cls._get_config_dir(cls.config_path)
+        targets = [  # (name prefix, subdir, config_path)
+            ("agents/", "agents", cls.config_path),
+            ("eval/", "eval", cls.config_path),
+            ("", "model", "../../configs/model"),
+            ("", "tools", "../../configs/tools"),
+        ]
+        for prefix, subdir, config_path in targets:
+            for file in sorted((config_dir / subdir).rglob("*.yaml")):
+                name = prefix + file.relative_to(config_dir / subdir).with_suffix("").as_posix()
+                try:
+                    compiled = cls._get_compiled(name, config_path)
+                except Exception as e:  # pylint: disable=broad-except
+                    logger.info(f"Skip config {name}: {e}")
+                    continue
+                entries.append({"name": name, "config_path": config_path, **asdict(compiled)})
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({"configs": entries}, f, ensure_ascii=False)
+        return len(entries)
+
+    @classmethod
+    def load_snapshot(cls, path: str | pathlib.Path) -> int:
+        """Load compiled configs from a snapshot created by `precompile`. Stale entries are recompiled on load."""
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        for entry in snapshot["configs"]:
+            key = (entry.pop("name"), entry.pop("config_path"))
+            cls._cache.setdefault(key, CompiledConfig(**entry))
+        return len(snapshot["configs"])
+
+    @classmethod
+    def _maybe_load_snapshot(cls) -> None:
+        if cls._snapshot_loaded:
+            return
+        cls._snapshot_loaded = True
+        if path := os.getenv("UTU_CONFIG_SNAPSHOT"):
+            try:
+                num_configs = cls.load_snapshot(path)
+                logger.info(f"Loaded {num_configs} configs from snapshot {path}")
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning(f"Failed to load config snapshot {path}: {e}")
 
     # @classmethod
     # def _load_config_to_cls(cls, name: str, config_type: Type[TConfig] = None) -> TConfig:
@@ -1,6 +1,8 @@
 from ..config import AgentConfig
 from .base_context_manager import BaseContextManager, DummyContextManager
+from .compaction_context_manager import CompactionContextManager
 from .env_context_manager import EnvContextManager
+from .history import IncrementalHistory
 
 # CONTEXT_MANAGER_MAP = {
 #     "dummy": DummyContextManager,
@@ -15,8 +17,17 @@ def build_context_manager(config: AgentConfig):
             return DummyContextManager()
         case "env":
             return EnvContextManager()
+        case "compaction":
+            return CompactionContextManager(**(config.context_manager.config or {}))
         case _:
             raise ValueError(f"Unknown context manager: {config.context_manager.name}")
 
 
-__all__ = ["build_context_manager", "DummyContextManager", "EnvContextManager", "BaseContextManager"]
+__all__ = [
+    "build_context_manager",
+    "DummyContextManager",
+    "EnvContextManager",
+    "CompactionContextManager",
+    "BaseContextManager",
+    "IncrementalHistory",
+]
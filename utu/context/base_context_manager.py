@@ -7,6 +7,16 @@ logger = get_logger(__name__)
 
 
 class BaseContextManager:
+    """Manage the model input of each turn in `UTUAgentRunner`.
+
+    The input passed to `preprocess` is the run's history shared across turns (see `IncrementalHistory`), with the
+    ephemeral items of this turn appended. Do not modify it in place -- return a new list instead.
+    """
+
+    def get_ephemeral_items(self, run_context: RunContextWrapper[TContext] = None) -> list[TResponseInputItem]:
+        """Items appended to the input of the current turn only, e.g. env state."""
+        return []
+
     def preprocess(
         self, input: str | list[TResponseInputItem], run_context: RunContextWrapper[TContext] = None
     ) -> str | list[TResponseInputItem]:
@@ -17,6 +27,9 @@ class BaseContextManager:
     ) -> SingleStepResult:
         return single_step_result
 
+    def reset(self) -> None:
+        """Drop the state kept across turns, e.g. before the agent is reused for another task."""
+
 
 class DummyContextManager(BaseContextManager):
     def preprocess(
@@ -0,0 +1,205 @@
+import asyncio
+import json
+import logging
+
+from agents import RunContextWrapper, TContext, ToolCallItem, ToolCallOutputItem, TResponseInputItem
+from agents.run import SingleStepResult
+
+from ..utils import FileUtils, SimplifiedAsyncOpenAI, TokenUtils
+from .base_context_manager import BaseContextManager
+
+logger = logging.getLogger(__name__)
+
+PROMPTS: dict[str, str] = FileUtils.load_prompts("context/compaction.yaml")
+# items generated by the model, a turn starts at the first of them after non-model items
+MODEL_ITEM_TYPES = {"function_call", "reasoning", "message"}
+
+
+class CompactionContextManager(BaseContextManager):
+    """Keep the model input under a token budget by compacting old tool outputs.
+
+    When the input exceeds `max_tokens`, tool outputs older than the last `keep_recent_turns` turns are compacted,
+    oldest first, until the input fits:
+    1. replaced by their cached summary (if `summarize` is enabled and the summary is ready), or truncated to
+       `truncate_tokens` tokens;
+    2. if still over budget, elided.
+    User / system messages, model outputs and the most recent turns are always kept intact; the system prompt is
+    passed to the model separately and never touched. Summaries are generated in background after each turn, at most
+    `max_summaries` are kept (oldest dropped first); `reset` cancels the pending ones and drops them all.
+
+    Tokens saved are accumulated per run in `run_context.context["context_stats"]`.
+
+    Config (`context_manager.config` of the agent config):
+        max_tokens (int): token budget of the input items
+        keep_recent_turns (int): number of recent turns to keep intact
+        truncate_tokens (int): tokens kept for a truncated tool output
+        summarize (bool): whether to summarize large tool outputs with LLM
+        summary_min_tokens (int): only summarize tool outputs longer than this
+        summary_model (dict): model provider of the summary LLM, default to the `UTU_LLM_*` envs
+        max_summaries (int): max number of tool output summaries kept
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 32_000,
+        keep_recent_turns: int = 3,
+        truncate_tokens: int = 256,
+        summarize: bool = False,
+        summary_min_tokens: int = 1_000,
+        summary_model: dict | None = None,
+        max_summaries: int = 1_000,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self.truncate_tokens = truncate_tokens
+        self.summarize = summarize
+        self.summary_min_tokens = summary_min_tokens
+        self.summary_llm = SimplifiedAsyncOpenAI(**(summary_model or {})) if summarize else None
+        self.max_summaries = max_summaries
+
+        self._num_tokens: dict[int, tuple[TResponseInputItem, int]] = {}  # id(item) -> (item, number of tokens)
+        self._summaries: dict[str, str] = {}  # call_id -> summary of the tool output
+        self._summary_tasks: set[asyncio.Task] = set()
+
+    def preprocess(
+        self, input: str | list[TResponseInputItem], run_context: RunContextWrapper[TContext] = None
+    ) -> str | list[TResponseInputItem]:
+        if isinstance(input, str):
+            return input
+        num_tokens = [self._count_tokens(item) for item in input]
+        self._num_tokens = {id(item): (item, n) for item, n in zip(input, num_tokens, strict=True)}  # drop stale items
+        total_tokens = sum(num_tokens)
+        if total_tokens <= self.max_tokens:
+            self._update_stats(run_context, total_tokens, total_tokens, 0)
+            return input
+
+        candidates = self._get_compactable_indexes(input)
+        compacted = list(input)  # the input is shared with the runner, do not modify it in place
+        tokens = total_tokens
+        for stage in ("compact", "elide"):
+            for i in candidates:
+                if tokens <= self.max_tokens:
+                    break
+                new_item = self._compact_item(input[i]) if stage == "compact" else self._elide_item(input[i])
+                new_tokens = self._count_tokens(new_item, cache=False)
+                old_tokens = (
+                    self._count_tokens(compacted[i], cache=False) if compacted[i] is not input[i] else num_tokens[i]
+                )
+                if new_tokens < old_tokens:
+                    compacted[i] = new_item
+                    tokens -= old_tokens - new_tokens
+        num_compacted = sum(a is not b for a, b in zip(input, compacted, strict=True))
+        if tokens > self.max_tokens:
+            logger.warning(f"Context still exceeds the budget after compaction: {tokens} > {self.max_tokens} tokens")
+        logger.info(f"Compacted {num_compacted} tool outputs: {total_tokens} -> {tokens} tokens")
+        self._update_stats(run_context, total_tokens, tokens, num_compacted)
+        return compacted
+
+    def process(
+        self, single_step_result: SingleStepResult, run_context: RunContextWrapper[TContext] = None
+    ) -> SingleStepResult:
+        if self.summarize:
+            tool_names = {
+                getattr(item.raw_item, "call_id", None): getattr(item.raw_item, "name", "unknown")
+                for item in single_step_result.new_step_items
+                if isinstance(item, ToolCallItem)
+            }
+            for item in single_step_result.new_step_items:
+                if isinstance(item, ToolCallOutputItem) and isinstance(item.raw_item, dict):
+                    self._schedule_summary(item.raw_item, tool_names.get(item.raw_item.get("call_id"), "unknown"))
+        return single_step_result
+
+    def reset(self) -> None:
+        for task in self._summary_tasks:
+            task.cancel()
+        self._summary_tasks.clear()
+        self._summaries.clear()
+        self._num_tokens.clear()
+
+    def _get_compactable_indexes(self, input: list[TResponseInputItem]) -> list[int]:
+        """Indexes of the tool outputs before the most recent `keep_recent_turns` turns, oldest first."""
+        turn_starts = []
+        prev_is_model = False
+        for i, item in enumerate(input):
+            is_model = (
+                isinstance(item, dict)
+                and self._get_type(item) in MODEL_ITEM_TYPES
+                and item.get("role", "assistant") == "assistant"
+            )
+            if is_model and not prev_is_model:
+                turn_starts.append(i)
+            prev_is_model = is_model
+        if len(turn_starts) <= self.keep_recent_turns:
+            return []
+        boundary = turn_starts[-self.keep_recent_turns] if self.keep_recent_turns > 0 else len(input)
+        return [
+            i
+            for i in range(boundary)
+            if isinstance(input[i], dict)
+            and self._get_type(input[i]) == "function_call_output"
+            and isinstance(input[i].get("output"), str)
+        ]
+
+    def _compact_item(self, item: dict) -> dict:
+        if summary := self._summaries.get(item.get("call_id")):
+            return {**item, "output": f"[summary of the original tool output]\n{summary}"}
+        output = item["output"]
+        truncated = TokenUtils.truncate_text_by_token(output, self.truncate_tokens)
+        return {**item, "output": f"{truncated}\n[tool output truncated, original length: {len(output)} chars]"}
+
+    def _elide_item(self, item: dict) -> dict:
+        return {**item, "output": f"[tool output elided, original length: {len(item['output'])} chars]"}
+
+    def _schedule_summary(self, item: dict, tool_name: str) -> None:
+        call_id, output = item.get("call_id"), item.get("output")
+        if not call_id or not isinstance(output, str) or call_id in self._summaries:
+            return
+        if self._count_tokens(item) < self.summary_min_tokens:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._summarize(call_id, tool_name, output))
+        except RuntimeError:
+            return  # no running loop, fallback to truncation
+        self._summary_tasks.add(task)
+        task.add_done_callback(self._summary_tasks.discard)
+
+    async def _summarize(self, call_id: str, tool_name: str, output: str) -> None:
+        try:
+            query = PROMPTS["tool_output_summary"].format(
+                tool_name=tool_name, max_tokens=self.truncate_tokens, output=output
+            )
+            summary = await self.summary_llm.query_one(messages=query)
+            self._summaries[call_id] = TokenUtils.truncate_text_by_token(summary, self.truncate_tokens)
+            while len(self._summaries) > self.max_summaries:
+                self._summaries.pop(next(iter(self._summaries)))  # the oldest
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"Failed to summarize tool output {call_id}: {e}")
+
+    def _count_tokens(self, item: TResponseInputItem, cache: bool = True) -> int:
+        if cache and id(item) in self._num_tokens and self._num_tokens[id(item)][0] is item:
+            return self._num_tokens[id(item)][1]
+        if isinstance(item, dict) and isinstance(item.get("output"), str):
+            text = item["output"]
+        elif isinstance(item, dict) and isinstance(item.get("content"), str):
+            text = item["content"]
+        else:
+            text = json.dumps(item, ensure_ascii=False, default=str)
+        return TokenUtils.count_tokens(text)
+
+    @staticmethod
+    def _get_type(item: TResponseInputItem) -> str:
+        return item.get("type", "message") if isinstance(item, dict) else getattr(item, "type", "message")
+
+    @staticmethod
+    def _update_stats(
+        run_context: RunContextWrapper[TContext] | None, tokens_before: int, tokens_after: int, num_compacted: int
+    ) -> None:
+        if run_context is None or not isinstance(run_context.context, dict):
+            return
+        stats = run_context.context.setdefault(
+            "context_stats", {"num_turns": 0, "input_tokens": 0, "tokens_saved": 0, "num_compacted": 0}
+        )
+        stats["num_turns"] += 1
+        stats["input_tokens"] += tokens_after
+        stats["tokens_saved"] += tokens_before - tokens_after
+        stats["num_compacted"] += num_compacted
@@ -1,4 +1,3 @@
-import copy
 import logging
 
 from agents import RunContextWrapper, TContext, TResponseInputItem
@@ -11,15 +10,13 @@ logger = logging.getLogger(__name__)
 
 
 class EnvContextManager(BaseContextManager):
-    def preprocess(
-        self, input: str | list[TResponseInputItem], run_context: RunContextWrapper[TContext] = None
-    ) -> str | list[TResponseInputItem]:
+    def get_ephemeral_items(self, run_context: RunContextWrapper[TContext] = None) -> list[TResponseInputItem]:
+        # append the current env state to the input of each turn
         if run_context is None or run_context.context.get("env", None) is None:
             logger.warning(f"run_context {run_context} or env is None")
-            return input
+            return []
         env: BaseEnv = run_context.context["env"]
         env_state = env.get_state()
         if env_state:
-            input = copy.deepcopy(input)
-            input.append(EasyInputMessageParam(content=env_state, role="user"))
-        return input
+            return [EasyInputMessageParam(content=env_state, role="user")]
+        return []
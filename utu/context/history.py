@@ -0,0 +1,50 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from agents import ItemHelpers, RunItem, TResponseInputItem
+
+
+class IncrementalHistory:
+    """Model input of a run, maintained incrementally across turns.
+
+    The runner passes `original_input + generated_items` to the model on every turn. Instead of re-converting every
+    generated item (and copying the whole conversation) each turn, only the items appended since the last turn are
+    converted; the input list is shared between turns. Ephemeral items (e.g. env state) are appended for one model
+    call and removed afterwards, without copying the history.
+
+    NOTE: the returned list is shared, consumers should not modify it in place.
+    """
+
+    def __init__(self) -> None:
+        self.items: list[TResponseInputItem] = []
+        self._original_input: str | list[TResponseInputItem] | None = None
+        self._sources: list[RunItem] = []  # generated items already converted into `items`
+
+    def sync(
+        self, original_input: str | list[TResponseInputItem], generated_items: list[RunItem]
+    ) -> list[TResponseInputItem]:
+        """Update the history to `original_input + generated_items` and return it."""
+        if original_input is not self._original_input or not self._is_extension(generated_items):
+            # e.g. the first turn, or the history is rewritten by a handoff input filter
+            self.items = ItemHelpers.input_to_new_input_list(original_input)
+            self._original_input = original_input
+            self._sources = []
+        for item in generated_items[len(self._sources) :]:
+            self.items.append(item.to_input_item())
+            self._sources.append(item)
+        return self.items
+
+    @contextmanager
+    def ephemeral(self, items: list[TResponseInputItem]) -> Iterator[list[TResponseInputItem]]:
+        """Append `items` to the history within the context."""
+        num_items = len(self.items)
+        self.items.extend(items)
+        try:
+            yield self.items
+        finally:
+            del self.items[num_items:]
+
+    def _is_extension(self, generated_items: list[RunItem]) -> bool:
+        if len(generated_items) < len(self._sources):
+            return False
+        return all(a is b for a, b in zip(self._sources, generated_items, strict=False))
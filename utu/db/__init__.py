@@ -1,6 +1,6 @@
 from .eval_datapoint import DatasetSample, EvaluationSample
 from .tool_cache_model import ToolCacheModel
-from .tracing_model import GenerationTracingModel, ToolTracingModel
+from .tracing_model import GenerationTracingModel, ToolCallStatModel, ToolTracingModel
 
 __all__ = [
     "DatasetSample",
@@ -8,4 +8,5 @@ __all__ = [
     "ToolCacheModel",
     "ToolTracingModel",
     "GenerationTracingModel",
+    "ToolCallStatModel",
 ]
@@ -0,0 +1,90 @@
+"""Schema-versioned migrations.
+
+`SQLModel.metadata.create_all` only creates missing tables, so changes on existing tables (e.g. new indexes) are
+applied here. Each migration runs once in its own transaction and is recorded in the `utu_schema_version` table.
+To add a migration, append `(version, description, func)` to `MIGRATIONS` with an increasing version. Migrations list
+the schema changes explicitly instead of reading them from the models, e.g. an index declared on a model later needs
+a new migration creating it, so that existing and new databases end up with the same schema.
+"""
+
+import datetime
+from collections.abc import Callable
+
+from sqlalchemy import Column, Connection, Engine, Index, MetaData, Table, func
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Field, SQLModel, select
+
+from ..utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+class SchemaVersionModel(SQLModel, table=True):
+    __tablename__ = "utu_schema_version"
+
+    version: int = Field(primary_key=True)
+    description: str = ""
+    applied_at: datetime.datetime | None = Field(default_factory=datetime.datetime.now)
+
+
+def _create_indexes(conn: Connection, indexes: list[tuple[str, str, tuple[str, ...]]]) -> None:
+    """Create the `(name, table_name, columns)` indexes, skip existing ones."""
+    for name, table_name, columns in indexes:
+        # a detached table, so that the models are left untouched
+        table = Table(table_name, MetaData(), *[Column(column) for column in columns])
+        Index(name, *[table.c[column] for column in columns]).create(conn, checkfirst=True)
+
+
+# frozen: the indexes of version 1, whatever the models declare now
+_V1_INDEXES = [
+    ("ix_evaluation_data_exp_id_stage_dataset_index", "evaluation_data", ("exp_id", "stage", "dataset_index")),
+    ("ix_data_dataset_index", "data", ("dataset", "index")),
+    ("ix_tracing_tool_trace_id", "tracing_tool", ("trace_id",)),
+    ("ix_tracing_tool_span_id", "tracing_tool", ("span_id",)),
+    ("ix_tracing_generation_trace_id", "tracing_generation", ("trace_id",)),
+    ("ix_tracing_generation_span_id", "tracing_generation", ("span_id",)),
+    ("ix_tracing_toolcall_stat_run_id", "tracing_toolcall_stat", ("run_id",)),
+]
+
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (
+        1,
+        "add (exp_id, stage, dataset_index) index to evaluation_data, (dataset, index) index to data, "
+        "trace_id/span_id indexes to tracing tables",
+        lambda conn: _create_indexes(conn, _V1_INDEXES),
+    ),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(engine: Engine) -> int:
+    """Get the current schema version, 0 if no migration has been applied."""
+    SchemaVersionModel.__table__.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        version = conn.execute(select(func.max(SchemaVersionModel.version))).scalar()
+    return version or 0
+
+
+def migrate(engine: Engine, target_version: int = LATEST_VERSION) -> int:
+    """Apply pending migrations up to `target_version`. Tables should have been created. Return the schema version."""
+    # make sure all tables are registered in metadata
+    from . import eval_datapoint, tool_cache_model, tracing_model  # noqa: F401
+
+    current_version = get_schema_version(engine)
+    for version, description, migration in MIGRATIONS:
+        if version <= current_version or version > target_version:
+            continue
+        logger.info(f"Applying db migration {version}: {description}")
+        try:
+            with engine.begin() as conn:
+                migration(conn)
+                conn.execute(
+                    SchemaVersionModel.__table__.insert().values(
+                        version=version, description=description, applied_at=datetime.datetime.now()
+                    )
+                )
+        except IntegrityError:
+            # another process has applied the same migration concurrently
+            logger.info(f"Db migration {version} has already been applied.")
+        current_version = version
+    return current_version
@@ -11,8 +11,8 @@ class ToolTracingModel(SQLModel, table=True):
     __tablename__ = "tracing_tool"
 
     id: int | None = Field(default=None, primary_key=True)
-    trace_id: str = ""
-    span_id: str = ""
+    trace_id: str = Field(default="", index=True)
+    span_id: str = Field(default="", index=True)
 
     name: str = ""
     input: Any | None = Field(default=None, sa_column=Column(JSON))
@@ -25,8 +25,8 @@ class GenerationTracingModel(SQLModel, table=True):
     __tablename__ = "tracing_generation"
 
     id: int | None = Field(default=None, primary_key=True)
-    trace_id: str = ""
-    span_id: str = ""
+    trace_id: str = Field(default="", index=True)
+    span_id: str = Field(default="", index=True)
     type: Literal["chat.completions", "responses"] = Field(default="chat.completions", sa_column=Column(String))
 
     input: Sequence[Mapping[str, Any]] | None = Field(default=None, sa_column=Column(JSON))
@@ -36,3 +36,22 @@ class GenerationTracingModel(SQLModel, table=True):
     usage: dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
 
     response_id: str | None = Field(default=None, sa_column=Column(String))
+
+
+# aggregated tool call stats, flushed periodically by ToolCallStatRunHook
+class ToolCallStatModel(SQLModel, table=True):
+    __tablename__ = "tracing_toolcall_stat"
+
+    id: int | None = Field(default=None, primary_key=True)
+    run_id: str = Field(default="", index=True)  # e.g. exp_id of the benchmark run
+    timestamp: float = 0.0  # flush time
+    name: str = ""  # tool name
+
+    # NOTE: values are deltas since the last flush, sum them up to get the totals
+    count: int = 0
+    error_count: int = 0
+    total_latency: float = 0.0  # in seconds
+    max_latency: float = 0.0
+    latency_histogram: dict[str, int] | None = Field(default=None, sa_column=Column(JSON))
+    total_output_size: int = 0  # in chars
+    max_output_size: int = 0
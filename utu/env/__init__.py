@@ -17,6 +17,6 @@ async def get_env(config: AgentConfig, trace_id: str) -> Env:
             print(f"> Workspace: {workspace}")
             return ShellLocalEnv(workspace)
         case "browser_docker":
-            return BrowserEnv(trace_id)
+            return BrowserEnv(trace_id, config.env.config)
         case _:
             raise ValueError(f"Unknown env name: {config.env.name}")
@@ -4,25 +4,46 @@ import logging
 from agents import FunctionTool, RunContextWrapper, TContext, Tool
 
 from .base_env import BaseEnv
-from .utils import DockerManager, MCPClient
+from .utils import get_docker_manager, get_mcp_session_pool
 
 logger = logging.getLogger(__name__)
 
 
 class BrowserEnv(BaseEnv):
-    """Browser environment for agents."""
+    """Browser environment for agents.
 
-    def __init__(self, trace_id: str):
+    Browser actions go through one persistent MCP session per environment (see `MCPSessionPool`), instead of a new
+    session per action. Config (`env.config`):
+        - mcp_max_sessions: max open sessions of all the browser envs in the event loop. Defaults to 32.
+        - mcp_heartbeat_interval: seconds between pings of an open session, 0 to disable. Defaults to 30.
+        - num_preload: number of warm browser containers kept ready by the `DockerManager` of the event loop.
+          Defaults to 0.
+        - reuse_containers: return healthy containers to the warm pool on cleanup, instead of stopping them (browser
+          state is kept). Defaults to False.
+    """
+
+    def __init__(self, trace_id: str, config: dict | None = None):
         self.trace_id = trace_id
-        self.docker_manager = DockerManager()
+        self.config = config or {}
+        self.docker_manager = get_docker_manager(
+            num_preload=self.config.get("num_preload", 0), reuse_containers=self.config.get("reuse_containers", False)
+        )
         self.browser_state: str = None
+        self.mcp_url: str | None = None
+        self.session_pool = None
 
     async def build(self):
         """Build the environment. We use docker to run a browser container."""
         self.container_info = await self.docker_manager.start_container(self.trace_id)
         self.mcp_url = self.container_info["mcp_url"]
+        self.session_pool = get_mcp_session_pool(
+            max_sessions=self.config.get("mcp_max_sessions", 32),
+            heartbeat_interval=self.config.get("mcp_heartbeat_interval", 30),
+        )
 
     async def cleanup(self):
+        if self.session_pool and self.mcp_url:
+            await self.session_pool.release(self.mcp_url)
         await self.docker_manager.stop_container(self.trace_id)
 
     def get_state(self) -> str:
@@ -50,31 +71,29 @@ class BrowserEnv(BaseEnv):
         def create_on_invoke_tool(tool_name: str):
             async def on_invoke_tool(ctx: RunContextWrapper[TContext], input_json: str) -> str:
                 try:
-                    async with MCPClient.get_mcp_client(self.mcp_url) as client:
-                        res = await client.call_tool(tool_name, json.loads(input_json))
-                        if res.isError:
-                            return f"Error: {res.content[0].text}"
-                        self.browser_state = res.content[1].text  # DISCUSS: record the web actions?
-                        return res.content[0].text
+                    res = await self.session_pool.get(self.mcp_url).call_tool(tool_name, json.loads(input_json))
+                    if res.isError:
+                        return f"Error: {res.content[0].text}"
+                    self.browser_state = res.content[1].text  # DISCUSS: record the web actions?
+                    return res.content[0].text
                 except Exception as e:  # pylint: disable=broad-except
                     logger.error(f"except: {e}", exc_info=True)
                     return f"Error: {e}"
 
             return on_invoke_tool
 
-        async with MCPClient.get_mcp_client(self.mcp_url) as client:
-            # NOTE: check `MCPUtil` in @agents
-            res = await client.list_tools()
-            assert res.nextCursor is None
-            for tool in res.tools:
-                if tool.name not in activated_tools:
-                    continue
-                tools.append(
-                    FunctionTool(
-                        name=tool.name,
-                        description=tool.description,
-                        params_json_schema=tool.inputSchema,
-                        on_invoke_tool=create_on_invoke_tool(tool.name),
-                    )
+        # NOTE: check `MCPUtil` in @agents
+        res = await self.session_pool.get(self.mcp_url).list_tools()
+        assert res.nextCursor is None
+        for tool in res.tools:
+            if tool.name not in activated_tools:
+                continue
+            tools.append(
+                FunctionTool(
+                    name=tool.name,
+                    description=tool.description,
+                    params_json_schema=tool.inputSchema,
+                    on_invoke_tool=create_on_invoke_tool(tool.name),
                 )
-            return tools
+            )
+        return tools
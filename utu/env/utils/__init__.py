@@ -1,4 +1,18 @@
-from .docker_manager import DockerManager
+from .docker_manager import DockerManager, get_docker_manager, shutdown_docker_managers
+from .env_backend import DockerBackend, EnvBackend, LocalProcessBackend
 from .mcp_client import MCPClient
+from .mcp_session_pool import MCPSession, MCPSessionPool, get_mcp_session_pool, shutdown_mcp_session_pool
 
-__all__ = ["DockerManager", "MCPClient"]
+__all__ = [
+    "DockerManager",
+    "get_docker_manager",
+    "shutdown_docker_managers",
+    "EnvBackend",
+    "DockerBackend",
+    "LocalProcessBackend",
+    "MCPClient",
+    "MCPSession",
+    "MCPSessionPool",
+    "get_mcp_session_pool",
+    "shutdown_mcp_session_pool",
+]
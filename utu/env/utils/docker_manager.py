@@ -1,19 +1,24 @@
 import asyncio
+import atexit
 import logging
 import time
+import uuid
+import weakref
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
 
+import aiohttp
 import docker.errors
-import requests
-from requests.exceptions import RequestException
-
-import docker
 
+from .env_backend import DockerBackend, EnvBackend
 from .port_manager import PortManager
 
 logger = logging.getLogger(__name__)
 
+READY_TIMEOUT = 30  # 等待服务就绪的最长时间 (秒)
+READY_INTERVAL = 0.5
+
 
 class ContainerStatus(Enum):
     STOPPED = "stopped"
@@ -31,48 +36,80 @@ class ContainerInfo:
     mcp_url: str | None = None
     status: ContainerStatus = ContainerStatus.STOPPED
     error_msg: str | None = None
+    name: str | None = None
 
 
 class DockerManager:
-    def __init__(self, image_name: str = "env_browser_chromium:latest", num_preload: int = 0, num_max: int = -1):
+    """Manage the env containers, with a warm pool.
+
+    `num_preload` containers are kept started and ready (`/ping` returns 200). `start_container(id)` leases a warm
+    container to `id` (checking its health first) and refills the pool in background, a container is only cold-started
+    when the pool is empty. `stop_container(id)` stops the container, or returns it to the pool if `reuse_containers`
+    and it is healthy (NOTE: state in the container, e.g. browser tabs, is kept across leases).
+    Containers are run by `backend` (docker by default, see `EnvBackend`).
+    """
+
+    def __init__(
+        self,
+        image_name: str = "env_browser_chromium:latest",
+        num_preload: int = 0,
+        num_max: int = -1,
+        backend: EnvBackend | None = None,
+        reuse_containers: bool = False,
+        port_range: tuple = (9000, 9999),
+    ):
         """
         image_name: env_browser_chromium:latest
             port: 9001
         num_preload: 预启动的容器数量
         num_max: 最大容器数量
+        backend: 运行容器的后端, 默认为 docker
+        reuse_containers: 归还的容器是否放回预启动池
         """
         self.image_name = image_name
         self.num_preload = num_preload
         self.num_max = num_max
+        self.reuse_containers = reuse_containers
 
         try:
-            self.client = docker.from_env()
-            self.client.ping()
-            logger.info("Docker连接成功")
+            self.backend = backend or DockerBackend(image_name)
+            logger.info(f"后端连接成功: {type(self.backend).__name__}")
         except Exception as e:  # pylint: disable=broad-except
             logger.error(f"Docker连接失败: {e}")
             raise
 
-        self.port_manager = PortManager()
+        self.port_manager = PortManager(port_range)
         self.containers: dict[str, ContainerInfo] = {}
         self.lock = asyncio.Lock()
-
-    #     if num_preload > 0:
-    #         asyncio.create_task(self._preload_containers())
-
-    # async def _preload_containers(self):
-    #     """预启动容器"""
-    #     logger.info(f"开始预启动 {self.num_preload} 个容器")
-    #     tasks = []
-    #     for i in range(self.num_preload):
-    #         tasks.append(self.start_container(i))
-
-    #     results = await asyncio.gather(*tasks, return_exceptions=True)
-    #     success_count = sum(1 for r in results if not isinstance(r, Exception))
-    #     logger.info(f"预启动完成，成功启动 {success_count}/{self.num_preload} 个容器")
+        self._idle: deque[ContainerInfo] = deque()  # 预启动池
+        self._starting: set[asyncio.Task] = set()
+        self._background_tasks: set[asyncio.Task] = set()
+        self.stats = {"leased": 0, "cold_started": 0, "recycled": 0, "discarded": 0}
+        self._closed = False
+
+    @property
+    def client(self):
+        """docker client, for the docker specific methods (e.g. `find_all`)"""
+        return self.backend.client
+
+    @property
+    def num_idle(self) -> int:
+        return len(self._idle)
+
+    async def warmup(self) -> None:
+        """启动容器, 直到预启动池中有 `num_preload` 个容器. 等待所有正在启动的容器"""
+        num_missing = self.num_preload - len(self._idle) - len(self._starting)
+        if num_missing > 0 and not self._closed:
+            logger.info(f"开始预启动 {num_missing} 个容器")
+            for _ in range(num_missing):
+                task = asyncio.create_task(self._start_idle_container())
+                self._starting.add(task)
+                task.add_done_callback(self._starting.discard)
+        if self._starting:
+            await asyncio.gather(*self._starting)
 
     async def start_container(self, id: str) -> dict:
-        """启动一个容器. 基于id确定唯一的实例"""
+        """启动一个容器. 基于id确定唯一的实例. 优先从预启动池中租用"""
         async with self.lock:
             if self.num_max > 0:
                 running_count = sum(1 for c in self.containers.values() if c.status == ContainerStatus.RUNNING)
@@ -82,106 +119,29 @@ class DockerManager:
             if id in self.containers:
                 container_info = self.containers[id]
                 if container_info.status == ContainerStatus.RUNNING:
-                    return {
-                        "success": True,
-                        "message": "容器已在运行",
-                        "id": id,
-                        "port": container_info.port,
-                        "mcp_url": container_info.mcp_url,
-                        "container_id": container_info.container_id,
-                    }
+                    return self._started_result(container_info, "容器已在运行")
                 elif container_info.status == ContainerStatus.STARTING:
                     return {"success": False, "error": "容器正在启动中", "id": id}
 
-            container_info = ContainerInfo(id=id, status=ContainerStatus.STARTING)
-            self.containers[id] = container_info
-
-            try:
-                port = self.port_manager.allocate_port()
-                if port is None:
-                    container_info.status = ContainerStatus.ERROR
-                    container_info.error_msg = "无法分配可用端口"
-                    return {"success": False, "error": "无法分配可用端口", "id": id}
-
-                container_info.port = port
-                container_info.mcp_url = f"http://{self.port_manager.get_host_ip()}:{port}/mcp/"
-
-                container_name = f"{self.image_name.split(':')[0]}_{id}"
-                container = self.client.containers.run(
-                    self.image_name,
-                    name=container_name,
-                    ports={"9001/tcp": port},
-                    detach=True,
-                    remove=True,  # remove on stop
-                    environment={
-                        "CONTAINER_ID": str(id),
-                        "ENV": "local",
-                    },
-                )
-
-                container_info.container_id = container.id
-
-                # 等待服务的 /ping 端点返回 200 状态码
-                ping_url = f"http://{self.port_manager.get_host_ip()}:{port}/ping"
-                max_retries = 30  # 最多尝试30次
-                retry_interval = 1  # 每次间隔1秒
-                service_ready = False
-
-                logger.info(f"等待容器 {id} 服务就绪，检查 {ping_url}")
-
-                for _ in range(max_retries):
-                    try:
-                        response = requests.get(ping_url, timeout=2)
-                        if response.status_code == 200:
-                            service_ready = True
-                            logger.info(f"容器 {id} 服务已就绪，/ping 返回 200")
-                            break
-                        logger.debug(f"容器 {id} 服务未就绪，/ping 返回状态码 {response.status_code}，重试中...")
-                    except RequestException as e:
-                        logger.debug(f"容器 {id} 服务未就绪，连接异常: {e}，重试中...")
-
-                    time.sleep(retry_interval)
-
-                if service_ready:
-                    container_info.status = ContainerStatus.RUNNING
-                else:
-                    # 服务未就绪，标记为错误状态并停止容器
-                    container_info.status = ContainerStatus.ERROR
-                    container_info.error_msg = "服务未能在规定时间内就绪，/ping 未返回 200 状态码"
-                    try:
-                        container.stop(timeout=5)
-                    except Exception as e:  # pylint: disable=broad-except
-                        logger.error(f"停止未就绪容器 {id} 时出错: {e}")
-
-                    if container_info.port:
-                        self.port_manager.release_port(container_info.port)
-                        container_info.port = None
-
-                    return {"success": False, "error": container_info.error_msg, "id": id}
+            # reserve the id while the container is leased or started, the lock is not held meanwhile
+            self.containers[id] = ContainerInfo(id=id, status=ContainerStatus.STARTING)
 
-                logger.info(f"容器 {id} 启动成功，端口: {port}, Docker ID: {container.id[:12]}")
+        container_info = await self._lease_idle_container()
+        if container_info is None:
+            self.stats["cold_started"] += 1
+            container_info = await self._start_new_container()
+        self._run_in_background(self.warmup())
 
-                return {
-                    "success": True,
-                    "message": "容器启动成功",
-                    "id": id,
-                    "port": port,
-                    "mcp_url": container_info.mcp_url,
-                    "container_id": container.id,
-                }
-
-            except Exception as e:  # pylint: disable=broad-except
-                if container_info.port:
-                    self.port_manager.release_port(container_info.port)
-
-                container_info.status = ContainerStatus.ERROR
-                container_info.error_msg = str(e)
-
-                logger.error(f"容器 {id} 启动失败: {e}")
-                return {"success": False, "error": f"容器启动失败: {str(e)}", "id": id}
+        container_info.id = id
+        self.containers[id] = container_info
+        if container_info.status != ContainerStatus.RUNNING:
+            return {"success": False, "error": container_info.error_msg, "id": id}
+        self.stats["leased"] += 1
+        logger.info(f"容器 {id} 启动成功，端口: {container_info.port}, ID: {container_info.container_id[:12]}")
+        return self._started_result(container_info, "容器启动成功")
 
     async def stop_container(self, id: str) -> dict:
-        """停止一个容器 (并释放资源)"""
+        """停止一个容器 (并释放资源). 若 `reuse_containers`, 健康的容器放回预启动池"""
         async with self.lock:
             if id not in self.containers:
                 return {"success": False, "error": "容器不存在", "id": id}
@@ -195,34 +155,129 @@ class DockerManager:
 
             container_info.status = ContainerStatus.STOPPING
 
+        if (
+            self.reuse_containers
+            and container_info.container_id
+            and await self._is_healthy(container_info)
+            and len(self._idle) < self.num_preload  # preferred over the containers being started
+        ):
+            del self.containers[id]
+            container_info.status = ContainerStatus.RUNNING
+            self._idle.append(container_info)
+            self.stats["recycled"] += 1
+            return {"success": True, "message": "容器已放回预启动池", "id": id}
+
+        try:
+            await self._stop(container_info)
+            logger.info(f"容器 {id} 停止成功")
+            self._run_in_background(self.warmup())
+            return {"success": True, "message": "容器停止成功", "id": id}
+        except Exception as e:  # pylint: disable=broad-except
+            container_info.status = ContainerStatus.ERROR
+            container_info.error_msg = str(e)
+
+            logger.error(f"停止容器 {id} 失败: {e}")
+
+            return {"success": False, "error": f"停止容器失败: {str(e)}", "id": id}
+
+    async def _lease_idle_container(self) -> ContainerInfo | None:
+        while self._idle:
+            container_info = self._idle.popleft()
+            if await self._is_healthy(container_info):
+                return container_info
+            logger.warning(f"预启动容器 {container_info.name} 不健康，丢弃")
+            self.stats["discarded"] += 1
+            await self._stop(container_info)
+        return None
+
+    async def _start_idle_container(self) -> None:
+        container_info = await self._start_new_container()
+        if container_info.status != ContainerStatus.RUNNING:
+            return
+        if len(self._idle) >= self.num_preload:  # filled by returned containers meanwhile
+            await self._stop(container_info)
+        else:
+            self._idle.append(container_info)
+
+    async def _start_new_container(self) -> ContainerInfo:
+        """冷启动一个容器, 并等待服务的 /ping 端点返回 200"""
+        name = f"{self.backend.name_prefix}_{uuid.uuid4().hex[:12]}"
+        container_info = ContainerInfo(id=None, name=name, status=ContainerStatus.STARTING)
+        port = self.port_manager.allocate_port()
+        if port is None:
+            container_info.status = ContainerStatus.ERROR
+            container_info.error_msg = "无法分配可用端口"
+            return container_info
+
+        container_info.port = port
+        container_info.mcp_url = f"http://{self._get_host()}:{port}/mcp/"
+        try:
+            start = asyncio.ensure_future(asyncio.to_thread(self.backend.start, name, port))
             try:
-                if container_info.container_id:
-                    try:
-                        container = self.client.containers.get(container_info.container_id)
-                        container.stop(timeout=10)
-                        logger.info(f"容器 {id} 停止成功")
-                    except docker.errors.NotFound:
-                        logger.warning(f"容器 {id} 的Docker实例不存在，可能已被删除")
-                    except Exception as e:  # pylint: disable=broad-except
-                        logger.error(f"停止容器 {id} 时出错: {e}")
-
-                if container_info.port:
-                    self.port_manager.release_port(container_info.port)
-
-                container_info.status = ContainerStatus.STOPPED
-                container_info.container_id = None
-                container_info.port = None
-                container_info.error_msg = None
-
-                return {"success": True, "message": "容器停止成功", "id": id}
+                container_info.container_id = await asyncio.shield(start)
+            except asyncio.CancelledError:
+                # 后端启动无法取消, 等待其完成以便停止容器
+                container_info.container_id = await start
+                raise
+            logger.info(f"等待容器 {name} 服务就绪，检查 {self._get_ping_url(container_info)}")
+            deadline = time.monotonic() + READY_TIMEOUT
+            while time.monotonic() < deadline:
+                if await self._is_healthy(container_info):
+                    container_info.status = ContainerStatus.RUNNING
+                    return container_info
+                await asyncio.sleep(READY_INTERVAL)
+            container_info.error_msg = "服务未能在规定时间内就绪，/ping 未返回 200 状态码"
+        except asyncio.CancelledError:
+            logger.info(f"容器 {name} 启动被取消")
+            await self._stop(container_info)
+            raise
+        except Exception as e:  # pylint: disable=broad-except
+            container_info.error_msg = f"容器启动失败: {str(e)}"
+        logger.error(f"容器 {name} 启动失败: {container_info.error_msg}")
+        await self._stop(container_info)
+        container_info.status = ContainerStatus.ERROR
+        return container_info
 
-            except Exception as e:  # pylint: disable=broad-except
-                container_info.status = ContainerStatus.ERROR
-                container_info.error_msg = str(e)
+    async def _stop(self, container_info: ContainerInfo) -> None:
+        try:
+            if container_info.container_id:
+                await asyncio.to_thread(self.backend.stop, container_info.container_id)
+        finally:
+            if container_info.port:
+                self.port_manager.release_port(container_info.port)
+            container_info.status = ContainerStatus.STOPPED
+            container_info.container_id = None
+            container_info.port = None
+            container_info.error_msg = None
+
+    async def _is_healthy(self, container_info: ContainerInfo) -> bool:
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2)) as session:
+                async with session.get(self._get_ping_url(container_info)) as response:
+                    return response.status == 200
+        except (TimeoutError, aiohttp.ClientError):
+            return False
+
+    def _get_host(self) -> str:
+        return "127.0.0.1" if not isinstance(self.backend, DockerBackend) else self.port_manager.get_host_ip()
 
-                logger.error(f"停止容器 {id} 失败: {e}")
+    def _get_ping_url(self, container_info: ContainerInfo) -> str:
+        return container_info.mcp_url.removesuffix("mcp/") + "ping"
+
+    def _started_result(self, container_info: ContainerInfo, message: str) -> dict:
+        return {
+            "success": True,
+            "message": message,
+            "id": container_info.id,
+            "port": container_info.port,
+            "mcp_url": container_info.mcp_url,
+            "container_id": container_info.container_id,
+        }
 
-                return {"success": False, "error": f"停止容器失败: {str(e)}", "id": id}
+    def _run_in_background(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
 
     async def stop_container_by_cid(self, cid: str) -> dict:
         """停止一个容器"""
@@ -346,27 +401,16 @@ class DockerManager:
 
         container_info = self.containers[id]
 
-        # 如果容器正在运行，检查Docker实例状态
+        # 如果容器正在运行，检查实例状态
         if container_info.status == ContainerStatus.RUNNING and container_info.container_id:
             try:
-                container = self.client.containers.get(container_info.container_id)
-                docker_status = container.status
-
-                # 如果Docker容器实际已停止，更新状态
-                if docker_status != "running":
+                # 如果容器实际已停止 (或不存在)，更新状态
+                if not self.backend.is_running(container_info.container_id):
                     container_info.status = ContainerStatus.STOPPED
                     if container_info.port:
                         self.port_manager.release_port(container_info.port)
                         container_info.port = None
                     container_info.container_id = None
-
-            except docker.errors.NotFound:
-                # Docker容器不存在，更新状态
-                container_info.status = ContainerStatus.STOPPED
-                if container_info.port:
-                    self.port_manager.release_port(container_info.port)
-                    container_info.port = None
-                container_info.container_id = None
             except Exception as e:  # pylint: disable=broad-except
                 logger.error(f"检查容器 {id} 状态时出错: {e}")
 
@@ -387,16 +431,24 @@ class DockerManager:
 
         return {"success": True, "total_count": len(self.containers), "containers": statuses}
 
+    async def close(self) -> None:
+        """取消后台任务 (预启动等), 并停止所有容器"""
+        self._closed = True
+        tasks = [*self._background_tasks, *self._starting]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.to_thread(self.cleanup)
+
     def cleanup(self):
         """清理资源"""
         logger.info("开始清理Docker管理器资源")
 
-        # 停止所有容器
-        for container_info in self.containers.values():
+        # 停止所有容器 (包括预启动池中的容器)
+        for container_info in [*self.containers.values(), *self._idle]:
             if container_info.status == ContainerStatus.RUNNING and container_info.container_id:
                 try:
-                    container = self.client.containers.get(container_info.container_id)
-                    container.stop(timeout=5)
+                    self.backend.stop(container_info.container_id)
                 except Exception as e:  # pylint: disable=broad-except
                     logger.error(f"清理容器时出错: {e}")
 
@@ -405,4 +457,36 @@ class DockerManager:
                 self.port_manager.release_port(container_info.port)
 
         self.containers.clear()
+        self._idle.clear()
         logger.info("Docker管理器资源清理完成")
+
+
+# one manager per event loop and image, so that the warm pool is shared by the envs of the loop
+_MANAGERS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, DockerManager]] = weakref.WeakKeyDictionary()
+# all the managers not shut down yet, their containers are stopped at exit (the loop may be gone by then)
+_LIVE_MANAGERS: list[DockerManager] = []
+
+
+def get_docker_manager(image_name: str = "env_browser_chromium:latest", **kwargs) -> DockerManager:
+    """Get the manager of `image_name` in the running event loop, `kwargs` only take effect on creation.
+
+    Call `shutdown_docker_managers` when done, the containers left are stopped at exit otherwise."""
+    managers = _MANAGERS.setdefault(asyncio.get_running_loop(), {})
+    if image_name not in managers:
+        managers[image_name] = DockerManager(image_name, **kwargs)
+        _LIVE_MANAGERS.append(managers[image_name])
+    return managers[image_name]
+
+
+async def shutdown_docker_managers() -> None:
+    """Close the managers of the running event loop: cancel their background tasks and stop their containers."""
+    for manager in _MANAGERS.pop(asyncio.get_running_loop(), {}).values():
+        await manager.close()
+        _LIVE_MANAGERS.remove(manager)
+
+
+@atexit.register
+def _cleanup_docker_managers() -> None:
+    for manager in _LIVE_MANAGERS:
+        manager.cleanup()
+    _LIVE_MANAGERS.clear()
@@ -0,0 +1,103 @@
+"""Backends running the environment servers managed by `DockerManager`.
+
+A backend starts a server listening on a given port (e.g. the browser MCP server, which serves `/mcp/` and `/ping`),
+stops it, and tells whether it is still running. `DockerBackend` runs docker containers; `LocalProcessBackend` runs
+a local command instead, e.g. a stand-in server in tests. Backend methods are blocking, `DockerManager` calls them in
+threads.
+"""
+
+import abc
+import subprocess
+
+import docker.errors
+
+import docker
+
+
+class EnvBackend(abc.ABC):
+    """Backend interface of `DockerManager`."""
+
+    name_prefix: str = "env"
+    """Prefix of the names of the started servers"""
+
+    @abc.abstractmethod
+    def start(self, name: str, port: int) -> str:
+        """Start a server listening on `port` of the host, return its id."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def stop(self, server_id: str) -> None:
+        """Stop the server, it is fine if it is already stopped."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def is_running(self, server_id: str) -> bool:
+        raise NotImplementedError
+
+
+class DockerBackend(EnvBackend):
+    """Run the servers as docker containers of `image_name`, which serve on `container_port`."""
+
+    def __init__(self, image_name: str = "env_browser_chromium:latest", container_port: int = 9001):
+        self.image_name = image_name
+        self.name_prefix = image_name.split(":")[0]
+        self.container_port = container_port
+        self.client = docker.from_env()
+        self.client.ping()
+
+    def start(self, name: str, port: int) -> str:
+        container = self.client.containers.run(
+            self.image_name,
+            name=name,
+            ports={f"{self.container_port}/tcp": port},
+            detach=True,
+            remove=True,  # remove on stop
+            environment={
+                "CONTAINER_ID": name,
+                "ENV": "local",
+            },
+        )
+        return container.id
+
+    def stop(self, server_id: str) -> None:
+        try:
+            self.client.containers.get(server_id).stop(timeout=10)
+        except docker.errors.NotFound:
+            pass
+
+    def is_running(self, server_id: str) -> bool:
+        try:
+            return self.client.containers.get(server_id).status == "running"
+        except docker.errors.NotFound:
+            return False
+
+
+class LocalProcessBackend(EnvBackend):
+    """Run the servers as local processes of `command`, where `{port}` and `{name}` are substituted."""
+
+    def __init__(self, command: list[str], name_prefix: str = "local_env"):
+        self.command = command
+        self.name_prefix = name_prefix
+        self.processes: dict[str, subprocess.Popen] = {}
+
+    def start(self, name: str, port: int) -> str:
+        command = [arg.format(port=port, name=name) for arg in self.command]
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        server_id = str(process.pid)
+        self.processes[server_id] = process
+        return server_id
+
+    def stop(self, server_id: str) -> None:
+        process = self.processes.pop(server_id, None)
+        if process is None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def is_running(self, server_id: str) -> bool:
+        process = self.processes.get(server_id)
+        return process is not None and process.poll() is None
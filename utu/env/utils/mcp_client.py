@@ -2,12 +2,15 @@ import logging
 from collections.abc import AsyncGenerator
 from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import timedelta
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
 from mcp.client.session import ClientSession
 from mcp.client.sse import sse_client
 from mcp.client.streamable_http import streamablehttp_client
 
+if TYPE_CHECKING:
+    from .mcp_session_pool import MCPSession
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,6 +24,10 @@ class MCPClient:
     Usage:
         async with MCPClient.get_mcp_client(mcp_url) as session:
             result = await session.call_tool("tool_name", {"arg": "value"})
+
+        # or, to reuse one session across calls (see `MCPSessionPool`)
+        session = MCPClient.get_persistent_session(mcp_url)
+        result = await session.call_tool("tool_name", {"arg": "value"})
     """
 
     # session: ClientSession | None = None
@@ -74,6 +81,13 @@ class MCPClient:
             case _:
                 raise ValueError(f"Unknown url type: {url}")
 
+    @classmethod
+    def get_persistent_session(cls, url: str) -> "MCPSession":
+        """Get the long-lived session to `url` from the session pool of the running event loop."""
+        from .mcp_session_pool import get_mcp_session_pool
+
+        return get_mcp_session_pool().get(url)
+
     @classmethod
     def get_url_type(cls, url: str) -> Literal["http", "sse"]:
         if url.strip("/").endswith("sse"):
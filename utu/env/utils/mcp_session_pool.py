@@ -0,0 +1,237 @@
+"""Long-lived MCP sessions for environments.
+
+`MCPClient.get_mcp_client` opens a session (HTTP connection, `initialize` handshake) and closes it again, which is
+too expensive to do per tool call, e.g. per browser click. A `MCPSession` keeps one session to an MCP server open:
+
+- the transport contexts are entered and exited in a dedicated owner task, so the session can be used from any task
+  (see the cancel scope issue in `MCPClient`);
+- a background heartbeat pings the server every `heartbeat_interval` seconds and drops a dead session;
+- a call that fails on a dead session reconnects and is retried once.
+
+Sessions are shared through a per-event-loop `MCPSessionPool`, keyed by url and capped at `max_sessions` (idle
+sessions are closed least recently used first).
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any
+
+from mcp import types
+from mcp.client.session import ClientSession
+
+from .mcp_client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 30
+PING_TIMEOUT = 10
+
+
+class MCPSession:
+    """A persistent session to the MCP server at `url`, (re)connected on demand."""
+
+    def __init__(self, url: str, heartbeat_interval: float = 30) -> None:
+        self.url = url
+        self.heartbeat_interval = heartbeat_interval
+        self.stats = {"connects": 0, "reconnects": 0, "calls": 0}
+        self._session: ClientSession | None = None
+        self._owner_task: asyncio.Task | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+        self._closing: asyncio.Event | None = None
+        self._lock = asyncio.Lock()
+        self._num_inflight = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def connected(self) -> bool:
+        return self._session is not None
+
+    @property
+    def busy(self) -> bool:
+        return self._num_inflight > 0
+
+    async def call_tool(self, name: str, arguments: dict[str, Any] | None = None) -> types.CallToolResult:
+        return await self._request(lambda session: session.call_tool(name, arguments))
+
+    async def list_tools(self) -> types.ListToolsResult:
+        return await self._request(lambda session: session.list_tools())
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._disconnect()
+
+    async def _request(self, send):
+        self._num_inflight += 1
+        self.last_used = time.monotonic()
+        try:
+            for attempt in range(2):
+                session, owner_task = await self._ensure_session()
+                try:
+                    res = await self._send(send(session), owner_task)
+                    self.stats["calls"] += 1
+                    return res
+                except Exception as e:  # pylint: disable=broad-except
+                    # errors of a healthy session (e.g. unknown tool) are not retried
+                    if attempt > 0 or await self._ping(session, owner_task):
+                        raise
+                    logger.warning(f"MCP session to {self.url} is broken ({e!r}), reconnecting")
+                    await self._reset(session)
+                    self.stats["reconnects"] += 1
+        finally:
+            self._num_inflight -= 1
+            self.last_used = time.monotonic()
+
+    async def _send(self, coro, owner_task: asyncio.Task):
+        """Await a request of the session owned by `owner_task`.
+
+        Pending requests are not failed when the transport dies, so the request is abandoned when the owner ends.
+        """
+        request = asyncio.ensure_future(coro)
+        await asyncio.wait([request, owner_task], return_when=asyncio.FIRST_COMPLETED)
+        if not request.done():
+            request.cancel()
+            raise ConnectionError(f"MCP session to {self.url} was closed")
+        return request.result()
+
+    async def _ensure_session(self) -> tuple[ClientSession, asyncio.Task]:
+        async with self._lock:
+            if self._session is None:
+                await self._connect()
+            return self._session, self._owner_task
+
+    async def _reset(self, session: ClientSession) -> None:
+        """Drop `session` if it is still the current one."""
+        async with self._lock:
+            if self._session is session:
+                await self._disconnect()
+
+    async def _connect(self) -> None:
+        ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._owner_task = asyncio.create_task(self._own_session(ready, self._closing))
+        try:
+            await asyncio.wait_for(ready.wait(), CONNECT_TIMEOUT)
+        except TimeoutError:
+            self._owner_task.cancel()
+            raise ConnectionError(f"Timed out connecting to MCP server {self.url}") from None
+        if self._session is None:
+            (error,) = await asyncio.gather(self._owner_task, return_exceptions=True)
+            self._owner_task = None
+            raise ConnectionError(f"Failed to connect to MCP server {self.url}: {error!r}")
+        self.stats["connects"] += 1
+        if self.heartbeat_interval and self.heartbeat_interval > 0:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat(self._session, self._owner_task))
+
+    async def _own_session(self, ready: asyncio.Event, closing: asyncio.Event) -> None:
+        """Enter and exit the transport contexts in this task, and keep them open until `closing` is set."""
+        session = None
+        try:
+            async with MCPClient.get_mcp_client(self.url) as session:
+                self._session = session
+                ready.set()
+                await closing.wait()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"MCP session to {self.url} ended: {e!r}")
+            if not ready.is_set():
+                raise
+        finally:
+            if session is not None and self._session is session:
+                self._session = None
+            ready.set()
+
+    async def _disconnect(self) -> None:
+        if self._heartbeat_task and self._heartbeat_task is not asyncio.current_task():
+            self._heartbeat_task.cancel()
+        self._heartbeat_task = None
+        self._session = None
+        if self._owner_task is not None:
+            self._closing.set()
+            try:
+                await asyncio.wait_for(self._owner_task, PING_TIMEOUT)
+            except Exception:  # pylint: disable=broad-except
+                pass  # already logged by the owner task, or cancelled on timeout
+            self._owner_task = None
+
+    async def _ping(self, session: ClientSession, owner_task: asyncio.Task) -> bool:
+        if self._session is not session:
+            return False
+        try:
+            await asyncio.wait_for(self._send(session.send_ping(), owner_task), PING_TIMEOUT)
+            return True
+        except Exception:  # pylint: disable=broad-except
+            return False
+
+    async def _heartbeat(self, session: ClientSession, owner_task: asyncio.Task) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if self._session is not session:
+                return
+            if not await self._ping(session, owner_task):
+                logger.warning(f"MCP session to {self.url} missed a heartbeat, dropping it")
+                await self._reset(session)
+                return
+
+
+class MCPSessionPool:
+    """Persistent MCP sessions by url, at most `max_sessions` of them (idle ones are evicted LRU)."""
+
+    def __init__(self, max_sessions: int = 32, heartbeat_interval: float = 30) -> None:
+        self.max_sessions = max_sessions
+        self.heartbeat_interval = heartbeat_interval
+        self._sessions: OrderedDict[str, MCPSession] = OrderedDict()
+        self._background_tasks: set[asyncio.Task] = set()
+
+    def get(self, url: str) -> MCPSession:
+        """Get the session to `url`, it connects lazily on first use."""
+        if url in self._sessions:
+            self._sessions.move_to_end(url)
+            return self._sessions[url]
+        self._evict()
+        session = self._sessions[url] = MCPSession(url, heartbeat_interval=self.heartbeat_interval)
+        return session
+
+    async def release(self, url: str) -> None:
+        """Close and forget the session to `url`, e.g. when its environment is cleaned up."""
+        session = self._sessions.pop(url, None)
+        if session is not None:
+            await session.close()
+
+    async def shutdown(self) -> None:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await asyncio.gather(*[session.close() for session in sessions])
+
+    def _evict(self) -> None:
+        if self.max_sessions <= 0:
+            return
+        for url in [url for url, session in self._sessions.items() if not session.busy]:
+            if len(self._sessions) < self.max_sessions:
+                return
+            self._run_in_background(self._sessions.pop(url).close())
+
+    def _run_in_background(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+
+# one pool per event loop, as the sessions are bound to the loop they were opened in
+_POOLS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MCPSessionPool] = weakref.WeakKeyDictionary()
+
+
+def get_mcp_session_pool(max_sessions: int = 32, heartbeat_interval: float = 30) -> MCPSessionPool:
+    """Get the session pool of the running event loop, the arguments only take effect on creation."""
+    loop = asyncio.get_running_loop()
+    if loop not in _POOLS:
+        _POOLS[loop] = MCPSessionPool(max_sessions=max_sessions, heartbeat_interval=heartbeat_interval)
+    return _POOLS[loop]
+
+
+async def shutdown_mcp_session_pool() -> None:
+    """Close the sessions of the running event loop."""
+    pool = _POOLS.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.shutdown()
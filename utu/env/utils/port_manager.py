@@ -1,36 +1,46 @@
 import socket
+from collections import deque
 
 
 class PortManager:
+    """Allocate ports from a free-list. A port taken by another process is skipped and retried later."""
+
     def __init__(self, port_range: tuple = (9000, 9999)):
         self.port_start, self.port_end = port_range
         self.used_ports: set[int] = set()
         self.reserved_ports: set[int] = set()
+        self.free_ports: deque[int] = deque(range(self.port_start, self.port_end + 1))
 
     def is_port_available(self, port: int) -> bool:
+        # binding fails immediately if the port is listened on, no need to wait for a connection
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(1)
-                result = sock.connect_ex(("localhost", port))
-                return result != 0
-        except Exception:  # pylint: disable=broad-except
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # ignore connections in TIME_WAIT
+                sock.bind(("0.0.0.0", port))
+                return True
+        except OSError:
             return False
 
     def allocate_port(self) -> int | None:
-        for port in range(self.port_start, self.port_end + 1):
-            if port not in self.used_ports and port not in self.reserved_ports:
-                if self.is_port_available(port):
-                    self.used_ports.add(port)
-                    return port
+        for _ in range(len(self.free_ports)):
+            port = self.free_ports.popleft()
+            if port in self.used_ports or port in self.reserved_ports:
+                continue  # stale entry
+            if self.is_port_available(port):
+                self.used_ports.add(port)
+                return port
+            self.free_ports.append(port)  # in use by another process, retry later
         return None
 
     def release_port(self, port: int):
-        self.used_ports.discard(port)
-        self.reserved_ports.discard(port)
+        if port in self.used_ports or port in self.reserved_ports:
+            self.used_ports.discard(port)
+            self.reserved_ports.discard(port)
+            self.free_ports.append(port)
 
     def reserve_port(self, port: int) -> bool:
-        if port not in self.used_ports and self.is_port_available(port):
-            self.reserved_ports.add(port)
+        if port not in self.used_ports and port not in self.reserved_ports and self.is_port_available(port):
+            self.reserved_ports.add(port)  # its free-list entry is skipped on allocation
             return True
         return False
 
@@ -1,12 +1,17 @@
 import asyncio
+import functools
 import json
 import time
 
 from tqdm import tqdm
 
-from ...agents import get_agent
+from ...agents import AgentPool, get_agent
 from ...config import ConfigLoader, EvalConfig
-from ...utils import AgentsUtils, get_logger
+from ...env.utils import shutdown_docker_managers, shutdown_mcp_session_pool
+from ...tools.mcp_server_pool import shutdown_mcp_server_pool
+from ...tools.search.http_session import HTTPSessionPool
+from ...tracing import ToolCallStatRunHook
+from ...utils import AgentsUtils, OpenAIClientRegistry, get_logger
 from ..data import DBDataManager, EvaluationSample
 from ..processer import PROCESSER_FACTORY, BaseProcesser
 
@@ -20,6 +25,7 @@ class BaseBenchmark:
       - preprocess: load and preprocess the data
       - rollout: rollout the predictions
       - judge: judge the correctness of a batch of predictions
+        (with `config.pipeline`, rollout and judge are pipelined per sample, see `rollout_and_judge`)
       - stat: get metrics.
     """
 
@@ -38,11 +44,23 @@ class BaseBenchmark:
         if len(_samples) == 0:
             raise ValueError(f"No samples found for data config '{self.config.data}'! Please check the data config.")
 
+        # live tool call stats of rollouts
+        self.toolcall_stat = ToolCallStatRunHook(run_id=self.config.exp_id)
+        # rollout agents, see `config.agent_max_uses` for reusing built agents across samples
+        self.agent_pool = AgentPool(
+            functools.partial(get_agent, self.config.agent),
+            size=self.config.concurrency,
+            max_uses=self.config.agent_max_uses,
+        )
+
     async def main(self):
         logger.info(f"> Running with config: \n{json.dumps(self.config.model_dump(), indent=2, ensure_ascii=False)}")
         self.preprocess()
-        await self.rollout()
-        await self.judge()
+        if self.config.pipeline:
+            await self.rollout_and_judge()
+        else:
+            await self.rollout()
+            await self.judge()
         logger.info("> Running stat...")
         await self.stat()
         logger.info("> Cleaning up...")
@@ -57,6 +75,7 @@ class BaseBenchmark:
             processed_sample = self.preprocess_one(sample)
             if processed_sample is not None:
                 results.append(processed_sample)
+        self.dataset.flush()
         logger.info(f"Successfully preprocessed {len(results)} samples. Updated to db.")
         return results
 
@@ -91,17 +110,18 @@ class BaseBenchmark:
             result = await task
             if result is not None:
                 results.append(result)
+        self.dataset.flush()
         logger.info(f"Successfully rollout {len(results)} samples. Updated to db.")
         return results
 
     async def rollout_one(self, sample: EvaluationSample) -> EvaluationSample:
-        agent = get_agent(self.config.agent)
-        if hasattr(agent, "build"):  # hack, should be removed!
-            await agent.build()
         trace_id = AgentsUtils.gen_trace_id()
-        start_time = time.time()
-        result = await agent.run(sample.augmented_question, trace_id=trace_id)
-        end_time = time.time()
+        async with self.agent_pool.lease(trace_id=trace_id) as agent:
+            if hasattr(agent, "set_run_hooks"):
+                agent.set_run_hooks(self.toolcall_stat)
+            start_time = time.time()
+            result = await agent.run(sample.augmented_question, trace_id=trace_id)
+            end_time = time.time()
 
         # Update the sample with the predicted answer and trajectory
         sample.update(
@@ -114,6 +134,61 @@ class BaseBenchmark:
         self.dataset.save(sample)
         return sample
 
+    async def rollout_and_judge(self) -> list[EvaluationSample]:
+        """Pipelined rollout & judge: each sample is judged as soon as its rollout is saved.
+
+        Rollouts and judgements are bounded by `config.concurrency` and `config.judge_concurrency` respectively.
+        Samples already rolled out (e.g. in an interrupted run) are judged directly.
+        """
+        to_rollout = self.dataset.get_samples(stage="init")
+        to_judge = self.dataset.get_samples(stage="rollout")
+        logger.info(f"Rollout & judge {len(to_rollout)} samples, judge {len(to_judge)} rolled out samples...")
+
+        rollout_semaphore = asyncio.Semaphore(self.config.concurrency)
+        judge_semaphore = asyncio.Semaphore(self.config.judge_concurrency)
+        stats = {"rollout": 0, "judged": 0, "correct": 0}
+
+        async def judge_with_semaphore(item: EvaluationSample):
+            async with judge_semaphore:
+                try:
+                    result = await self.judge_one(item)
+                except Exception as e:  # pylint: disable=broad-except
+                    logger.error(f">>>>>>>>>>>>>\nError judging sample '{item}': {e}\n<<<<<<<<<<<<<", exc_info=True)
+                    return None
+            stats["judged"] += 1
+            stats["correct"] += int(result.correct is True)
+            return result
+
+        async def rollout_and_judge_with_semaphore(item: EvaluationSample):
+            async with rollout_semaphore:
+                try:
+                    item = await self.rollout_one(item)
+                except Exception as e:  # pylint: disable=broad-except
+                    logger.error(
+                        f">>>>>>>>>>>>>\nError running rollout on sample '{item.raw_question}': {e}\n<<<<<<<<<<<<<",
+                        exc_info=True,
+                    )
+                    return None
+            stats["rollout"] += 1
+            return await judge_with_semaphore(item)
+
+        tasks = [rollout_and_judge_with_semaphore(item) for item in to_rollout]
+        tasks += [judge_with_semaphore(item) for item in to_judge]
+        results = []
+        with tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Rollout & judge") as pbar:
+            for task in pbar:
+                result = await task
+                if result is not None:
+                    results.append(result)
+                pbar.set_postfix(
+                    rollout=stats["rollout"],
+                    judged=stats["judged"],
+                    acc=f"{stats['correct'] / max(stats['judged'], 1):.4f}",
+                )
+        self.dataset.flush()
+        logger.info(f"Successfully judged {len(results)} samples, acc: {stats['correct'] / max(len(results), 1):.4f}.")
+        return results
+
     async def judge(self, stage: str | None = "rollout") -> list[EvaluationSample]:
         """Judge samples.
 
@@ -133,12 +208,31 @@ class BaseBenchmark:
                     logger.error(f">>>>>>>>>>>>>\nError judging sample '{item}': {e}\n<<<<<<<<<<<<<", exc_info=True)
                     return None
 
-        tasks = [judge_with_semaphore(item) for item in samples]
+        async def judge_batch_with_semaphore(batch: list[EvaluationSample]):
+            async with semaphore:
+                try:
+                    return await self.judge_batch(batch)
+                except Exception as e:  # pylint: disable=broad-except
+                    logger.error(f"Error judging batch of {len(batch)} samples: {e}", exc_info=True)
+                    return []
+
         results = []
-        for task in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Judging"):
-            result = await task
-            if result is not None:
-                results.append(result)
+        if self.config.judge_batch_size > 1:
+            batches = [
+                group[i : i + self.config.judge_batch_size]
+                for group in self._group_data_by_benchmark(samples).values()
+                for i in range(0, len(group), self.config.judge_batch_size)
+            ]
+            tasks = [judge_batch_with_semaphore(batch) for batch in batches]
+            for task in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Judging batches"):
+                results.extend(await task)
+        else:
+            tasks = [judge_with_semaphore(item) for item in samples]
+            for task in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Judging"):
+                result = await task
+                if result is not None:
+                    results.append(result)
+        self.dataset.flush()
         logger.info(f"Successfully judged {len(results)} samples. Updated to db.")
         return results
 
@@ -149,6 +243,15 @@ class BaseBenchmark:
         self.dataset.save(result)
         return result
 
+    async def judge_batch(self, samples: list[EvaluationSample]) -> list[EvaluationSample]:
+        """Judge samples of the same source with one judge request, see `BaseLLMJudgeProcesser.judge_batch`."""
+        judger = self._get_processer(samples[0].source)
+        results = await judger.judge_batch(samples)
+        for result in results:
+            result.update(stage="judged")
+            self.dataset.save(result)
+        return results
+
     async def stat(self) -> list[dict]:
         # TODO: wrap the data like @verl / @torch
         # TODO: log to wandb
@@ -163,6 +266,8 @@ class BaseBenchmark:
             overall_results.append(result)
 
         logger.info(json.dumps(overall_results, indent=4, ensure_ascii=False))
+        if toolcall_summary := self.toolcall_stat.summary():
+            logger.info(f"Tool call stats:\n{json.dumps(toolcall_summary, indent=4, ensure_ascii=False)}")
         return overall_results
 
     def _get_processer(self, source: str) -> BaseProcesser:
@@ -182,4 +287,11 @@ class BaseBenchmark:
         return data_by_benchmark
 
     async def cleanup(self):
-        pass
+        await self.agent_pool.close()
+        await shutdown_mcp_server_pool()  # shared stdio MCP servers
+        await shutdown_mcp_session_pool()  # MCP sessions to the env containers, before stopping them
+        await shutdown_docker_managers()  # warm env containers
+        await HTTPSessionPool.aclose()  # shared search & crawl session
+        await OpenAIClientRegistry.aclose()  # pooled LLM connections
+        self.dataset.flush()
+        await self.toolcall_stat.aflush()
@@ -1,7 +1,12 @@
 import abc
+import threading
+import time
+import weakref
+from collections.abc import Iterator
 from typing import Literal
 
-from sqlmodel import select
+from sqlalchemy.orm import load_only
+from sqlmodel import Session, and_, or_, select
 
 from ...config import EvalConfig
 from ...db import DatasetSample, EvaluationSample
@@ -33,12 +38,42 @@ class BaseDataManager(abc.ABC):
         """Get samples of specified stage from the dataset."""
         raise NotImplementedError
 
+    def iter_samples(
+        self, stage: Literal["init", "rollout", "judged"] = None, columns: list[str] | None = None
+    ) -> Iterator[EvaluationSample]:
+        """Iterate samples of specified stage from the dataset."""
+        yield from self.get_samples(stage)
+
+    def flush(self) -> None:  # noqa: B027
+        """Write buffered samples, if any."""
+        pass
+
 
 class DBDataManager(BaseDataManager):
-    """Database data manager for loading and saving data."""
+    """Database data manager for loading and saving data.
+
+    Saved samples are buffered and written in batches (write-behind), see `config.db_write_batch_size` and
+    `config.db_write_interval`. Reads flush the buffer first, so they always see the saved samples. The buffer is also
+    flushed when the manager is garbage collected or the interpreter exits, or on leaving a `with` block.
+    """
+
+    # columns always loaded by `iter_samples`, used for identity & keyset pagination
+    _KEY_COLUMNS = ("id", "exp_id", "stage", "dataset_index")
 
     def __init__(self, config: EvalConfig) -> None:
         self.config = config
+        self._buffer: dict[int, EvaluationSample] = {}  # sample.id -> sample, the last save of a row wins
+        self._new_samples: dict[int, EvaluationSample] = {}  # id(sample) -> sample, not in db yet (no `id`)
+        self._buffer_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        # must not reference self, the buffers are cleared in place by `flush`
+        self._finalizer = weakref.finalize(self, _write_samples, self._buffer, self._new_samples, self._buffer_lock)
+
+    def __enter__(self) -> "DBDataManager":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
 
     def load(self) -> list[EvaluationSample]:
         if self._check_exp_id():
@@ -67,12 +102,14 @@ class DBDataManager(BaseDataManager):
 
             self.data = samples
             self.save(self.data)  # save to db
+            self.flush()
             return self.data
 
     def get_samples(
         self, stage: Literal["init", "rollout", "judged"] = None, limit: int = None
     ) -> list[EvaluationSample]:
         """Get samples from exp_id with specified stage."""
+        self.flush()
         with SQLModelUtils.create_session() as session:
             samples = session.exec(
                 select(EvaluationSample)
@@ -85,19 +122,75 @@ class DBDataManager(BaseDataManager):
             ).all()
             return samples
 
-    def save(self, samples: list[EvaluationSample] | EvaluationSample) -> None:
-        """Update or add sample(s) to db."""
-        if isinstance(samples, list):
-            with SQLModelUtils.create_session() as session:
-                session.add_all(samples)
-                session.commit()
-        else:
+    def iter_samples(
+        self,
+        stage: Literal["init", "rollout", "judged"] = None,
+        columns: list[str] | None = None,
+        page_size: int = 500,
+    ) -> Iterator[EvaluationSample]:
+        """Stream samples from exp_id with specified stage, ordered by dataset_index.
+
+        Samples are fetched page by page with keyset pagination on (dataset_index, id), so memory usage is bounded
+        by `page_size`.
+
+        Args:
+            stage (str, optional): stage of samples, None for all stages
+            columns (list[str], optional): only load these columns (plus id, exp_id, stage and dataset_index), e.g.
+                `["correct"]` to skip heavy columns like `trajectories`. Accessing other columns raises an error.
+            page_size (int): number of samples fetched per query
+        """
+        self.flush()
+        options = []
+        if columns is not None:
+            load_columns = dict.fromkeys([*self._KEY_COLUMNS, *columns])
+            options.append(load_only(*[getattr(EvaluationSample, c) for c in load_columns]))
+
+        last: EvaluationSample | None = None
+        while True:
+            stmt = select(EvaluationSample).where(
+                EvaluationSample.exp_id == self.config.exp_id,
+                EvaluationSample.stage == stage if stage else True,
+            )
+            if last is not None:
+                stmt = stmt.where(
+                    or_(
+                        EvaluationSample.dataset_index > last.dataset_index,
+                        and_(EvaluationSample.dataset_index == last.dataset_index, EvaluationSample.id > last.id),
+                    )
+                )
+            stmt = stmt.options(*options).order_by(EvaluationSample.dataset_index, EvaluationSample.id).limit(page_size)
             with SQLModelUtils.create_session() as session:
-                session.add(samples)
-                session.commit()
+                page = session.exec(stmt).all()
+            yield from page
+            if len(page) < page_size:
+                return
+            last = page[-1]
+
+    def save(self, samples: list[EvaluationSample] | EvaluationSample) -> None:
+        """Update or add sample(s) to db. Samples are buffered and written in batches."""
+        if not isinstance(samples, list):
+            samples = [samples]
+        with self._buffer_lock:
+            for sample in samples:
+                if sample.id is None:  # the id is assigned when the sample is first written
+                    self._new_samples[id(sample)] = sample
+                else:
+                    self._buffer[sample.id] = sample
+            need_flush = (
+                len(self._buffer) + len(self._new_samples) >= self.config.db_write_batch_size
+                or time.monotonic() - self._last_flush >= self.config.db_write_interval
+            )
+        if need_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered samples into db in one transaction."""
+        self._last_flush = time.monotonic()
+        _write_samples(self._buffer, self._new_samples, self._buffer_lock)
 
     def delete_samples(self, samples: list[EvaluationSample] | EvaluationSample) -> None:
         """Delete sample(s) from db."""
+        self.flush()
         if isinstance(samples, list):
             with SQLModelUtils.create_session() as session:
                 for sample in samples:
@@ -115,3 +208,20 @@ class DBDataManager(BaseDataManager):
                 select(EvaluationSample).where(EvaluationSample.exp_id == self.config.exp_id)
             ).first()
         return has_exp_id is not None
+
+
+def _write_samples(
+    buffer: dict[int, EvaluationSample], new_samples: dict[int, EvaluationSample], lock: threading.Lock
+) -> None:
+    """Write and clear the buffered samples of a `DBDataManager`."""
+    with lock:
+        samples = [*new_samples.values(), *buffer.values()]
+        buffer.clear()
+        new_samples.clear()
+        if not samples:
+            return
+        # keep attributes accessible after commit, callers may still hold the samples
+        with Session(SQLModelUtils.get_engine(), expire_on_commit=False) as session:
+            session.add_all(samples)
+            session.commit()
+    logger.debug(f"Flushed {len(samples)} samples to db.")
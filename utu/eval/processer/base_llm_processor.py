@@ -1,9 +1,12 @@
+import asyncio
 import re
+import time
 
 from ...config import EvalConfig
-from ...utils import SimplifiedAsyncOpenAI, get_logger
+from ...utils import LLMOutputParser, SimplifiedAsyncOpenAI, get_logger
 from ..data import EvaluationSample
 from .base_processor import BaseProcesser
+from .judge_cache import JudgeCache
 from .prompts import AUGMENTATION_PROMPTS, JUDGE_PROMPTS
 from .utils import MetricsUtils
 
@@ -28,6 +31,7 @@ class BaseLLMJudgeProcesser(BaseProcesser):
     def __init__(self, config: EvalConfig) -> None:
         super().__init__(config)
         self.judge_client = SimplifiedAsyncOpenAI(**config.judge_model.model_provider.model_dump())
+        self.judge_cache = JudgeCache() if config.judge_cache else None
 
     def preprocess_one(self, sample: EvaluationSample) -> EvaluationSample:
         """Preprocess a single sample."""
@@ -41,31 +45,144 @@ class BaseLLMJudgeProcesser(BaseProcesser):
 
     async def judge_one(self, data: EvaluationSample) -> EvaluationSample:
         """Judge a single sample."""
-        question = data.raw_question
-        response = data.response
-        correct_answer = data.correct_answer or "unknown"
-
-        if correct_answer == "unknown":
-            # if correct answer is unknown, we cannot judge
-            data.update(judged_response="invalid", correct=False)
-            return data
-
-        # if exact match, return directly(maybe extract exact answer from response first)
-        if self._extract_exact_answer(response) == correct_answer:
-            data.update(judged_response="Exact match", correct=True)
+        if self._judge_without_llm(data):
             return data
 
+        question = data.raw_question
+        response = data.response
+        correct_answer = data.correct_answer
         messages = self._get_judge_messages(question=question, response=response, correct_answer=correct_answer)
+        start_time = time.time()
         content = await self.judge_client.query_one(
             messages=messages, **self.config.judge_model.model_params.model_dump()
         )
         parsed_content = self._parse_judge_response(content)
 
-        data.judged_response = content
+        verdict = {"judged_response": content, **parsed_content}
+        if verdict.get("correct") is None:
+            # no verdict found in the response, count it as incorrect but do not cache it, so it is retried next time
+            verdict["correct"] = False
+        else:
+            self._set_cached_verdict(self._get_judge_template(), data, verdict, time.time() - start_time)
         # update the return data with parsed content
-        data.update(**parsed_content)
+        data.update(**verdict)
         return data
 
+    async def judge_batch(self, samples: list[EvaluationSample]) -> list[EvaluationSample]:
+        """Judge multiple samples with one LLM request, see the `batch` judge template.
+        Samples whose verdicts are missing or cannot be parsed are judged one by one with `judge_one`, as well as all
+        samples of sources with a custom judge template or parser, see `_supports_batch_judging`."""
+        if not self._supports_batch_judging():
+            await asyncio.gather(*[self.judge_one(sample) for sample in samples])
+            return samples
+        pending = [sample for sample in samples if not self._judge_without_llm(sample, batch=True)]
+        verdicts: dict[int, dict] = {}
+        if len(pending) > 1:
+            try:
+                start_time = time.time()
+                verdicts = await self._query_batch_verdicts(pending)
+                for i, verdict in verdicts.items():
+                    self._set_cached_verdict(JUDGE_PROMPTS["batch"], pending[i], verdict, time.time() - start_time)
+                    pending[i].update(**verdict)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning(f"Batched judging of {len(pending)} samples failed, fallback to single judging: {e}")
+        fallback = [sample for i, sample in enumerate(pending) if i not in verdicts]
+        if fallback:
+            await asyncio.gather(*[self.judge_one(sample) for sample in fallback])
+        return samples
+
+    async def _query_batch_verdicts(self, samples: list[EvaluationSample]) -> dict[int, dict]:
+        """Query verdicts of samples in one request. Return {index in samples: verdict}."""
+        items = "\n".join(
+            JUDGE_PROMPTS["batch_item"].format(
+                id=i, question=sample.raw_question, response=sample.response, correct_answer=sample.correct_answer
+            )
+            for i, sample in enumerate(samples)
+        )
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": JUDGE_PROMPTS["batch"].format(items=items)},
+        ]
+        content = await self.judge_client.query_one(
+            messages=messages, **self.config.judge_model.model_params.model_dump()
+        )
+        results = LLMOutputParser.extract_code_json(content)
+        if not isinstance(results, list):
+            raise ValueError(f"Invalid batched judge response: {content}")
+
+        verdicts = {}
+        for result in results:
+            if not isinstance(result, dict) or result.get("id") not in range(len(samples)):
+                continue
+            correct = result.get("correct")
+            if isinstance(correct, str):
+                correct = correct.strip().lower() in ("yes", "true", "correct")
+            if not isinstance(correct, bool):  # no verdict, judge it again with `judge_one`
+                continue
+            confidence = result.get("confidence")
+            verdicts[result["id"]] = {
+                "judged_response": content,
+                "extracted_final_answer": str(result.get("extracted_final_answer") or ""),
+                "reasoning": str(result.get("reasoning") or ""),
+                "correct": correct,
+                "confidence": int(confidence) if isinstance(confidence, int | float) else None,
+            }
+        return verdicts
+
+    def _supports_batch_judging(self) -> bool:
+        """The `batch` template asks for the verdicts of the default template in json, so only sources judged with the
+        default template and parser can be batched."""
+        return (
+            self._get_judge_template() == JUDGE_PROMPTS["default"]
+            and type(self)._parse_judge_response is BaseLLMJudgeProcesser._parse_judge_response
+        )
+
+    def _judge_without_llm(self, data: EvaluationSample, batch: bool = False) -> bool:
+        """Judge the sample without querying the LLM if possible: unknown answer, exact match, or cached verdict.
+
+        Args:
+            batch (bool): also accept verdicts cached by batched judging
+        """
+        correct_answer = data.correct_answer or "unknown"
+        if correct_answer == "unknown":
+            # if correct answer is unknown, we cannot judge
+            data.update(judged_response="invalid", correct=False)
+            return True
+
+        # if exact match, return directly(maybe extract exact answer from response first)
+        if self._extract_exact_answer(data.response) == correct_answer:
+            data.update(judged_response="Exact match", correct=True)
+            return True
+
+        templates = [self._get_judge_template()] + ([JUDGE_PROMPTS["batch"]] if batch else [])
+        for template in templates:
+            if verdict := self._get_cached_verdict(template, data):
+                data.update(**verdict)
+                return True
+        return False
+
+    def _get_cached_verdict(self, template: str, data: EvaluationSample) -> dict | None:
+        if self.judge_cache is None:
+            return None
+        key = self._get_cache_key(template, data)
+        return self.judge_cache.get(key)
+
+    def _set_cached_verdict(self, template: str, data: EvaluationSample, verdict: dict, time_cost: float) -> None:
+        if self.judge_cache is None:
+            return
+        key = self._get_cache_key(template, data)
+        self.judge_cache.set(key, verdict, execution_time=time_cost)
+
+    def _get_cache_key(self, template: str, data: EvaluationSample) -> str:
+        return JudgeCache.get_key(
+            model=self.judge_client.default_config["model"],
+            model_params=self.config.judge_model.model_params.model_dump(),
+            template=template,
+            question=data.raw_question,
+            response=data.response,
+            correct_answer=data.correct_answer,
+        )
+
     def calculate_metrics(self, samples: list[EvaluationSample]) -> dict:
         """Caculate metrics from the judged data."""
         return {
@@ -73,10 +190,13 @@ class BaseLLMJudgeProcesser(BaseProcesser):
             **MetricsUtils.calculate_level_metrics(samples),
         }
 
-    def _get_judge_messages(self, question: str, response: str, correct_answer: str) -> list:
+    def _get_judge_template(self) -> str:
         if self.name not in JUDGE_PROMPT_MAP:
             logger.warning(f"Judge prompt for {self.name} is not implemented! Using default judge prompt.")
-        template = JUDGE_PROMPT_MAP.get(self.name, JUDGE_PROMPT_MAP["default"])
+        return JUDGE_PROMPT_MAP.get(self.name, JUDGE_PROMPT_MAP["default"])
+
+    def _get_judge_messages(self, question: str, response: str, correct_answer: str) -> list:
+        template = self._get_judge_template()
         input = template.format(question=question, response=response, correct_answer=correct_answer)
         return [{"role": "system", "content": "You are a helpful assistant."}, {"role": "user", "content": input}]
 
@@ -101,7 +221,7 @@ class BaseLLMJudgeProcesser(BaseProcesser):
             if match.group("extracted_final_answer")
             else "",
             "reasoning": match.group("reasoning").strip() if match.group("reasoning") else "",
-            "correct": match.group("correct").strip().lower() == "yes" if match.group("correct") else False,
+            "correct": match.group("correct").strip().lower() == "yes" if match.group("correct") else None,
             "confidence": int(match.group("confidence")) if match.group("confidence") else None,
         }
 
@@ -3,6 +3,7 @@ import string
 
 from ..data import EvaluationSample
 from .base_llm_processor import BaseLLMJudgeProcesser
+from .base_processor import BaseProcesser
 
 
 class BaseMatchProcesser(BaseLLMJudgeProcesser):
@@ -53,6 +54,10 @@ class BaseMatchProcesser(BaseLLMJudgeProcesser):
         data.update(correct=if_correct)
         return data
 
+    async def judge_batch(self, samples: list[EvaluationSample]) -> list[EvaluationSample]:
+        """Match-based judging needs no LLM request, judge one by one."""
+        return await BaseProcesser.judge_batch(self, samples)
+
     def _is_float(self, s: str) -> bool:
         """Check if a string is a float."""
         try:
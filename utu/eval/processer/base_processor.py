@@ -29,6 +29,10 @@ class BaseProcesser:
         """Judge a single sample."""
         raise NotImplementedError
 
+    async def judge_batch(self, samples: list[EvaluationSample]) -> list[EvaluationSample]:
+        """Judge a batch of samples. Default to judging one by one."""
+        return [await self.judge_one(sample) for sample in samples]
+
     @abc.abstractmethod
     def calculate_metrics(self, samples: list[EvaluationSample]) -> dict:
         """Calculate metrics from the judged data."""
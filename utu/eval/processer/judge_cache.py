@@ -0,0 +1,72 @@
+import hashlib
+import json
+import time
+from datetime import datetime
+
+from sqlmodel import select
+
+from ...db import ToolCacheModel
+from ...utils import CACHE_DIR, SQLModelUtils, get_logger
+
+logger = get_logger(__name__)
+
+
+class JudgeCache:
+    """Persistent cache of LLM-judge verdicts, keyed by (judge model, model params, prompt template, question,
+    response, correct_answer).
+
+    Verdicts are stored in the `cache_tool` table (with `function="llm_judge"`) if DB is available, otherwise as json
+    files under `CACHE_DIR / "llm_judge"`.
+    """
+
+    function_name = "llm_judge"
+
+    def __init__(self) -> None:
+        self.use_db = SQLModelUtils.check_db_available()
+        self.cache_dir = CACHE_DIR / self.function_name
+        if not self.use_db:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def get_key(
+        model: str, model_params: dict, template: str, question: str, response: str, correct_answer: str
+    ) -> str:
+        key_str = json.dumps(
+            [model, model_params, template, question, response, correct_answer],
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.md5(key_str.encode()).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        if self.use_db:
+            with SQLModelUtils.create_session() as session:
+                stmt = select(ToolCacheModel).where(
+                    ToolCacheModel.function == self.function_name, ToolCacheModel.cache_key == key
+                )
+                record = session.exec(stmt).first()
+                return record.result if record else None
+        cache_file = self.cache_dir / f"{key}.json"
+        if not cache_file.exists():
+            return None
+        with cache_file.open(encoding="utf-8") as f:
+            return json.load(f)
+
+    def set(self, key: str, verdict: dict, execution_time: float = 0.0) -> None:
+        if self.use_db:
+            with SQLModelUtils.create_session() as session:
+                session.add(
+                    ToolCacheModel(
+                        function=self.function_name,
+                        result=verdict,
+                        cache_key=key,
+                        execution_time=execution_time,
+                        timestamp=time.time(),
+                        datetime=datetime.now().isoformat(),
+                    )
+                )
+                session.commit()
+            return
+        with (self.cache_dir / f"{key}.json").open("w", encoding="utf-8") as f:
+            json.dump(verdict, f, ensure_ascii=False)
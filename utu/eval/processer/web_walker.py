@@ -40,5 +40,5 @@ class WebWalkerQAProcesser(BaseLLMJudgeProcesser):
 
         return {
             "reasoning": match.group("reasoning").strip() if match.group("reasoning") else "",
-            "correct": match.group("correct").strip() == "CORRECT" if match.group("correct") else False,
+            "correct": match.group("correct").strip() == "CORRECT" if match.group("correct") else None,
         }
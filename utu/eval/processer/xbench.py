@@ -75,7 +75,7 @@ class XBenchProcesser(BaseLLMJudgeProcesser):
             if match.group("extracted_final_answer")
             else "",
             "reasoning": match.group("reasoning").strip() if match.group("reasoning") else "",
-            "correct": match.group("correct").strip() == "正确" if match.group("correct") else False,
+            "correct": match.group("correct").strip() == "正确" if match.group("correct") else None,
         }
 
     def _extract_exact_answer(self, response: str) -> str:
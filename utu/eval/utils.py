@@ -12,6 +12,7 @@ def parse_eval_config() -> EvalConfig:
     parser.add_argument("--dataset_type", type=str, default=None, help="Dataset type.")
     parser.add_argument("--concurrency", type=int, default=None, help="Test concurrency.")
     parser.add_argument("--judge_concurrency", type=int, default=None, help="Judge concurrency.")
+    parser.add_argument("--pipeline", action="store_true", help="Judge each sample right after its rollout.")
     args = parser.parse_args()
 
     config = ConfigLoader.load_eval_config(args.config_name)
@@ -27,4 +28,6 @@ def parse_eval_config() -> EvalConfig:
         config.concurrency = args.concurrency
     if args.judge_concurrency:
         config.judge_concurrency = args.judge_concurrency
+    if args.pipeline:
+        config.pipeline = True
     return config
@@ -21,6 +21,7 @@ from agents import RunResultStreaming, trace
 
 from ..agents import SimpleAgent
 from ..agents.common import DataClassWithStreamEvents, QueueCompleteSentinel
+from ..tracing import ensure_tracing
 from ..utils import DIR_ROOT, FileUtils, LLMOutputParser, PrintUtils, get_logger
 
 logger = get_logger(__name__)
@@ -49,6 +50,7 @@ class ToolGenerator:
 
     async def run(self, user_input: str):
         self.llm.clear_input_items()
+        ensure_tracing()
         with trace("tool_generator"):
             task_recorder = TaskRecorder()
             # step 1: generate requirements
@@ -67,6 +69,7 @@ class ToolGenerator:
         return task_recorder
 
     async def _start_streaming(self, task_recorder: TaskRecorder, user_input: str):
+        ensure_tracing()
         with trace("tool_generator"):
             try:
                 await self.step1(task_recorder, user_input)
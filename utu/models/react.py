@@ -16,7 +16,6 @@ from agents import (
     TResponseInputItem,
 )
 from agents.items import TResponseStreamEvent
-from openai import AsyncOpenAI
 from openai.types.responses import (
     ResponseCompletedEvent,
     ResponseFunctionToolCall,
@@ -26,7 +25,7 @@ from openai.types.responses import (
 )
 from openai.types.responses.response_prompt_param import ResponsePromptParam
 
-from ..utils import get_logger
+from ..utils import OpenAIClientRegistry, get_logger
 from .react_converter import ConverterPreprocessInput, ReactConverter
 
 logger = get_logger(__name__)
@@ -136,5 +135,5 @@ class ReactModel(OpenAIChatCompletionsModel):
 
 
 def get_react_model(model: str, api_key: str, base_url: str) -> ReactModel:
-    openai_client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+    openai_client = OpenAIClientRegistry.get_client(base_url=base_url, api_key=api_key)
     return ReactModel(model=model, openai_client=openai_client)
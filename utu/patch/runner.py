@@ -3,11 +3,12 @@ import logging
 
 from agents import (
     Agent,
-    ItemHelpers,
     RunConfig,
     RunContextWrapper,
     RunHooks,
     RunItem,
+    RunResult,
+    RunResultStreaming,
     TContext,
     Tool,
     TResponseInputItem,
@@ -15,12 +16,23 @@ from agents import (
 from agents.run import AgentRunner, AgentToolUseTracker, SingleStepResult
 from agents.util import _coro
 
-from ..context import BaseContextManager
+from ..context import BaseContextManager, IncrementalHistory
+from ..tracing import ensure_tracing
 
 logger = logging.getLogger(__name__)
 
 
 class UTUAgentRunner(AgentRunner):
+    async def run(self, starting_agent: Agent[TContext], input: str | list[TResponseInputItem], **kwargs) -> RunResult:
+        ensure_tracing()
+        return await super().run(starting_agent, input, **kwargs)
+
+    def run_streamed(
+        self, starting_agent: Agent[TContext], input: str | list[TResponseInputItem], **kwargs
+    ) -> RunResultStreaming:
+        ensure_tracing()
+        return super().run_streamed(starting_agent, input, **kwargs)
+
     # TODO: also add context_manager to _run_single_turn_streamed for .run_streamed
     @classmethod
     async def _run_single_turn(
@@ -51,30 +63,33 @@ class UTUAgentRunner(AgentRunner):
 
         output_schema = cls._get_output_schema(agent)
         handoffs = await cls._get_handoffs(agent, context_wrapper)
-        input = ItemHelpers.input_to_new_input_list(original_input)
-        input.extend([generated_item.to_input_item() for generated_item in generated_items])
+        # MOD: convert only the items generated since the last turn, see `IncrementalHistory`
+        history = cls._get_history(context_wrapper)
+        history.sync(original_input, generated_items)
 
         # FIXME: set context manage as a hook?
         # ADD: context manager
         context_manager: BaseContextManager | None = None
         if context_wrapper.context:
             context_manager = context_wrapper.context.get("context_manager", None)
-        if context_manager:
-            input = context_manager.preprocess(input, context_wrapper)
-        # print(f"< [DEBUG] input: {input}")
-        new_response = await cls._get_new_response(
-            agent,
-            system_prompt,
-            input,
-            output_schema,
-            all_tools,
-            handoffs,
-            context_wrapper,
-            run_config,
-            tool_use_tracker,
-            previous_response_id,
-            prompt_config,
-        )
+        ephemeral_items = context_manager.get_ephemeral_items(context_wrapper) if context_manager else []
+        with history.ephemeral(ephemeral_items) as input:
+            if context_manager:
+                input = context_manager.preprocess(input, context_wrapper)
+            # print(f"< [DEBUG] input: {input}")
+            new_response = await cls._get_new_response(
+                agent,
+                system_prompt,
+                input,
+                output_schema,
+                all_tools,
+                handoffs,
+                context_wrapper,
+                run_config,
+                tool_use_tracker,
+                previous_response_id,
+                prompt_config,
+            )
 
         # ADD: response logging
         # print(json.dumps([item.model_dump() for item in new_response.output], ensure_ascii=False))
@@ -96,3 +111,12 @@ class UTUAgentRunner(AgentRunner):
         if context_manager:
             single_turn_result = context_manager.process(single_turn_result)
         return single_turn_result
+
+    @staticmethod
+    def _get_history(context_wrapper: RunContextWrapper[TContext]) -> IncrementalHistory:
+        # the context wrapper lives as long as the run, keep the history of the run on it
+        history = getattr(context_wrapper, "_utu_history", None)
+        if history is None:
+            history = IncrementalHistory()
+            context_wrapper._utu_history = history
+        return history
@@ -1,41 +1,83 @@
+import importlib
+from collections.abc import Iterator, Mapping
+from typing import TYPE_CHECKING
+
 from ..config import ConfigLoader
-from .arxiv_toolkit import ArxivToolkit
-from .audio_toolkit import AudioToolkit
 from .base import AsyncBaseToolkit as AsyncBaseToolkit
-from .bash_toolkit import BashToolkit
-from .codesnip_toolkit import CodesnipToolkit
-from .document_toolkit import DocumentToolkit
-from .file_edit_toolkit import FileEditToolkit
-from .github_toolkit import GitHubToolkit
-from .image_toolkit import ImageToolkit
-from .memory_toolkit import SimpleMemoryToolkit
-from .python_executor_toolkit import PythonExecutorToolkit
-from .search_toolkit import SearchToolkit
-from .serper_toolkit import SerperToolkit
-from .tabular_data_toolkit import TabularDataToolkit
-from .user_interaction_toolkit import UserInteractionToolkit
 from .utils import get_tools_map as get_tools_map, get_tools_schema as get_tools_schema, register_tool as register_tool
-from .video_toolkit import VideoToolkit
-from .wikipedia_toolkit import WikipediaSearchTool
-
-TOOLKIT_MAP: dict[str, type[AsyncBaseToolkit]] = {
-    "search": SearchToolkit,
-    "document": DocumentToolkit,
-    "image": ImageToolkit,
-    "file_edit": FileEditToolkit,
-    "github": GitHubToolkit,
-    "arxiv": ArxivToolkit,
-    "wikipedia": WikipediaSearchTool,
-    "codesnip": CodesnipToolkit,
-    "bash": BashToolkit,
-    "python_executor": PythonExecutorToolkit,
-    "video": VideoToolkit,
-    "audio": AudioToolkit,
-    "serper": SerperToolkit,
-    "tabular": TabularDataToolkit,
-    "memory_simple": SimpleMemoryToolkit,
-    "user_interaction": UserInteractionToolkit,
+
+if TYPE_CHECKING:
+    from .arxiv_toolkit import ArxivToolkit as ArxivToolkit
+    from .audio_toolkit import AudioToolkit as AudioToolkit
+    from .bash_toolkit import BashToolkit as BashToolkit
+    from .codesnip_toolkit import CodesnipToolkit as CodesnipToolkit
+    from .document_toolkit import DocumentToolkit as DocumentToolkit
+    from .file_edit_toolkit import FileEditToolkit as FileEditToolkit
+    from .github_toolkit import GitHubToolkit as GitHubToolkit
+    from .image_toolkit import ImageToolkit as ImageToolkit
+    from .memory_toolkit import SimpleMemoryToolkit as SimpleMemoryToolkit
+    from .python_executor_toolkit import PythonExecutorToolkit as PythonExecutorToolkit
+    from .search_toolkit import SearchToolkit as SearchToolkit
+    from .serper_toolkit import SerperToolkit as SerperToolkit
+    from .tabular_data_toolkit import TabularDataToolkit as TabularDataToolkit
+    from .user_interaction_toolkit import UserInteractionToolkit as UserInteractionToolkit
+    from .video_toolkit import VideoToolkit as VideoToolkit
+    from .wikipedia_toolkit import WikipediaSearchTool as WikipediaSearchTool
+
+# toolkit name -> (class name, module). Toolkits pull in heavy dependencies (matplotlib, IPython, pandas, ...), so
+# they are imported on first access, e.g. `TOOLKIT_MAP["search"]` or `from utu.tools import SearchToolkit`.
+_TOOLKITS: dict[str, tuple[str, str]] = {
+    "search": ("SearchToolkit", ".search_toolkit"),
+    "document": ("DocumentToolkit", ".document_toolkit"),
+    "image": ("ImageToolkit", ".image_toolkit"),
+    "file_edit": ("FileEditToolkit", ".file_edit_toolkit"),
+    "github": ("GitHubToolkit", ".github_toolkit"),
+    "arxiv": ("ArxivToolkit", ".arxiv_toolkit"),
+    "wikipedia": ("WikipediaSearchTool", ".wikipedia_toolkit"),
+    "codesnip": ("CodesnipToolkit", ".codesnip_toolkit"),
+    "bash": ("BashToolkit", ".bash_toolkit"),
+    "python_executor": ("PythonExecutorToolkit", ".python_executor_toolkit"),
+    "video": ("VideoToolkit", ".video_toolkit"),
+    "audio": ("AudioToolkit", ".audio_toolkit"),
+    "serper": ("SerperToolkit", ".serper_toolkit"),
+    "tabular": ("TabularDataToolkit", ".tabular_data_toolkit"),
+    "memory_simple": ("SimpleMemoryToolkit", ".memory_toolkit"),
+    "user_interaction": ("UserInteractionToolkit", ".user_interaction_toolkit"),
 }
+# toolkit class name -> module
+_TOOLKIT_MODULES: dict[str, str] = dict(_TOOLKITS.values())
+
+
+def _import_toolkit(class_name: str) -> type[AsyncBaseToolkit]:
+    module = importlib.import_module(_TOOLKIT_MODULES[class_name], __name__)
+    return getattr(module, class_name)
+
+
+class _LazyToolkitMap(Mapping[str, type[AsyncBaseToolkit]]):
+    """Read-only {name: toolkit class} map which imports the toolkit module on lookup."""
+
+    def __init__(self, names: dict[str, str]) -> None:
+        self._names = names  # toolkit name -> class name
+
+    def __getitem__(self, name: str) -> type[AsyncBaseToolkit]:
+        return _import_toolkit(self._names[name])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+TOOLKIT_MAP: Mapping[str, type[AsyncBaseToolkit]] = _LazyToolkitMap(
+    {name: class_name for name, (class_name, _) in _TOOLKITS.items()}
+)
+
+
+def __getattr__(name: str):
+    if name in _TOOLKIT_MODULES:
+        return _import_toolkit(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_toolkits_map(names: list[str] | None = None) -> dict[str, AsyncBaseToolkit]:
@@ -75,5 +75,9 @@ class AsyncBaseToolkit:
         tool = tools_map[name]
         return await tool(**arguments)
 
+    async def cleanup(self) -> None:
+        """Release resources held by the toolkit, e.g. processes and sessions."""
+        pass
+
 
 TOOL_PROMPTS: dict[str, str] = FileUtils.load_prompts("tools/tools_prompts.yaml")
@@ -0,0 +1,173 @@
+"""Pool of persistent bash shells for `BashToolkit`.
+
+Shells are spawned ahead of time and leased to one toolkit (i.e. one agent session) at a time, so a session neither
+waits for a shell to start nor shares its shell with other sessions. Commands are awaited with pexpect's async
+interface, without blocking the event loop. Returned shells are reset (respawned) in background before being
+leased again; shells that cannot be reset are killed and replaced.
+"""
+
+import asyncio
+import re
+import shlex
+import weakref
+
+import pexpect
+
+from ..utils import get_logger
+
+logger = get_logger(__name__)
+
+# A unique prompt, so we can detect the end of a command reliably
+PROMPT = "PEXPECT_PROMPT>> "
+ANSI_ESCAPE = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+# skip rc files: start-up in ms instead of seconds (e.g. conda init), and no rc file can override the prompt.
+# The environment (PATH etc.) is inherited from the current process.
+BASH_COMMAND = "/bin/bash --norc --noprofile"
+SHELL_START_TIMEOUT = 10
+INTERRUPT_TIMEOUT = 2
+
+
+class BashShell:
+    """A persistent bash process, see https://github.com/pexpect/pexpect/issues/321"""
+
+    def __init__(self) -> None:
+        self._spawn()
+
+    @property
+    def alive(self) -> bool:
+        return self.child.isalive()
+
+    async def run(self, cmd: str, timeout: float) -> str:
+        """Run a command and return its output. Raise `pexpect.TIMEOUT` on timeout, `pexpect.EOF` if the shell exits."""
+        self.child.sendline(cmd)
+        await self.child.expect_exact(PROMPT, timeout=timeout, async_=True)
+        # pexpect puts everything printed before the matched prompt in child.before
+        output = ANSI_ESCAPE.sub("", self.child.before.strip())
+        if output.startswith("\r"):
+            output = output[1:]
+        return output
+
+    async def interrupt(self) -> bool:
+        """Send Ctrl-C to the running command, return whether the shell gets back to the prompt."""
+        try:
+            self.child.sendintr()
+            await self.child.expect_exact(PROMPT, timeout=INTERRUPT_TIMEOUT, async_=True)
+            return True
+        except (pexpect.TIMEOUT, pexpect.EOF, OSError):
+            return False
+
+    async def reset(self) -> None:
+        """Replace the bash process with a fresh one, dropping cwd, (exported) variables, functions etc.
+
+        NOTE: `exec bash` in the same pty is not enough, the new bash inherits the exported env and the cwd."""
+        self.kill()
+        await asyncio.to_thread(self._spawn)
+
+    def kill(self) -> None:
+        self.child.close(force=True)
+
+    def _spawn(self) -> None:
+        # only search the tail of the output for the prompt, keeps `expect` linear on huge outputs
+        self.child = pexpect.spawn(
+            BASH_COMMAND, encoding="utf-8", echo=False, timeout=SHELL_START_TIMEOUT, searchwindowsize=len(PROMPT) * 4
+        )
+        self._init_prompt()
+        self.child.expect_exact(PROMPT)
+
+    def _init_prompt(self) -> None:
+        self.child.sendline("stty -onlcr")
+        self.child.sendline("unset PROMPT_COMMAND")
+        self.child.sendline(f"PS1='{PROMPT}'")
+
+
+class BashShellPool:
+    """Keeps `size` idle shells ready to be leased."""
+
+    def __init__(self, size: int = 4) -> None:
+        self.size = size
+        self._idle: list[BashShell] = []
+        self._num_starting = 0
+        self._background_tasks: set[asyncio.Task] = set()
+
+    async def lease(self) -> BashShell:
+        shell = None
+        while self._idle:
+            shell = self._idle.pop()
+            if shell.alive:
+                break
+            shell.kill()
+            shell = None
+        if shell is None:
+            shell = await asyncio.to_thread(BashShell)
+        self._run_in_background(self.warmup())
+        return shell
+
+    def release(self, shell: BashShell, healthy: bool = True) -> None:
+        """Return a leased shell. Healthy shells are reset and reused, others are killed."""
+        if healthy and shell.alive:
+            self._run_in_background(self._recycle(shell))
+        else:
+            shell.kill()
+            self._run_in_background(self.warmup())
+
+    async def warmup(self) -> None:
+        num_missing = self.size - len(self._idle) - self._num_starting
+        if num_missing > 0:
+            await asyncio.gather(*[self._start_idle_shell() for _ in range(num_missing)])
+
+    def shutdown(self) -> None:
+        for shell in self._idle:
+            shell.kill()
+        self._idle.clear()
+
+    async def _recycle(self, shell: BashShell) -> None:
+        try:
+            await shell.reset()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"Failed to reset bash shell: {e}")
+            shell.kill()
+            await self.warmup()
+            return
+        if len(self._idle) < self.size:
+            self._idle.append(shell)
+        else:
+            shell.kill()
+
+    async def _start_idle_shell(self) -> None:
+        self._num_starting += 1
+        try:
+            self._idle.append(await asyncio.to_thread(BashShell))
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"Failed to start bash shell: {e}")
+        finally:
+            self._num_starting -= 1
+
+    def _run_in_background(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+
+def cd_command(path: str) -> str:
+    return f"cd {shlex.quote(path)}"
+
+
+def truncate_output(output: str, max_chars: int) -> str:
+    """Keep the head and tail of an output longer than `max_chars`."""
+    if max_chars <= 0 or len(output) <= max_chars:
+        return output
+    head = output[: max_chars // 2]
+    tail = output[len(output) - max_chars // 2 :]
+    return f"{head}\n... [{len(output) - len(head) - len(tail)} chars truncated] ...\n{tail}"
+
+
+# one pool per event loop, as leased shells are awaited in the loop
+_POOLS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BashShellPool] = weakref.WeakKeyDictionary()
+
+
+def get_shell_pool(size: int = 4) -> BashShellPool:
+    """Get the shell pool of the running event loop, `size` only takes effect on creation."""
+    loop = asyncio.get_running_loop()
+    if loop not in _POOLS:
+        _POOLS[loop] = BashShellPool(size=size)
+    return _POOLS[loop]
@@ -14,32 +14,46 @@ Run commands in a bash shell\n
 * Please run long lived commands in the background, e.g. 'sleep 10 &' or start a server in the background."
 """
 
+import asyncio
 import pathlib
-import re
-import sys
 
 import pexpect
 
 from ..config import ToolkitConfig
 from ..utils import get_logger
 from .base import AsyncBaseToolkit, register_tool
+from .bash_shell_pool import BashShell, cd_command, get_shell_pool, truncate_output
 
 logger = get_logger(__name__)
 
 
 class BashToolkit(AsyncBaseToolkit):
+    """Run commands in a persistent bash shell leased from the process-wide `BashShellPool`.
+
+    Config:
+        workspace_root (str): working directory of the shell. Defaults to /tmp/.
+        timeout (int): timeout of a command in seconds. Defaults to 60.
+        pool_size (int): number of idle shells kept ready. Defaults to 4.
+        max_output_chars (int): outputs longer than this are truncated (head & tail kept), 0 to disable.
+            Defaults to 20000.
+    """
+
     def __init__(self, config: ToolkitConfig = None) -> None:
         super().__init__(config)
         # self.require_confirmation = self.config.config.get("require_confirmation", False)
         # self.command_filters = self.config.config.get("command_filters", [])
         self.timeout = self.config.config.get("timeout", 60)
+        self.pool_size = self.config.config.get("pool_size", 4)
+        self.max_output_chars = self.config.config.get("max_output_chars", 20_000)
         self.banned_command_strs = [
             "git init",
             "git commit",
             "git add",
         ]
 
-        self.child, self.custom_prompt = self.start_persistent_shell(timeout=self.timeout)
+        # the shell is leased on the first command, and returned to the pool in `cleanup`
+        self.shell: BashShell | None = None
+        self._shell_lock = asyncio.Lock()  # a shell runs one command at a time
 
         workspace_root = self.config.config.get("workspace_root", "/tmp/")
         self.setup_workspace(workspace_root)
@@ -48,48 +62,25 @@ class BashToolkit(AsyncBaseToolkit):
         workspace_dir = pathlib.Path(workspace_root)
         workspace_dir.mkdir(parents=True, exist_ok=True)
         self.workspace_root = workspace_root
-        self.run_command(self.child, self.custom_prompt, f"cd {workspace_root}")
-
-    @staticmethod
-    def start_persistent_shell(timeout: int):
-        # https://github.com/pexpect/pexpect/issues/321
-
-        # Start a new Bash shell
-        if sys.platform == "win32":
-            child = pexpect.spawn("cmd.exe", encoding="utf-8", echo=False, timeout=timeout)
-            custom_prompt = "PROMPT_>"
-            child.sendline(f"prompt {custom_prompt}")
-            child.expect(custom_prompt)
-        else:
-            child = pexpect.spawn("/bin/bash", encoding="utf-8", echo=False, timeout=timeout)
-            # Set a known, unique prompt
-            # We use a random string that is unlikely to appear otherwise
-            # so we can detect the prompt reliably.
-            custom_prompt = "PEXPECT_PROMPT>> "
-            child.sendline("stty -onlcr")
-            child.sendline("unset PROMPT_COMMAND")
-            child.sendline(f"PS1='{custom_prompt}'")
-            # Force an initial read until the newly set prompt shows up
-            child.expect(custom_prompt)
-            return child, custom_prompt
-
-    @staticmethod
-    def run_command(child, custom_prompt: str, cmd: str) -> str:
-        # Send the command
-        child.sendline(cmd)
-        # Wait until we see the prompt again
-        child.expect(custom_prompt)
-        # Output is everything printed before the prompt minus the command itself
-        # pexpect puts the matched prompt in child.after and everything before it in child.before.
-
-        raw_output = child.before.strip()
-        ansi_escape = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
-        clean_output = ansi_escape.sub("", raw_output)
-
-        if clean_output.startswith("\r"):
-            clean_output = clean_output[1:]
-
-        return clean_output
+
+    async def cleanup(self) -> None:
+        async with self._shell_lock:
+            if self.shell is not None:
+                get_shell_pool(self.pool_size).release(self.shell)
+                self.shell = None
+
+    async def _get_shell(self) -> BashShell:
+        if self.shell is None or not self.shell.alive:
+            if self.shell is not None:
+                get_shell_pool(self.pool_size).release(self.shell, healthy=False)
+            self.shell = await get_shell_pool(self.pool_size).lease()
+            await self.shell.run(cd_command(self.workspace_root), timeout=self.timeout)
+        return self.shell
+
+    async def _restart_shell(self) -> None:
+        get_shell_pool(self.pool_size).release(self.shell, healthy=False)
+        self.shell = None
+        await self._get_shell()
 
     @register_tool
     async def run_bash(self, command: str) -> str:
@@ -112,25 +103,34 @@ class BashToolkit(AsyncBaseToolkit):
         # if self.require_confirmation:
         #     ...
 
-        # confirm no bad stuff happened
-        try:
-            echo_result = self.run_command(self.child, self.custom_prompt, "echo hello")
-            assert echo_result.strip() == "hello"
-        except Exception:  # pylint: disable=broad-except
-            self.child, self.custom_prompt = self.start_persistent_shell(self.timeout)
-
         # 3) Execute the command and capture output
-        try:
-            result = self.run_command(self.child, self.custom_prompt, command)
-            return str(
-                {
-                    "command output": result,
-                }
-            )
-        except Exception as e:  # pylint: disable=broad-except
-            return str(
-                {
-                    "error": str(e),
-                }
-            )
+        async with self._shell_lock:
+            try:
+                shell = await self._get_shell()
+                result = await shell.run(command, timeout=self.timeout)
+                return str(
+                    {
+                        "command output": truncate_output(result, self.max_output_chars),
+                    }
+                )
+            except pexpect.TIMEOUT:
+                # try to get back to the prompt, otherwise the shell is hung and replaced
+                if await self.shell.interrupt():
+                    return str({"error": f"Command timed out after {self.timeout} seconds and was interrupted."})
+                logger.warning(f"Bash shell hung after command: {command}, restarting")
+                await self._restart_shell()
+                return str(
+                    {
+                        "error": f"Command timed out after {self.timeout} seconds, "
+                        f"the shell was restarted in {self.workspace_root}."
+                    }
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                if self.shell is not None and not self.shell.alive:  # e.g. `exit`
+                    await self._restart_shell()
+                return str(
+                    {
+                        "error": str(e),
+                    }
+                )
         # TODO: add workspace tree in output
@@ -6,14 +6,33 @@ Support backends:
 - pymupdf: <https://github.com/pymupdf/PyMuPDF>
 """
 
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
 from ..config import ToolkitConfig
-from ..utils import CACHE_DIR, FileUtils, SimplifiedAsyncOpenAI, get_logger
+from ..utils import CACHE_DIR, BM25Index, FileUtils, RetrievalUtils, SimplifiedAsyncOpenAI, get_logger
 from .base import TOOL_PROMPTS, AsyncBaseToolkit, register_tool
 
 logger = get_logger(__name__)
 
+# parsed documents & their retrieval indexes kept in memory, shared by all toolkits. cache key -> (chunks, index)
+_INDEX_CACHE: OrderedDict[str, tuple[list[str], BM25Index]] = OrderedDict()
+INDEX_CACHE_SIZE = 16
+# config keys that do not change the parse result
+NON_PARSER_CONFIG_KEYS = {"text_limit", "chunk_size", "parse_workers", "CHUNKR_API_KEY"}
+
 
 class DocumentToolkit(AsyncBaseToolkit):
+    """Document Q&A.
+
+    Parsed documents are cached on disk, keyed by the file md5 and the parser config. Documents longer than
+    `text_limit` are split into chunks of `chunk_size` chars, and a question is answered with the most relevant
+    chunks (BM25) fitting in `text_limit` instead of the head of the document.
+    """
+
     def __init__(self, config: ToolkitConfig = None) -> None:
         """Initialize the DocumentToolkit, with configed parser and llm."""
         super().__init__(config)
@@ -28,15 +47,43 @@ class DocumentToolkit(AsyncBaseToolkit):
         else:
             raise ValueError(f"Unsupported parser: {self.config.config.get('parser')}")
         self.text_limit = self.config.config.get("text_limit", 100_000)
+        self.chunk_size = self.config.config.get("chunk_size", 2_000)
         self.llm = SimplifiedAsyncOpenAI(**self.config.config_llm.model_provider.model_dump())
         self.md5_to_path = {}
+        self._path_to_md5: dict[tuple, str] = {}
+        parser_config = {k: v for k, v in self.config.config.items() if k not in NON_PARSER_CONFIG_KEYS}
+        self.parser_key = hashlib.md5(json.dumps(parser_config, sort_keys=True, default=str).encode()).hexdigest()[:8]
 
     async def parse_document(self, md5: str) -> str:
+        cache_file = CACHE_DIR / "documents" / "parsed" / f"{md5}_{self.parser_key}.md"
+        if cache_file.exists():
+            return cache_file.read_text(encoding="utf-8")
         logger.info(f"[tool] parse_document: {self.md5_to_path[md5]}")
-        return await self.parser.parse(self.md5_to_path[md5])
+        markdown = await self.parser.parse(self.md5_to_path[md5])
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(markdown, encoding="utf-8")
+        tmp_file.replace(cache_file)  # atomic, concurrent parses of the same document are safe
+        return markdown
+
+    async def get_document_chunks(self, md5: str) -> tuple[list[str], BM25Index]:
+        cache_key = f"{md5}_{self.parser_key}_{self.chunk_size}"
+        if cache_key in _INDEX_CACHE:
+            _INDEX_CACHE.move_to_end(cache_key)
+            return _INDEX_CACHE[cache_key]
+        chunks = RetrievalUtils.split_text(await self.parse_document(md5), self.chunk_size)
+        _INDEX_CACHE[cache_key] = (chunks, BM25Index(chunks))
+        while len(_INDEX_CACHE) > INDEX_CACHE_SIZE:
+            _INDEX_CACHE.popitem(last=False)
+        return _INDEX_CACHE[cache_key]
 
     def handle_path(self, path: str) -> str:
+        # md5 of a document is computed once per (path, size, mtime); for URLs, once per URL
+        path_key = (path,) if FileUtils.is_web_url(path) else (path, os.path.getsize(path), os.path.getmtime(path))
+        if path_key in self._path_to_md5:
+            return self._path_to_md5[path_key]
         md5 = FileUtils.get_file_md5(path)
+        self._path_to_md5[path_key] = md5
         if FileUtils.is_web_url(path):
             # download document to data/_document, with md5
             fn = CACHE_DIR / "documents" / f"{md5}{FileUtils.get_file_ext(path)}"
@@ -59,9 +106,7 @@ class DocumentToolkit(AsyncBaseToolkit):
             question (str, optional): The question to answer. If not provided, return a summary of the document.
         """
         md5 = self.handle_path(document_path)
-        document_markdown = await self.parse_document(md5)
-        if len(document_markdown) > self.text_limit:
-            document_markdown = document_markdown[: self.text_limit] + "\n..."
+        document_markdown = await self.get_document_context(md5, question)
         messages = [
             {"role": "system", "content": TOOL_PROMPTS["document_sp"]},
             {"role": "user", "content": document_markdown},
@@ -76,3 +121,24 @@ class DocumentToolkit(AsyncBaseToolkit):
                 f"You did not provide a particular question, so here is a detailed caption for the document: {output}"
             )
         return output
+
+    async def get_document_context(self, md5: str, question: str | None = None) -> str:
+        """The whole document if it fits in `text_limit`, else the chunks most relevant to the question (or the
+        beginning of the document for a summary)."""
+        chunks, index = await self.get_document_chunks(md5)
+        if sum(len(chunk) + 2 for chunk in chunks) <= self.text_limit:
+            context = "\n\n".join(chunks)
+        elif not question or not (selected := index.select(question, self.text_limit)):
+            context = "\n\n".join(chunks)[: self.text_limit] + "\n..."
+        else:
+            parts = []
+            for prev, i in zip([-1] + selected[:-1], selected, strict=True):
+                if i != prev + 1:
+                    parts.append("...")
+                parts.append(chunks[i])
+            if selected[-1] != len(chunks) - 1:
+                parts.append("...")
+            context = "\n\n".join(parts)
+        if hasattr(self.parser, "extract_images"):
+            await asyncio.to_thread(self.parser.extract_images, self.md5_to_path[md5], context)
+        return context
@@ -1,49 +1,105 @@
-import uuid
-from datetime import datetime
+import asyncio
+import multiprocessing
+import os
+import pathlib
+import re
+from concurrent.futures import ProcessPoolExecutor
 
-from ...utils import CACHE_DIR, EnvUtils, get_logger
+from ...utils import CACHE_DIR, EnvUtils, FileUtils, get_logger
 
 logger = get_logger(__name__)
 
+IMAGE_PATTERN = re.compile(r"!\[Image\]\((.+?page_(\d+)_img_(\d+)\.png)\)")
+# documents with fewer pages are parsed in the current process
+MIN_PAGES_PER_WORKER = 64
+
+_executors: dict[int, ProcessPoolExecutor] = {}
+
+
+def _get_executor(max_workers: int) -> ProcessPoolExecutor:
+    if max_workers not in _executors:
+        # forkserver: do not fork the (multi-threaded) main process
+        _executors[max_workers] = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _executors[max_workers]
+
+
+def _parse_pages(path: str, start: int, end: int, image_dir: str) -> list[str]:
+    """Markdown of pages [start, end). Images are only referenced, see `PDFParser.extract_images`."""
+    import fitz  # pymupdf
+
+    parts = []
+    with fitz.open(path) as doc:
+        for page_num in range(start, end):
+            page = doc.load_page(page_num)
+            text = page.get_text()
+            parts.append(f"## Page {page_num + 1}\n\n")
+            if text.strip():
+                parts.append(text.strip() + "\n\n")
+            for img_index, _ in enumerate(page.get_images()):
+                parts.append(f"![Image]({image_dir}/page_{page_num}_img_{img_index}.png)\n\n")
+    return parts
+
 
 class PDFParser:
+    """Parse PDF to markdown with pymupdf.
+
+    Pages are parsed in parallel in a process pool (`parse_workers`). Embedded images are not written while parsing,
+    the markdown references them by a deterministic path under the document's image directory; call
+    `extract_images` to write the ones actually needed.
+    """
+
     def __init__(self, config: dict) -> None:
         self.cache_dir = CACHE_DIR / "documents"
+        self.parse_workers = config.get("parse_workers", min(4, os.cpu_count() or 1))
         EnvUtils.ensure_package("pymupdf")
 
     async def parse(self, path: str) -> str:
-        """Convert PDF to Markdown format with image extraction and return the processed text."""
+        """Convert PDF to Markdown format with image references and return the processed text."""
         import fitz  # pymupdf
 
-        # Create unique directory with date and ID for images
-        unique_id = str(uuid.uuid4())[:8]  # First 8 characters of UUID
-        output_dir = self.cache_dir / datetime.now().strftime("%Y-%m-%d") / f"pdf_images_{unique_id}"
-        output_dir.mkdir(parents=True, exist_ok=True)
+        image_dir = self.get_image_dir(path)
+        with fitz.open(path) as doc:
+            page_count = doc.page_count
 
-        doc = fitz.open(path)
-        markdown_content = ""
+        num_workers = min(self.parse_workers, page_count // MIN_PAGES_PER_WORKER)
+        if num_workers <= 1:
+            parts = await asyncio.to_thread(_parse_pages, str(path), 0, page_count, str(image_dir))
+        else:
+            loop = asyncio.get_running_loop()
+            bounds = [page_count * i // num_workers for i in range(num_workers + 1)]
+            results = await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        _get_executor(self.parse_workers), _parse_pages, str(path), start, end, str(image_dir)
+                    )
+                    for start, end in zip(bounds[:-1], bounds[1:], strict=True)
+                ]
+            )
+            parts = [part for result in results for part in result]
+        return "".join(parts)
 
-        for page_num in range(doc.page_count):
-            page = doc.load_page(page_num)
+    def get_image_dir(self, path: str) -> pathlib.Path:
+        # content-addressed, images extracted once are reused by later parses of the same document
+        return self.cache_dir / "images" / FileUtils.get_file_md5(path)
 
-            text = page.get_text()
-            markdown_content += f"## Page {page_num + 1}\n\n"
-            if text.strip():
-                markdown_content += text.strip() + "\n\n"
-            image_list = page.get_images()
-            for img_index, img in enumerate(image_list):
+    def extract_images(self, path: str, markdown: str) -> None:
+        """Write the images referenced in (a part of) the parsed markdown, if not written yet."""
+        import fitz  # pymupdf
+
+        missing = [m for m in IMAGE_PATTERN.finditer(markdown) if not os.path.exists(m.group(1))]
+        if not missing:
+            return
+        with fitz.open(path) as doc:
+            for m in missing:
+                img_path, page_num, img_index = m.group(1), int(m.group(2)), int(m.group(3))
                 try:
-                    xref = img[0]
+                    xref = doc.load_page(page_num).get_images()[img_index][0]
                     pix = fitz.Pixmap(doc, xref)
-                    if pix.n < 5:  # GRAY or RGB
-                        img_filename = f"page_{page_num}_img_{img_index}.png"
-                        img_path = output_dir / img_filename
-                        pix.save(img_path)
-                        markdown_content += f"![Image]({img_path})\n\n"
-                    pix = None
-                except Exception as img_e:
+                    if pix.n - pix.alpha >= 4:  # e.g. CMYK, convert to RGB to save as png
+                        pix = fitz.Pixmap(fitz.csRGB, pix)
+                    pathlib.Path(img_path).parent.mkdir(parents=True, exist_ok=True)
+                    pix.save(img_path)
+                except Exception as img_e:  # pylint: disable=broad-except
                     logger.warning(f"Failed to extract image {img_index} from page {page_num}: {img_e}")
-                    continue
-
-        doc.close()
-        return markdown_content
@@ -0,0 +1,107 @@
+"""Connected stdio MCP servers shared across agent builds.
+
+Starting a stdio MCP server (spawning the process, `initialize` handshake, listing the tools) on each agent build is
+slow, e.g. when a benchmark builds one agent per sample. Servers with `mcp_reuse_server` set are started once per
+event loop and shared by all the agents of the loop, with the tools list seeded from the disk cache
+(`MCPToolsCache`). As in `utu.env.utils.MCPSession`, each server is connected and cleaned up in its own owner task, so
+that agents in other tasks can use it. A server whose process exits is dropped, and restarted on next acquire.
+"""
+
+import asyncio
+import hashlib
+import json
+import weakref
+
+from agents.mcp import MCPServer
+
+from ..config import ToolkitConfig
+from ..utils import get_logger
+from .utils import MCPToolsCache, get_mcp_server
+
+logger = get_logger(__name__)
+
+
+class _SharedServer:
+    def __init__(self, config: ToolkitConfig) -> None:
+        self.config = config
+        self.server = get_mcp_server(config)
+        self.ready: asyncio.Future[MCPServer] = asyncio.get_running_loop().create_future()
+        self.closing = asyncio.Event()
+        self.num_users = 0
+        self.owner_task = asyncio.create_task(self._own())
+
+    async def _own(self) -> None:
+        try:
+            async with self.server:
+                await MCPToolsCache.seed_server(self.server, self.config)
+                self.ready.set_result(self.server)
+                await self.closing.wait()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"Shared MCP server `{self.config.name}` exited: {e!r}")
+            if not self.ready.done():
+                self.ready.set_exception(e)
+        finally:
+            if not self.ready.done():  # cancelled before ready
+                self.ready.cancel()
+
+
+class MCPServerPool:
+    """Shared MCP servers of an event loop, by server config."""
+
+    def __init__(self) -> None:
+        self._servers: dict[str, _SharedServer] = {}
+
+    @staticmethod
+    def get_key(config: ToolkitConfig) -> str:
+        server_config = config.model_dump(
+            include={"name", "activated_tools", "config", "mcp_transport", "mcp_client_session_timeout_seconds"}
+        )
+        return hashlib.sha256(json.dumps(server_config, sort_keys=True, default=str).encode()).hexdigest()
+
+    async def acquire(self, config: ToolkitConfig) -> MCPServer:
+        """Get the connected server of `config`, started on first acquire. Call `release` when done."""
+        key = self.get_key(config)
+        shared = self._servers.get(key)
+        if shared is None or shared.owner_task.done():
+            logger.info(f"Starting shared MCP server `{config.name}`")
+            shared = self._servers[key] = _SharedServer(config)
+            shared.owner_task.add_done_callback(lambda _: self._drop(key, shared))
+        server = await asyncio.shield(shared.ready)
+        shared.num_users += 1
+        return server
+
+    def release(self, server: MCPServer) -> None:
+        """The server is kept running for the next agents."""
+        for shared in self._servers.values():
+            if shared.server is server:
+                shared.num_users -= 1
+                return
+
+    async def shutdown(self) -> None:
+        shared_servers = list(self._servers.values())
+        self._servers.clear()
+        for shared in shared_servers:
+            shared.closing.set()
+        await asyncio.gather(*[shared.owner_task for shared in shared_servers], return_exceptions=True)
+
+    def _drop(self, key: str, shared: _SharedServer) -> None:
+        if self._servers.get(key) is shared:
+            del self._servers[key]
+
+
+# one pool per event loop, as the servers are bound to the loop they were connected in
+_POOLS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MCPServerPool] = weakref.WeakKeyDictionary()
+
+
+def get_mcp_server_pool() -> MCPServerPool:
+    loop = asyncio.get_running_loop()
+    if loop not in _POOLS:
+        _POOLS[loop] = MCPServerPool()
+    return _POOLS[loop]
+
+
+async def shutdown_mcp_server_pool() -> None:
+    """Stop the shared servers of the running event loop."""
+    pool = _POOLS.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.shutdown()
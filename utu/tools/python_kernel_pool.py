@@ -0,0 +1,391 @@
+"""Pool of warm Python kernels for `PythonExecutorToolkit`.
+
+Each kernel is a worker process with a reusable IPython shell. Workers are forked from a forkserver which has
+preloaded the scientific stack (numpy, pandas, matplotlib), so starting or respawning a kernel does not pay for the
+imports. A kernel that times out, crashes or hits the memory limit is killed and replaced.
+"""
+
+import asyncio
+import contextlib
+import glob
+import io
+import multiprocessing
+import os
+import re
+import resource
+import time
+import traceback
+import weakref
+from multiprocessing.connection import Connection
+
+from ..utils import get_logger
+
+logger = get_logger(__name__)
+
+# Used to clean ANSI escape sequences
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[a-zA-Z]")
+PRELOAD_MODULES = ["numpy", "pandas", "matplotlib"]
+# env of the kernels: non-interactive matplotlib backend, single-threaded BLAS to avoid oversubscription
+KERNEL_ENV = {"MPLBACKEND": "Agg", "OMP_NUM_THREADS": "1", "OPENBLAS_NUM_THREADS": "1", "MKL_NUM_THREADS": "1"}
+KERNEL_START_TIMEOUT = 60
+KERNEL_ACQUIRE_TIMEOUT = 300
+SESSION_IDLE_TIMEOUT = 300
+
+
+class KernelUnavailableError(Exception):
+    """No kernel was freed in time, all the kernels of the pool are busy. The code was not run."""
+
+
+# ------------------------------------------------------------------------------
+# worker process
+def _get_vm_size() -> int:
+    """Virtual memory size of the current process in bytes, 0 if unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _new_shell():
+    from IPython.core.interactiveshell import InteractiveShell
+    from traitlets.config.loader import Config
+
+    config = Config()
+    config.HistoryManager.enabled = False
+    config.HistoryManager.hist_file = ":memory:"
+    shell = InteractiveShell.instance(config=config)
+    if hasattr(shell, "history_manager"):
+        shell.history_manager.enabled = False
+    return shell
+
+
+def _run_code(shell, code: str, workdir: str, max_memory_MB: int) -> dict:
+    import matplotlib.pyplot as plt
+
+    original_dir = os.getcwd()
+    soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+    try:
+        # Clean up code format
+        code_clean = code.strip()
+        if code_clean.startswith("```python"):
+            code_clean = code_clean.split("```python")[1].split("```")[0].strip()
+
+        # Create and change to working directory
+        os.makedirs(workdir, exist_ok=True)
+        os.chdir(workdir)
+        files_before = set(glob.glob("*"))
+
+        # memory limit: `max_memory_MB` on top of the memory used by the warm kernel
+        if vm_size := _get_vm_size():
+            with contextlib.suppress(ValueError, resource.error):
+                resource.setrlimit(resource.RLIMIT_AS, (vm_size + max_memory_MB * 1024 * 1024, hard_limit))
+
+        output = io.StringIO()
+        error_output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(error_output):
+            result = shell.run_cell(code_clean)
+            if plt.get_fignums():
+                image_name = "output_image.png"
+                counter = 1
+                while os.path.exists(image_name):
+                    image_name = f"output_image_{counter}.png"
+                    counter += 1
+                plt.savefig(image_name, format="png")
+            plt.close("all")
+
+        stdout_result = ANSI_ESCAPE.sub("", output.getvalue())
+        stderr_result = ANSI_ESCAPE.sub("", error_output.getvalue())
+        new_files = [os.path.join(workdir, f) for f in set(glob.glob("*")) - files_before]
+        return {
+            "success": False
+            if "Error" in stderr_result or ("Error" in stdout_result and "Traceback" in stdout_result)
+            else True,
+            "message": f"Code execution completed\nOutput:\n{stdout_result.strip()}"
+            if stdout_result.strip()
+            else "Code execution completed, no output",
+            "status": True,
+            "files": new_files,
+            "error": stderr_result.strip() if stderr_result.strip() else "",
+            # the kernel state may be corrupted after hitting the memory limit
+            "restart": isinstance(result.error_in_exec, MemoryError),
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Code execution failed, error message:\n{str(e)},\nTraceback:{traceback.format_exc()}",
+            "status": False,
+            "files": [],
+            "error": str(e),
+            "restart": isinstance(e, MemoryError),
+        }
+    finally:
+        with contextlib.suppress(ValueError, resource.error):
+            resource.setrlimit(resource.RLIMIT_AS, (soft_limit, hard_limit))
+        os.chdir(original_dir)
+
+
+def _kernel_main(conn: Connection, preload_modules: list[str]) -> None:
+    """Entrypoint of a kernel process: serve `(code, workdir, max_memory_MB, reset)` requests until EOF."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401
+
+    for module in preload_modules:
+        with contextlib.suppress(ImportError):
+            __import__(module)
+    shell = _new_shell()
+    conn.send("ready")
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        code, workdir, max_memory_MB, reset = request
+        conn.send(_run_code(shell, code, workdir, max_memory_MB))
+        if reset:
+            shell.reset(new_session=False)
+
+
+# ------------------------------------------------------------------------------
+# main process
+class PythonKernel:
+    """Handle of a kernel process."""
+
+    def __init__(self, preload_modules: list[str]) -> None:
+        ctx = multiprocessing.get_context("forkserver")
+        # modules are imported in the forkserver once, and shared by all forked kernels
+        ctx.set_forkserver_preload(preload_modules + [__name__])
+        self.conn, child_conn = ctx.Pipe()
+        with _kernel_env():
+            self.process = ctx.Process(target=_kernel_main, args=(child_conn, preload_modules), daemon=True)
+            self.process.start()
+        child_conn.close()
+        self.num_runs = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    async def wait_ready(self, timeout: float = KERNEL_START_TIMEOUT) -> None:
+        if await self._recv(timeout) != "ready":
+            raise RuntimeError("Kernel failed to start")
+
+    async def run(self, code: str, workdir: str, max_memory_MB: int, timeout: float, reset: bool = True) -> dict:
+        """Run code in the kernel. Raise TimeoutError if not finished in `timeout` seconds, EOFError if crashed."""
+        self.num_runs += 1
+        self.conn.send((code, workdir, max_memory_MB, reset))
+        return await self._recv(timeout)
+
+    async def _recv(self, timeout: float):
+        # wait for the result without blocking the event loop or a thread
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_reader(self.conn.fileno(), lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, timeout)
+        finally:
+            loop.remove_reader(self.conn.fileno())
+        return self.conn.recv()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+@contextlib.contextmanager
+def _kernel_env():
+    """Set `KERNEL_ENV` while starting a kernel (and the forkserver, which passes its env to the kernels)."""
+    original = {k: os.environ.get(k) for k in KERNEL_ENV}
+    os.environ.update({k: v for k, v in KERNEL_ENV.items() if original[k] is None})
+    try:
+        yield
+    finally:
+        for k, v in original.items():
+            if v is None:
+                os.environ.pop(k, None)
+
+
+class PythonKernelPool:
+    """A bounded pool of warm kernels.
+
+    - `prefork` kernels are started ahead of time and kept idle, more are started on demand up to `size`.
+    - Without a session, the shell namespace is reset after each run; with a `session_id`, the same kernel (and its
+      state) is used for all runs of the session until `close_session`. Session kernels count against `size`: when
+      all kernels are taken, sessions idle for `session_idle_timeout` seconds are evicted (their state is lost), and
+      a run waits at most `acquire_timeout` seconds for a kernel (separately from its execution `timeout`).
+    - Kernels that time out, crash or hit the memory limit are killed and respawned.
+    """
+
+    def __init__(
+        self,
+        size: int = 8,
+        prefork: int = 2,
+        preload_modules: list[str] | None = None,
+        session_idle_timeout: float = SESSION_IDLE_TIMEOUT,
+        acquire_timeout: float = KERNEL_ACQUIRE_TIMEOUT,
+    ) -> None:
+        self.size = size
+        self.session_idle_timeout = session_idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.prefork = min(prefork, size)
+        self.preload_modules = PRELOAD_MODULES if preload_modules is None else preload_modules
+
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle: list[PythonKernel] = []
+        self._sessions: dict[str, tuple[PythonKernel, asyncio.Lock]] = {}
+        self._session_last_used: dict[str, float] = {}
+        self._num_starting = 0
+        self._background_tasks: set[asyncio.Task] = set()
+
+    async def execute(
+        self,
+        code: str,
+        workdir: str,
+        timeout: float,
+        max_memory_MB: int,
+        session_id: str | None = None,
+        acquire_timeout: float | None = None,
+    ) -> dict:
+        """Execute code, raise TimeoutError on execution timeout, KernelUnavailableError if no kernel is available
+        within `acquire_timeout` (defaults to the one of the pool)."""
+        if acquire_timeout is None:
+            acquire_timeout = self.acquire_timeout
+        if session_id is not None:
+            return await self._execute_in_session(code, workdir, timeout, max_memory_MB, session_id, acquire_timeout)
+        await self._acquire_slot(acquire_timeout)
+        try:
+            kernel = await self._get_kernel()
+            healthy = False
+            try:
+                result = await kernel.run(code, workdir, max_memory_MB, timeout, reset=True)
+                healthy = not result.pop("restart", False)
+                return result
+            finally:
+                self._release_kernel(kernel, healthy)
+        finally:
+            self._semaphore.release()
+
+    async def _execute_in_session(
+        self, code: str, workdir: str, timeout: float, max_memory_MB: int, session_id: str, acquire_timeout: float
+    ) -> dict:
+        if session_id not in self._sessions:
+            await self._acquire_slot(acquire_timeout)
+            try:
+                kernel = await self._get_kernel()
+            except BaseException:
+                self._semaphore.release()
+                raise
+            if session_id in self._sessions:  # created by a concurrent call
+                self._release_kernel(kernel, healthy=True)
+                self._semaphore.release()
+            else:
+                self._sessions[session_id] = (kernel, asyncio.Lock())
+        kernel, lock = self._sessions[session_id]
+        async with lock:
+            self._session_last_used[session_id] = time.monotonic()
+            healthy = False
+            try:
+                result = await kernel.run(code, workdir, max_memory_MB, timeout, reset=False)
+                healthy = not result.pop("restart", False)
+                return result
+            finally:
+                self._session_last_used[session_id] = time.monotonic()
+                if not healthy:  # the session state is lost
+                    await self.close_session(session_id)
+
+    async def close_session(self, session_id: str) -> None:
+        if session_id not in self._sessions:
+            return
+        kernel, _ = self._sessions.pop(session_id)
+        self._session_last_used.pop(session_id, None)
+        self._release_kernel(kernel, healthy=False)  # do not share the state with other runs
+        self._semaphore.release()
+
+    async def warmup(self) -> None:
+        """Start kernels until `prefork` kernels are idle."""
+        num_missing = self.prefork - len(self._idle) - self._num_starting
+        if num_missing > 0:
+            await asyncio.gather(*[self._start_idle_kernel() for _ in range(num_missing)], return_exceptions=True)
+
+    def shutdown(self) -> None:
+        for kernel in self._idle + [kernel for kernel, _ in self._sessions.values()]:
+            kernel.kill()
+        self._idle.clear()
+        self._sessions.clear()
+        self._session_last_used.clear()
+
+    async def _acquire_slot(self, timeout: float) -> None:
+        """Take one of the `size` kernel slots, raise KernelUnavailableError if none is freed within `timeout`.
+        Session kernels hold their slot until `close_session`, so sessions idle for too long are evicted when all slots
+        are taken."""
+        if self._semaphore.locked():
+            await self._evict_idle_sessions()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except TimeoutError as e:
+            raise KernelUnavailableError(f"No python kernel available within {timeout} seconds") from e
+
+    async def _evict_idle_sessions(self) -> None:
+        now = time.monotonic()
+        for session_id, (_, lock) in list(self._sessions.items()):
+            idle_time = now - self._session_last_used.get(session_id, now)
+            if not lock.locked() and idle_time >= self.session_idle_timeout:
+                logger.warning(f"Evicting python session {session_id} idle for {idle_time:.0f}s, its state is lost")
+                await self.close_session(session_id)
+
+    async def _get_kernel(self) -> PythonKernel:
+        while self._idle:
+            kernel = self._idle.pop()
+            if kernel.alive:
+                return kernel
+            kernel.kill()
+        return await self._start_kernel()
+
+    def _release_kernel(self, kernel: PythonKernel, healthy: bool) -> None:
+        if healthy and kernel.alive:
+            self._idle.append(kernel)
+            return
+        kernel.kill()
+        self.warmup_in_background()  # replenish idle kernels
+
+    def warmup_in_background(self) -> None:
+        task = asyncio.create_task(self.warmup())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _start_kernel(self) -> PythonKernel:
+        start = time.time()
+        kernel = PythonKernel(self.preload_modules)
+        try:
+            await kernel.wait_ready()
+        except BaseException:
+            kernel.kill()
+            raise
+        logger.debug(f"Started python kernel (pid {kernel.process.pid}) in {time.time() - start:.2f}s")
+        return kernel
+
+    async def _start_idle_kernel(self) -> None:
+        self._num_starting += 1
+        try:
+            self._idle.append(await self._start_kernel())
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"Failed to start python kernel: {e}")
+        finally:
+            self._num_starting -= 1
+
+
+# one pool per event loop, as the pool uses asyncio primitives
+_POOLS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PythonKernelPool] = weakref.WeakKeyDictionary()
+
+
+def get_kernel_pool(size: int = 8, prefork: int = 2, preload_modules: list[str] | None = None) -> PythonKernelPool:
+    """Get the kernel pool of the running event loop, the arguments only take effect on creation."""
+    loop = asyncio.get_running_loop()
+    if loop not in _POOLS:
+        _POOLS[loop] = PythonKernelPool(size=size, prefork=prefork, preload_modules=preload_modules)
+        _POOLS[loop].warmup_in_background()
+    return _POOLS[loop]
@@ -1,8 +1,8 @@
-import aiohttp
 from bs4 import BeautifulSoup
 
 from ...utils import get_logger
 from ..utils import ContentFilter
+from .http_session import HTTPSessionPool
 
 logger = get_logger(__name__)
 
@@ -41,6 +41,11 @@ class BaiduSearch:
         msg = "\n".join(formatted_results)
         return msg
 
+    async def get_results(self, query: str) -> list[dict]:
+        """Results in the common format `{title, url, snippet}`, without filtering."""
+        res = await self.search_baidu(query)
+        return [{"title": r["title"], "url": r["url"], "snippet": r.get("description", "")} for r in res["data"]]
+
     # @async_file_cache(expire_time=None)
     async def search_baidu(self, query: str) -> dict:
         """Search Baidu using web scraping to retrieve relevant search results.
@@ -57,10 +62,9 @@ class BaiduSearch:
             }
         """
         params = {"wd": query, "rn": "20"}
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.url, headers=self.headers, params=params) as response:
-                response.raise_for_status()  # avoid cache error!
-                results = await response.text(encoding="utf-8")
+        results = await HTTPSessionPool.request(
+            "GET", self.url, headers=self.headers, params=params, encoding="utf-8"
+        )  # raise on error status, avoid cache error!
 
         soup = BeautifulSoup(results, "html.parser")
         results = []
@@ -1,3 +1,5 @@
+import asyncio
+
 try:
     from ddgs import DDGS
 except ImportError as e:
@@ -37,6 +39,11 @@ class DuckDuckGoSearch:
         msg = "\n".join(formatted_results)
         return msg
 
+    async def get_results(self, query: str) -> list[dict]:
+        """Results in the common format `{title, url, snippet}`, without filtering."""
+        res = await asyncio.to_thread(self.ddgs.text, query, max_results=100)  # ddgs is blocking
+        return [{"title": r["title"], "url": r["href"], "snippet": r.get("body", "")} for r in res]
+
     async def search_duckduckgo(self, query: str) -> list:
         """Use DuckDuckGo search engine to search for information on the given query.
 
@@ -1,7 +1,6 @@
-import aiohttp
-
 from ...utils import EnvUtils, async_file_cache, get_logger
 from ..utils import ContentFilter
+from .http_session import HTTPSessionPool
 
 logger = get_logger(__name__)
 
@@ -39,12 +38,16 @@ class GoogleSearch:
         msg = "\n".join(formatted_results)
         return msg
 
+    async def get_results(self, query: str) -> list[dict]:
+        """Results in the common format `{title, url, snippet}`, without filtering."""
+        res = await self.search_google(query)
+        return [{"title": r["title"], "url": r["link"], "snippet": r.get("snippet", "")} for r in res["organic"]]
+
     @async_file_cache(expire_time=None)
     async def search_google(self, query: str) -> dict:
         """Call the serper.dev API and cache the results."""
         params = {"q": query, **self.search_params, "num": 10}  # fetch and cache the results
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.serper_url, headers=self.serper_header, json=params) as response:
-                response.raise_for_status()  # avoid cache error!
-                results = await response.json()
-                return results
+        results = await HTTPSessionPool.request(
+            "POST", self.serper_url, headers=self.serper_header, json_data=params, response_type="json"
+        )  # raise on error status, avoid cache error!
+        return results
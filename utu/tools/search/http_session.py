@@ -0,0 +1,191 @@
+"""Shared aiohttp sessions for the search & crawl engines.
+
+One `aiohttp.ClientSession` per event loop is shared by all engines, so connections (TCP + TLS) are kept alive and
+reused across requests, with a connection cap, DNS caching and default timeouts. GET responses with an
+`ETag` / `Last-Modified` validator can be revalidated with a conditional request, a `304 Not Modified` is served from
+the stored body (see `ValidatorStore` for the bounds of the stored bodies).
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any
+
+import aiohttp
+
+from ...utils import CACHE_DIR, get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class HTTPSessionConfig:
+    """Connection config of the shared sessions. Defaults can be overridden by env vars (read when the first session
+    is created, after `.env` is loaded)."""
+
+    limit: int = field(default_factory=lambda: int(os.getenv("UTU_HTTP_MAX_CONNECTIONS", "100")))
+    """Max number of concurrent connections"""
+    limit_per_host: int = field(default_factory=lambda: int(os.getenv("UTU_HTTP_MAX_CONNECTIONS_PER_HOST", "0")))
+    """Max number of concurrent connections per host, 0 for no limit (most requests go to a few API hosts)"""
+    keepalive_timeout: float = field(default_factory=lambda: float(os.getenv("UTU_HTTP_KEEPALIVE_TIMEOUT", "30")))
+    """Seconds before an idle connection is closed"""
+    dns_cache_ttl: int = field(default_factory=lambda: int(os.getenv("UTU_HTTP_DNS_CACHE_TTL", "300")))
+    """Seconds to cache DNS lookups"""
+    timeout: float = field(default_factory=lambda: float(os.getenv("UTU_HTTP_TIMEOUT", "300")))
+    """Default total timeout of a request in seconds, long enough for slow crawls"""
+    connect_timeout: float = field(default_factory=lambda: float(os.getenv("UTU_HTTP_CONNECT_TIMEOUT", "30")))
+    """Default timeout of establishing a connection to a host in seconds"""
+    read_timeout: float = field(default_factory=lambda: float(os.getenv("UTU_HTTP_READ_TIMEOUT", "60")))
+    """Default max seconds between two reads of a response, i.e. a stalled server fails fast"""
+
+
+class ValidatorStore:
+    """Bodies of revalidatable responses with their `ETag` / `Last-Modified`, stored as json files.
+
+    Bounded: entries older than `max_age` seconds are dropped, and the oldest ones beyond `max_entries` are evicted
+    (checked on the first write and every `prune_every` writes)."""
+
+    def __init__(
+        self,
+        cache_dir=CACHE_DIR / "http",
+        max_entries: int = 10_000,
+        max_age: float = 7 * 24 * 3600,
+        prune_every: int = 100,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.prune_every = prune_every
+        self._num_writes = 0
+
+    def get(self, key: str) -> dict | None:
+        path = self.cache_dir / f"{key}.json"
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                return None
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def set(self, key: str, entry: dict) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        tmp_path.replace(path)
+        if self._num_writes % self.prune_every == 0:
+            self.prune()
+        self._num_writes += 1
+
+    def prune(self) -> None:
+        """Drop the expired entries and the oldest ones beyond `max_entries`."""
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            with contextlib.suppress(OSError):
+                entries.append((path.stat().st_mtime, path))
+        entries.sort(reverse=True)  # newest first
+        now = time.time()
+        for i, (mtime, path) in enumerate(entries):
+            if i >= self.max_entries or now - mtime > self.max_age:
+                path.unlink(missing_ok=True)
+
+
+class HTTPSessionPool:
+    """Process-wide registry of shared `aiohttp.ClientSession`s, one per event loop."""
+
+    _config: HTTPSessionConfig | None = None
+    _sessions: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession] = weakref.WeakKeyDictionary()
+    validator_store = ValidatorStore()
+    stats = {"requests": 0, "revalidated": 0}
+
+    @classmethod
+    def configure(cls, config: HTTPSessionConfig) -> None:
+        """Set the config of sessions created afterwards."""
+        cls._config = config
+
+    @classmethod
+    def get_session(cls) -> aiohttp.ClientSession:
+        """Get the shared session of the running event loop. Do not close it, use `aclose` on shutdown."""
+        loop = asyncio.get_running_loop()
+        session = cls._sessions.get(loop)
+        if session is None or session.closed:
+            config = cls._config = cls._config or HTTPSessionConfig()
+            connector = aiohttp.TCPConnector(
+                limit=config.limit,
+                limit_per_host=config.limit_per_host,
+                keepalive_timeout=config.keepalive_timeout,
+                ttl_dns_cache=config.dns_cache_ttl,
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=config.timeout, sock_connect=config.connect_timeout, sock_read=config.read_timeout
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            cls._sessions[loop] = session
+        return session
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close the session of the running event loop."""
+        session = cls._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    @classmethod
+    async def request(
+        cls,
+        method: str,
+        url: str,
+        *,
+        headers: dict | None = None,
+        params: dict | None = None,
+        json_data: Any = None,
+        response_type: str = "text",
+        encoding: str | None = None,
+        revalidate: bool = False,
+    ) -> str | Any:
+        """Send a request with the shared session and return the text (or json) of the response.
+
+        Args:
+            response_type (str): "text" | "json"
+            revalidate (bool): for GET, store the body of responses with validators, and send conditional requests
+                for stored ones; a 304 returns the stored body.
+        Raises:
+            aiohttp.ClientResponseError: on error status, so that errors are not cached by `async_file_cache`
+        """
+        headers = dict(headers or {})
+        entry = key = None
+        if revalidate and method.upper() == "GET":
+            key = cls._get_key(url, headers, params)
+            if entry := cls.validator_store.get(key):
+                if entry.get("etag"):
+                    headers["If-None-Match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    headers["If-Modified-Since"] = entry["last_modified"]
+        cls.stats["requests"] += 1
+        async with cls.get_session().request(method, url, headers=headers, params=params, json=json_data) as response:
+            if response.status == 304 and entry is not None:
+                cls.stats["revalidated"] += 1
+                logger.debug(f"Not modified, using stored body of {url}")
+                body = entry["body"]
+            else:
+                response.raise_for_status()
+                body = await response.text(encoding=encoding)
+                etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+                if key is not None and (etag or last_modified):
+                    cls.validator_store.set(key, {"etag": etag, "last_modified": last_modified, "body": body})
+        return json.loads(body) if response_type == "json" else body
+
+    @staticmethod
+    def _get_key(url: str, headers: dict, params: dict | None) -> str:
+        # headers change the response (e.g. crawl options), but credentials should not be written into file names
+        headers = {k: v for k, v in headers.items() if k.lower() != "authorization"}
+        raw = json.dumps([url, sorted(headers.items()), sorted((params or {}).items())], default=str)
+        return hashlib.md5(raw.encode()).hexdigest()
@@ -1,6 +1,5 @@
-import aiohttp
-
 from ...utils import EnvUtils, async_file_cache, get_logger
+from .http_session import HTTPSessionPool
 
 logger = get_logger(__name__)
 
@@ -27,16 +26,19 @@ class JinaCrawl:
         # add more jina params
         for k, v in config.get("crawl_jina_params", {}).items():
             self.jina_header[k] = v
+        # results are cached forever by default. With an expire time, expired pages are revalidated with a
+        # conditional request (ETag / Last-Modified) instead of being crawled again when possible.
+        self.cache_expire_time = config.get("crawl_cache_expire_time")
+        self._cached_crawl_jina = async_file_cache(expire_time=self.cache_expire_time)(self.crawl_jina)
 
     async def crawl(self, url: str) -> str:
         """standard crawl interface."""
-        return await self.crawl_jina(url)
+        return await self._cached_crawl_jina(url)
 
-    @async_file_cache(expire_time=None)
     async def crawl_jina(self, url: str) -> str:
         # Get the content of the url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{self.jina_url}/{url}", headers=self.jina_header) as response:
-                response.raise_for_status()  # avoid cache error!
-                text = await response.text()
-                return text
+        # without expiry cached pages are never crawled again, so there is nothing to revalidate
+        text = await HTTPSessionPool.request(
+            "GET", f"{self.jina_url}/{url}", headers=self.jina_header, revalidate=self.cache_expire_time is not None
+        )  # raise on error status, avoid cache error!
+        return text
@@ -1,7 +1,6 @@
-import aiohttp
-
 from ...utils import EnvUtils, async_file_cache, get_logger
 from ..utils import ContentFilter
+from .http_session import HTTPSessionPool
 
 logger = get_logger(__name__)
 
@@ -40,6 +39,11 @@ class JinaSearch:
         msg = "\n".join(formatted_results)
         return msg
 
+    async def get_results(self, query: str) -> list[dict]:
+        """Results in the common format `{title, url, snippet}`, without filtering."""
+        res = await self.search_jina(query)
+        return [{"title": r["title"], "url": r["url"], "snippet": r.get("description", "")} for r in res["data"]]
+
     @async_file_cache(expire_time=None)
     async def search_jina(self, query: str) -> dict:
         """Call the Jina API and cache the results.
@@ -58,8 +62,7 @@ class JinaSearch:
             }
         """
         params = {"q": query, **self.search_params}
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.jina_url, headers=self.jina_header, params=params) as response:
-                response.raise_for_status()
-                results = await response.json()
-                return results
+        results = await HTTPSessionPool.request(
+            "GET", self.jina_url, headers=self.jina_header, params=params, response_type="json"
+        )
+        return results
@@ -1,11 +1,16 @@
 import asyncio
+import re
 
 from ..config import ToolkitConfig
-from ..utils import SimplifiedAsyncOpenAI, get_logger, oneline_object
+from ..utils import BM25Index, SimplifiedAsyncOpenAI, TokenUtils, get_logger, oneline_object
 from .base import TOOL_PROMPTS, AsyncBaseToolkit, register_tool
+from .utils import ContentFilter, get_engine_semaphore, merge_search_results
 
 logger = get_logger(__name__)
 
+# lines with a markdown link or a bare url
+LINK_LINE_PATTERN = re.compile(r"\]\((?:https?://|/)|https?://")
+
 
 class SearchToolkit(AsyncBaseToolkit):
     """Search Toolkit
@@ -15,7 +20,15 @@ class SearchToolkit(AsyncBaseToolkit):
 
     Methods:
         - search(query: str, num_results: int = 5)
+        - search_batch(queries: list[str], num_results: int = 10)
         - web_qa(url: str, query: str)
+
+    web_qa modes (`web_qa_mode`):
+        - full: the whole page is sent to both the QA and the link extraction prompts.
+        - chunked: the page is split into chunks of `web_qa_chunk_tokens` tokens, the `web_qa_max_chunks` chunks most
+          relevant to the query (BM25) are answered in parallel and the answers merged; links are extracted from the
+          lines containing links only. Tokens saved compared to the full mode are logged and accumulated in
+          `web_qa_stats`.
     """
 
     def __init__(self, config: ToolkitConfig = None):
@@ -56,7 +69,14 @@ class SearchToolkit(AsyncBaseToolkit):
         self.llm = SimplifiedAsyncOpenAI(
             **self.config.config_llm.model_provider.model_dump() if self.config.config_llm else {}
         )
+        self.search_concurrency = self.config.config.get("search_concurrency", 4)
+        search_banned_sites = self.config.config.get("search_banned_sites", [])
+        self.content_filter = ContentFilter(search_banned_sites)
         self.summary_token_limit = self.config.config.get("summary_token_limit", 1_000)
+        self.web_qa_mode = self.config.config.get("web_qa_mode", "full")
+        self.web_qa_chunk_tokens = self.config.config.get("web_qa_chunk_tokens", 4_000)
+        self.web_qa_max_chunks = self.config.config.get("web_qa_max_chunks", 4)
+        self.web_qa_stats = {"calls": 0, "content_tokens": 0, "tokens_sent": 0, "tokens_saved": 0}
 
     @register_tool
     async def search(self, query: str, num_results: int = 5) -> dict:
@@ -82,6 +102,41 @@ class SearchToolkit(AsyncBaseToolkit):
         logger.info(oneline_object(res))
         return res
 
+    @register_tool
+    async def search_batch(self, queries: list[str], num_results: int = 10) -> str:
+        """Run several web searches at once, e.g. different phrasings or aspects of a question, and get one merged
+        list of results. Results found by several queries are ranked higher, duplicates are removed.
+
+        Args:
+            queries (list[str]): The queries to search for, at most 10.
+            num_results (int, optional): The number of merged results to return. Defaults to 10.
+        """
+        queries = list(dict.fromkeys(q for q in queries if q.strip()))[:10]
+        logger.info(f"[tool] search_batch: {oneline_object(queries)}")
+        semaphore = get_engine_semaphore(type(self.search_engine).__name__, self.search_concurrency)
+
+        async def _search(query: str) -> list[dict]:
+            async with semaphore:
+                try:
+                    return await self.search_engine.get_results(query)
+                except Exception as e:  # pylint: disable=broad-except
+                    logger.warning(f"search_batch: query {query} failed: {e}")
+                    return []
+
+        results_per_query = await asyncio.gather(*[_search(query) for query in queries])
+        results = merge_search_results(results_per_query)
+        results = self.content_filter.filter_results(results, num_results, key="url")
+        if not results:
+            return "No results found."
+        formatted_results = []
+        for i, r in enumerate(results, 1):
+            formatted_results.append(f"{i}. {r['title']} ({r['url']}) [queries: {', '.join(map(str, r['queries']))}]")
+            if r["snippet"]:
+                formatted_results[-1] += f"\nsnippet: {r['snippet']}"
+        res = "\n".join(formatted_results)
+        logger.info(oneline_object(res))
+        return res
+
     @register_tool
     async def web_qa(self, url: str, query: str) -> str:
         """Ask question to a webpage, you will get the answer and related links from the specified url.
@@ -98,12 +153,58 @@ class SearchToolkit(AsyncBaseToolkit):
         query = (
             query or "Summarize the content of this webpage, in the same language as the webpage."
         )  # use the same language
-        res_summary, res_links = await asyncio.gather(
-            self._qa(content, query), self._extract_links(url, content, query)
-        )
+        if self.web_qa_mode == "chunked":
+            res_summary, res_links = await self._web_qa_chunked(url, content, query)
+        else:
+            res_summary, res_links = await asyncio.gather(
+                self._qa(content, query), self._extract_links(url, content, query)
+            )
         result = f"Summary: {res_summary}\n\nRelated Links: {res_links}"
         return result
 
+    async def _web_qa_chunked(self, url: str, content: str, query: str) -> tuple[str, str]:
+        """Map-reduce QA over the relevant chunks, and link extraction over the link lines."""
+        chunks = TokenUtils.split_text_by_token(content, self.web_qa_chunk_tokens)
+        if len(chunks) > 1:
+            ranked = BM25Index(chunks).search(query, top_k=self.web_qa_max_chunks)
+            selected = [chunks[i] for i in sorted(ranked)] or chunks[:1]  # no relevant chunk, use the beginning
+        else:
+            selected = chunks
+        link_lines = list(dict.fromkeys(line for line in content.splitlines() if LINK_LINE_PATTERN.search(line)))
+        link_section = TokenUtils.truncate_text_by_token("\n".join(link_lines), self.web_qa_chunk_tokens)
+
+        async def _answer() -> str:
+            answers = await asyncio.gather(*[self._qa(chunk, query) for chunk in selected])
+            if len(answers) == 1:
+                return answers[0]
+            return await self._reduce(answers, query)
+
+        async def _links() -> str:
+            return await self._extract_links(url, link_section, query) if link_lines else "No links found."
+
+        res_summary, res_links = await asyncio.gather(_answer(), _links())
+        self._update_web_qa_stats(content, selected, link_section if link_lines else "")
+        return res_summary, res_links
+
+    def _update_web_qa_stats(self, content: str, selected: list[str], link_section: str) -> None:
+        content_tokens = TokenUtils.count_tokens(content)
+        tokens_sent = sum(TokenUtils.count_tokens(chunk) for chunk in selected) + TokenUtils.count_tokens(link_section)
+        tokens_saved = 2 * content_tokens - tokens_sent  # the full mode sends the content twice
+        self.web_qa_stats["calls"] += 1
+        self.web_qa_stats["content_tokens"] += content_tokens
+        self.web_qa_stats["tokens_sent"] += tokens_sent
+        self.web_qa_stats["tokens_saved"] += tokens_saved
+        logger.info(
+            f"[web_qa] chunked: {len(selected)} chunks, {tokens_sent} content tokens sent, {tokens_saved} tokens saved"
+        )
+
+    async def _reduce(self, answers: list[str], query: str) -> str:
+        answers_str = "\n\n".join(f"<part_{i}>\n{answer}\n</part_{i}>" for i, answer in enumerate(answers, 1))
+        template = TOOL_PROMPTS["search_qa_reduce"].format(answers=answers_str, query=query)
+        return await self.llm.query_one(
+            messages=[{"role": "user", "content": template}], **self.config.config_llm.model_params.model_dump()
+        )
+
     async def _qa(self, content: str, query: str) -> str:
         template = TOOL_PROMPTS["search_qa"].format(content=content, query=query)
         return await self.llm.query_one(
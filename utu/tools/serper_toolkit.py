@@ -1,3 +1,4 @@
+import asyncio
 import os
 from collections.abc import Callable
 from typing import Any
@@ -6,6 +7,7 @@ import httpx
 
 from ..config import ToolkitConfig
 from .base import AsyncBaseToolkit
+from .utils import ContentFilter, get_engine_semaphore, merge_search_results
 
 
 class SerperToolkit(AsyncBaseToolkit):
@@ -19,6 +21,8 @@ class SerperToolkit(AsyncBaseToolkit):
         if not self.api_key:
             raise ValueError("SERPER_API_KEY environment variable is required")
         self.async_client = httpx.AsyncClient()
+        self.search_concurrency = self.config.config.get("search_concurrency", 4)
+        self.content_filter = ContentFilter(self.config.config.get("search_banned_sites", []))
 
     async def _search(self, endpoint: str, payload: dict) -> dict[str, Any]:
         """
@@ -80,6 +84,57 @@ class SerperToolkit(AsyncBaseToolkit):
             "status": "success",
         }
 
+    async def google_search_batch(
+        self,
+        queries: list[str],
+        location: str = "China",
+        gl: str = "cn",
+        hl: str = "zh-cn",
+        num: int = 10,
+        date_range: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Run several Google searches concurrently and merge the results.
+
+        Results are deduped by canonical url and ranked by how high (and in how many queries) they appear.
+
+        Args:
+            queries (list[str]): Search query strings, at most 10.
+            location (str): Geographic location for search.
+            gl (str): Country code for search results.
+            hl (str): Language code for search interface.
+            num (int): Number of merged results to return.
+            date_range (str, optional): Time filter for search results, see `google_search`.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing the merged search results, each with the indexes of the queries
+                returning it.
+        """
+        queries = list(dict.fromkeys(q for q in queries if q.strip()))[:10]
+        semaphore = get_engine_semaphore("serper", self.search_concurrency)
+
+        async def _search(query: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self.google_search(query, location=location, gl=gl, hl=hl, date_range=date_range)
+
+        responses = await asyncio.gather(*[_search(query) for query in queries])
+        errors = {r["query"]: r["error"] for r in responses if r["status"] == "error"}
+        if len(errors) == len(queries):
+            return {"queries": queries, "error": errors, "status": "error"}
+        merged = merge_search_results([r.get("results", []) for r in responses], key="link")
+        results = self.content_filter.filter_results(merged, num)
+        return {
+            "queries": queries,
+            "location": location,
+            "gl": gl,
+            "hl": hl,
+            "date_range": date_range,
+            "results": results,
+            "errors": errors,
+            "total_results": len(results),
+            "status": "success",
+        }
+
     async def autocomplete(
         self, query: str, location: str = "China", gl: str = "cn", hl: str = "zh-cn"
     ) -> dict[str, Any]:
@@ -403,6 +458,7 @@ class SerperToolkit(AsyncBaseToolkit):
     async def get_tools_map(self) -> dict[str, Callable]:
         return {
             "google_search": self.google_search,
+            "google_search_batch": self.google_search_batch,
             "autocomplete": self.autocomplete,
             "google_lens": self.google_lens,
             "image_search": self.image_search,
@@ -2,6 +2,7 @@
 WARNING: WIP
 """
 
+import functools
 import json
 import math
 import os
@@ -40,11 +41,22 @@ TEMPLATE_COLUMN_QA = (
 
 
 class TabularDataToolkit(AsyncBaseToolkit):
+    """Column information of tabular data files.
+
+    Schemas are inferred from the first `sample_rows` rows only, so large files are never fully loaded. They are
+    cached in-process by (path, size, mtime), shared by all toolkit instances; the LLM column QA is cached by the
+    inferred schema, so it is reused across calls, agents and runs.
+
+    Config:
+        sample_rows (int): number of rows read to infer the schema. Defaults to 1000.
+    """
+
     def __init__(self, config: ToolkitConfig = None):
         super().__init__(config)
         self.llm = SimplifiedAsyncOpenAI(
             **self.config.config_llm.model_provider.model_dump() if self.config.config_llm else {}
         )
+        self.sample_rows = self.config.config.get("sample_rows", 1000)
 
     def get_tabular_columns(self, file_path: str, return_feat: list[str] = None) -> str:
         """Extract raw column metadata from tabular data files.
@@ -63,48 +75,57 @@ class TabularDataToolkit(AsyncBaseToolkit):
             return self._stringify_column_info([{"error": f"File '{file_path}' does not exist."}])
 
         try:
-            # 1. Load the tabular data using the helper function
-            df = self._load_tabular_data(file_path)
-            # 2. Build column information
-            column_info = []
-            for col in df.columns:
-                try:
-                    # Get data type
-                    dtype = str(df[col].dtype)
-
-                    # Get a non-null sample value
-                    sample_value = None
-                    non_null_values = df[col].dropna()
-                    if len(non_null_values) > 0:
-                        # Get the first non-null value as sample
-                        sample_value = non_null_values.iloc[0]
-                        # Convert to string, handling different data types
-                        if pd.isna(sample_value):
+            stat = os.stat(file_path)
+            column_info = self._infer_columns(
+                os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, self.sample_rows
+            )
+            return self._stringify_column_info(list(column_info), return_feat=return_feat)
+
+        except Exception as e:  # pylint: disable=broad-except
+            error_msg = f"Error reading file '{file_path}': {str(e)}"
+            logger.error(error_msg)
+            return self._stringify_column_info([{"error": error_msg}], return_feat=return_feat)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _infer_columns(file_path: str, size: int, mtime_ns: int, sample_rows: int) -> tuple[dict, ...]:
+        """Column names, dtypes and sample values from the first `sample_rows` rows.
+        `size` and `mtime_ns` are only part of the cache key, a modified file is read again."""
+        # 1. Load a sample of the tabular data using the helper function
+        df = TabularDataToolkit._load_tabular_data(file_path, nrows=sample_rows)
+        # 2. Build column information
+        column_info = []
+        for col in df.columns:
+            try:
+                # Get data type
+                dtype = str(df[col].dtype)
+
+                # Get a non-null sample value
+                sample_value = None
+                non_null_values = df[col].dropna()
+                if len(non_null_values) > 0:
+                    # Get the first non-null value as sample
+                    sample_value = non_null_values.iloc[0]
+                    # Convert to string, handling different data types
+                    if pd.isna(sample_value):
+                        sample_str = "NaN"
+                    elif isinstance(sample_value, float):
+                        if math.isnan(sample_value):
                             sample_str = "NaN"
-                        elif isinstance(sample_value, float):
-                            if math.isnan(sample_value):
-                                sample_str = "NaN"
-                            else:
-                                sample_str = str(sample_value)
                         else:
                             sample_str = str(sample_value)
                     else:
-                        sample_str = "No data"
-
-                    column_info.append({"column_name": str(col), "type": dtype, "sample": sample_str})
+                        sample_str = str(sample_value)
+                else:
+                    sample_str = "No data"
 
-                except Exception as e:  # pylint: disable=broad-except
-                    logger.warning(f"Error processing column '{col}': {e}")
-                    column_info.append({"column_name": str(col), "type": "unknown", "sample": "Error reading sample"})
+                column_info.append({"column_name": str(col), "type": dtype, "sample": sample_str})
 
-            return self._stringify_column_info(column_info, return_feat=return_feat)
-
-        except Exception as e:  # pylint: disable=broad-except
-            error_msg = f"Error reading file '{file_path}': {str(e)}"
-            logger.error(error_msg)
-            return self._stringify_column_info([{"error": error_msg}], return_feat=return_feat)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning(f"Error processing column '{col}': {e}")
+                column_info.append({"column_name": str(col), "type": "unknown", "sample": "Error reading sample"})
+        return tuple(column_info)
 
-    @async_file_cache(mode="file", expire_time=None)
     async def get_column_info(self, file_path: str) -> str:
         """Intelligently analyze and interpret column information.
 
@@ -118,9 +139,13 @@ class TabularDataToolkit(AsyncBaseToolkit):
             str: Analysis with file structure and column explanations.
         """
         column_info_str = self.get_tabular_columns(file_path)
-        prompt = TEMPLATE_COLUMN_QA.format(column_info=column_info_str)
         logger.info(f"[tool] get_column_info: {file_path}")
+        return await self._query_column_info(column_info_str)
 
+    @async_file_cache(mode="file", expire_time=None)
+    async def _query_column_info(self, column_info_str: str) -> str:
+        # cached by the schema rather than the file path: reused for identical schemas, invalidated on changes
+        prompt = TEMPLATE_COLUMN_QA.format(column_info=column_info_str)
         try:
             response = await self.llm.query_one(
                 messages=[{"role": "user", "content": prompt}],
@@ -132,9 +157,13 @@ class TabularDataToolkit(AsyncBaseToolkit):
             logger.error(error_msg)
             return error_msg
 
-    def _load_tabular_data(self, file_path: str) -> pd.DataFrame:
+    @staticmethod
+    def _load_tabular_data(file_path: str, nrows: int | None = None) -> pd.DataFrame:
         """Load tabular data from a file and return as a DataFrame.
 
+        Args:
+            nrows (int, optional): only read the first `nrows` rows. Whole JSON arrays are always fully parsed.
+
         Returns:
             pd.DataFrame: DataFrame containing the tabular data.
         Raises:
@@ -150,26 +179,37 @@ class TabularDataToolkit(AsyncBaseToolkit):
             df = None
             for encoding in encodings:
                 try:
-                    df = pd.read_csv(file_path, encoding=encoding)
+                    df = pd.read_csv(file_path, encoding=encoding, nrows=nrows)
                     break
                 except UnicodeDecodeError:
                     continue
             if df is None:
                 raise Exception("Could not read CSV file with any supported encoding")
         elif file_ext in [".xlsx", ".xls"]:
-            df = pd.read_excel(file_path)
+            df = pd.read_excel(file_path, nrows=nrows)
+        elif file_ext == ".jsonl":
+            df = pd.read_json(file_path, lines=True, nrows=nrows)
         elif file_ext == ".json":
             # Try to read JSON as tabular data
             df = pd.read_json(file_path)
+            if nrows is not None:
+                df = df.head(nrows)
         elif file_ext == ".parquet":
-            df = pd.read_parquet(file_path)
+            if nrows is None:
+                df = pd.read_parquet(file_path)
+            else:
+                import pyarrow.parquet as pq  # required by pd.read_parquet anyway
+
+                # stream the first batch instead of reading all row groups
+                batch = next(pq.ParquetFile(file_path).iter_batches(batch_size=nrows), None)
+                df = batch.to_pandas() if batch is not None else pd.read_parquet(file_path)
         elif file_ext == ".tsv":
             # Tab-separated values
             encodings = ["utf-8", "latin1", "cp1252", "iso-8859-1"]
             df = None
             for encoding in encodings:
                 try:
-                    df = pd.read_csv(file_path, sep="\t", encoding=encoding)
+                    df = pd.read_csv(file_path, sep="\t", encoding=encoding, nrows=nrows)
                     break
                 except UnicodeDecodeError:
                     continue
@@ -178,7 +218,7 @@ class TabularDataToolkit(AsyncBaseToolkit):
         else:
             # Try to read as CSV by default
             try:
-                df = pd.read_csv(file_path)
+                df = pd.read_csv(file_path, nrows=nrows)
             except Exception as e:  # pylint: disable=broad-except
                 raise Exception(f"Unsupported file format: {file_ext}") from e
 
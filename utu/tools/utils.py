@@ -1,13 +1,23 @@
+import asyncio
+import hashlib
+import json
+import os
 import re
+import time
+import weakref
 from collections.abc import Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import mcp.types as types
-from agents import Agent, FunctionTool, RunContextWrapper
+from agents import FunctionTool
 from agents.function_schema import FuncSchema, function_schema
 from agents.mcp import MCPServerSse, MCPServerStdio, MCPServerStreamableHttp, ToolFilterStatic
 from mcp import Tool as MCPTool
 
 from ..config import ToolkitConfig
+from ..utils import CACHE_DIR, get_logger
+
+logger = get_logger(__name__)
 
 # ------------------------------------------------------------------------------
 # MCP
@@ -20,6 +30,7 @@ MCP_SERVER_MAP = {
 
 def get_mcp_server(config: ToolkitConfig) -> MCPServerSse | MCPServerStdio | MCPServerStreamableHttp:
     """Get mcp server from config, with tool_filter if activated_tools is set.
+    The tools list is cached in the server if `mcp_tools_cache_ttl_seconds` > 0, see `MCPToolsCache.seed_server`.
     NOTE: you should manage the lifecycle of the returned server (.connect & .cleanup), e.g. using `async with`."""
     assert config.mode == "mcp", f"config mode must be 'mcp', got {config.mode}"
     assert config.mcp_transport in MCP_SERVER_MAP, f"Unsupported mcp transport: {config.mcp_transport}"
@@ -27,20 +38,89 @@ def get_mcp_server(config: ToolkitConfig) -> MCPServerSse | MCPServerStdio | MCP
     return MCP_SERVER_MAP[config.mcp_transport](
         params=config.config,
         name=config.name,
+        cache_tools_list=config.mcp_tools_cache_ttl_seconds > 0,
         client_session_timeout_seconds=config.mcp_client_session_timeout_seconds,
         tool_filter=tool_filter,
     )
 
 
-async def get_mcp_tools(config: ToolkitConfig) -> list[MCPTool]:
-    async with get_mcp_server(config) as mcp_server:
-        # It is required to pass agent and run_context when using `tool_filter`, we pass a dummy agent here
-        tools = await mcp_server.list_tools(agent=Agent(name="dummy"), run_context=RunContextWrapper(context=None))
+class MCPToolsCache:
+    """Tools lists of MCP servers cached on disk, keyed by the hash of the server config (transport & params).
+
+    Entries expire after `config.mcp_tools_cache_ttl_seconds`. The tools are stored unfiltered, `activated_tools` is
+    applied on read.
+    """
+
+    cache_dir = CACHE_DIR / "mcp" / "tools"
+
+    @classmethod
+    def get_key(cls, config: ToolkitConfig) -> str:
+        server_config = {"transport": config.mcp_transport, "params": config.config}
+        return hashlib.sha256(json.dumps(server_config, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+    @classmethod
+    def get(cls, config: ToolkitConfig) -> list[MCPTool] | None:
+        if config.mcp_tools_cache_ttl_seconds <= 0:
+            return None
+        path = cls.cache_dir / f"{cls.get_key(config)}.json"
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            if time.time() - entry["created_at"] > config.mcp_tools_cache_ttl_seconds:
+                return None
+            return [MCPTool.model_validate(tool) for tool in entry["tools"]]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @classmethod
+    def set(cls, config: ToolkitConfig, tools: list[MCPTool]) -> None:
+        cls.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = cls.cache_dir / f"{cls.get_key(config)}.json"
+        entry = {
+            "name": config.name,
+            "created_at": time.time(),
+            "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+        }
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    @classmethod
+    async def seed_server(cls, server: MCPServerSse | MCPServerStdio | MCPServerStreamableHttp, config: ToolkitConfig):
+        """Fill the tools list cache of a connected server, from disk or from the server (and save it to disk), so
+        that runs do not list the tools again."""
+        if not server.cache_tools_list:
+            return
+        tools = cls.get(config)
+        if tools is None:
+            tools = (await server.session.list_tools()).tools
+            cls.set(config, tools)
+        # NOTE: private attributes of `_MCPServerWithClientSession.list_tools`
+        server._tools_list = tools
+        server._cache_dirty = False
+
+
+def filter_mcp_tools(tools: list[MCPTool], config: ToolkitConfig) -> list[MCPTool]:
+    if not config.activated_tools:
         return tools
+    return [tool for tool in tools if tool.name in config.activated_tools]
 
 
-async def get_mcp_tools_schema(config: ToolkitConfig) -> dict[str, FuncSchema]:
-    tools = await get_mcp_tools(config)
+async def get_mcp_tools(config: ToolkitConfig, refresh: bool = False) -> list[MCPTool]:
+    """List the tools of the MCP server, from the disk cache if fresh. `refresh` to list them from the server."""
+    tools = None if refresh else MCPToolsCache.get(config)
+    if tools is None:
+        logger.info(f"Listing tools of MCP server `{config.name}`")
+        async with get_mcp_server(config) as mcp_server:
+            tools = (await mcp_server.session.list_tools()).tools
+        if config.mcp_tools_cache_ttl_seconds > 0:
+            MCPToolsCache.set(config, tools)
+    return filter_mcp_tools(tools, config)
+
+
+async def get_mcp_tools_schema(config: ToolkitConfig, refresh: bool = False) -> dict[str, FuncSchema]:
+    tools = await get_mcp_tools(config, refresh=refresh)
     tools_map = {}
     for tool in tools:
         tools_map[tool.name] = FuncSchema(
@@ -131,3 +211,55 @@ class ContentFilter:
             if len(res) >= limit:
                 break
         return res
+
+
+# query params that do not change the page
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|msclkid|spm|from)$")
+
+
+def canonicalize_url(url: str) -> str:
+    """Canonical form of a url to dedupe search results, e.g. `https://www.a.com/b/?utm_source=x#c` -> `a.com/b`."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not TRACKING_PARAMS.match(k)))
+    return urlunsplit(("", host, parts.path.rstrip("/"), query, "")).removeprefix("//")
+
+
+def merge_search_results(results_per_query: list[list[dict]], key: str = "url", k: int = 60) -> list[dict]:
+    """Merge ranked result lists of several queries into one, deduped by canonical url.
+
+    Results are ranked by reciprocal rank fusion: sum of `1 / (k + rank)` over the queries returning them, so results
+    found by several queries rank higher. Each merged result keeps the first occurrence, with `queries` set to the
+    (1-based) indexes of the queries returning it.
+    """
+    merged: dict[str, dict] = {}
+    scores: dict[str, float] = {}
+    for query_idx, results in enumerate(results_per_query, 1):
+        for rank, result in enumerate(results, 1):
+            canonical = canonicalize_url(result[key])
+            if canonical not in merged:
+                merged[canonical] = {**result, "queries": []}
+                scores[canonical] = 0.0
+            if query_idx not in merged[canonical]["queries"]:
+                merged[canonical]["queries"].append(query_idx)
+                scores[canonical] += 1 / (k + rank)
+    return [merged[c] for c in sorted(merged, key=lambda c: scores[c], reverse=True)]
+
+
+# concurrency limit of each search engine, shared by all toolkits in the event loop. loop -> engine name -> semaphore
+_ENGINE_SEMAPHORES: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_engine_semaphore(engine: str, limit: int) -> asyncio.Semaphore:
+    """Semaphore of the engine in the running event loop, `limit` only takes effect on creation."""
+    semaphores = _ENGINE_SEMAPHORES.setdefault(asyncio.get_running_loop(), {})
+    if engine not in semaphores:
+        semaphores[engine] = asyncio.Semaphore(limit)
+    return semaphores[engine]
@@ -1,4 +1,20 @@
-from .phoenix_utils import PhoenixUtils
-from .setup import setup_db_tracing, setup_otel_tracing, setup_tracing
+from .setup import ensure_tracing, setup_db_tracing, setup_otel_tracing, setup_tracing
+from .toolcall_stat import ToolCallStatRunHook
 
-__all__ = ["setup_otel_tracing", "setup_db_tracing", "setup_tracing", "PhoenixUtils"]
+__all__ = [
+    "setup_otel_tracing",
+    "setup_db_tracing",
+    "setup_tracing",
+    "ensure_tracing",
+    "PhoenixUtils",
+    "ToolCallStatRunHook",
+]
+
+
+def __getattr__(name: str):
+    # phoenix client pulls in pandas, import it on demand
+    if name == "PhoenixUtils":
+        from .phoenix_utils import PhoenixUtils
+
+        return PhoenixUtils
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
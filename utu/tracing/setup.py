@@ -4,24 +4,22 @@ https://github.com/Arize-ai/openinference/tree/main/python/instrumentation/openi
 session-level tracing in @phoenix https://arize.com/docs/phoenix/tracing/how-to-tracing/setup-tracing/setup-sessions
 """
 
-from agents import add_trace_processor, set_tracing_disabled
-from openinference.instrumentation.openai import OpenAIInstrumentor
+from typing import TYPE_CHECKING
 
-# from openinference.instrumentation.openai_agents import OpenAIAgentsInstrumentor
-# from phoenix.otel import TracerProvider, register
-from openinference.semconv.resource import ResourceAttributes
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.trace import Resource, TracerProvider
-from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+from agents import add_trace_processor, set_tracing_disabled
 
 from ..utils import EnvUtils, SQLModelUtils, get_logger
-from .db_tracer import DBTracingProcessor
-from .otel_agents_instrumentor import OpenAIAgentsInstrumentor
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import TracerProvider
+
+    from .db_tracer import DBTracingProcessor
 
 logger = get_logger(__name__)
 
-OTEL_TRACING_PROVIDER: TracerProvider | None = None
-DB_TRACING_PROCESSOR: DBTracingProcessor | None = None
+OTEL_TRACING_PROVIDER: "TracerProvider | None" = None
+DB_TRACING_PROCESSOR: "DBTracingProcessor | None" = None
+_TRACING_SET_UP = False
 
 
 def setup_otel_tracing(
@@ -44,6 +42,15 @@ def setup_otel_tracing(
         set_tracing_disabled(True)  # we disable the openai's default tracing
         return
 
+    # imported here as the otel & instrumentation packages are slow to import
+    from openinference.instrumentation.openai import OpenAIInstrumentor
+    from openinference.semconv.resource import ResourceAttributes
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.trace import Resource, TracerProvider
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+
+    from .otel_agents_instrumentor import OpenAIAgentsInstrumentor
+
     # https://arize.com/docs/phoenix/tracing/how-to-tracing/setup-tracing/custom-spans
     # create your key: https://app.phoenix.arize.com/s/_space_name_/settings/general
     if endpoint.startswith("https://app.phoenix.arize.com"):
@@ -75,11 +82,22 @@ def setup_db_tracing() -> None:
     if not SQLModelUtils.check_db_available():
         logger.warning("DB_URL not set or database connection failed! Tracing will not be stored into database!")
         return
+    from .db_tracer import DBTracingProcessor
+
     logger.info("Setting up DB tracing")
     DB_TRACING_PROCESSOR = DBTracingProcessor()
     add_trace_processor(DB_TRACING_PROCESSOR)  # add an additional processor
 
 
 def setup_tracing() -> None:
+    global _TRACING_SET_UP
+    _TRACING_SET_UP = True
     setup_otel_tracing()
     setup_db_tracing()
+
+
+def ensure_tracing() -> None:
+    """Setup tracing on first use. Called before agents start a trace, so that `import utu` neither imports the
+    tracing packages nor connects to the DB."""
+    if not _TRACING_SET_UP:
+        setup_tracing()
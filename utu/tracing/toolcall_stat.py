@@ -1,10 +1,109 @@
+import asyncio
+import bisect
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from typing import Any
 
 from agents import Agent, RunContextWrapper, RunHooks, TContext, Tool
 
+from ..db import ToolCallStatModel
+from ..utils import SQLModelUtils, get_logger
+
+logger = get_logger(__name__)
+
+# upper bounds (in seconds) of the latency histogram buckets, the last bucket is unbounded
+LATENCY_BUCKETS: tuple[float, ...] = (0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0)
+# the message returned by `agents.tool.default_tool_error_function`
+TOOL_ERROR_PREFIX = "An error occurred while running the tool."
+
+
+def _bucket_name(index: int) -> str:
+    if index < len(LATENCY_BUCKETS):
+        return f"le_{LATENCY_BUCKETS[index]:g}s"
+    return "inf"
+
+
+@dataclass
+class ToolCallStat:
+    """Aggregated stats of a single tool."""
+
+    count: int = 0
+    error_count: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    latency_histogram: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    total_output_size: int = 0
+    max_output_size: int = 0
+
+    def add(self, latency: float, output_size: int, is_error: bool) -> None:
+        self.count += 1
+        self.error_count += int(is_error)
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.latency_histogram[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.total_output_size += output_size
+        self.max_output_size = max(self.max_output_size, output_size)
+
+    def histogram_dict(self) -> dict[str, int]:
+        return {_bucket_name(i): c for i, c in enumerate(self.latency_histogram) if c}
+
+    def as_dict(self) -> dict:
+        count = max(self.count, 1)
+        return {
+            "count": self.count,
+            "error_count": self.error_count,
+            "error_rate": self.error_count / count,
+            "avg_latency": self.total_latency / count,
+            "max_latency": self.max_latency,
+            "total_latency": self.total_latency,
+            "latency_histogram": self.histogram_dict(),
+            "avg_output_size": self.total_output_size / count,
+            "max_output_size": self.max_output_size,
+        }
+
 
-# TODO: log toolcall infos into db
 class ToolCallStatRunHook(RunHooks):
+    """Collect per-tool call counts, latency histograms, output sizes and error rates.
+
+    Aggregates are plain in-memory counters. Hooks run on the event loop thread and never await between reading and
+    updating a counter, so no lock is needed. Every `flush_interval` seconds the delta since the last flush is
+    written to the `tracing_toolcall_stat` table (if DB is available) and passed to `exporter` (if set), in a worker
+    thread so that tool calls are not blocked.
+
+    Usage:
+        hook = ToolCallStatRunHook(run_id="exp_001")
+        agent.set_run_hooks(hook)
+        ...
+        print(hook.summary())
+    """
+
+    def __init__(
+        self,
+        run_id: str = "default",
+        flush_interval: float = 30.0,
+        exporter: Callable[[str, dict[str, ToolCallStat]], None] | None = None,
+        save_to_db: bool | None = None,
+    ) -> None:
+        """
+        Args:
+            run_id (str): identifier of the run, e.g. the exp_id of a benchmark
+            flush_interval (float): minimal interval in seconds between two flushes
+            exporter (Callable, optional): called with (run_id, {tool_name: delta stat}) on each flush,
+                e.g. to push metrics to a monitoring endpoint
+            save_to_db (bool, optional): whether to save stats into db. Default to whether DB is available
+        """
+        self.run_id = run_id
+        self.flush_interval = flush_interval
+        self.exporter = exporter
+        self.save_to_db = SQLModelUtils.check_db_available() if save_to_db is None else save_to_db
+
+        self._pending: dict[Any, float] = {}  # call key -> start time
+        self._delta: dict[str, ToolCallStat] = {}  # stats since last flush
+        self._total: dict[str, ToolCallStat] = {}  # stats since start
+        self._last_flush = time.monotonic()
+        self._flush_task: asyncio.Task | None = None
+
     async def on_agent_start(self, context: RunContextWrapper[TContext], agent: Agent[TContext]) -> None:
         pass
 
@@ -17,9 +116,95 @@ class ToolCallStatRunHook(RunHooks):
         pass
 
     async def on_tool_start(self, context: RunContextWrapper[TContext], agent: Agent[TContext], tool: Tool) -> None:
-        pass
+        self._pending[self._get_call_key(context, tool)] = time.perf_counter()
 
     async def on_tool_end(
         self, context: RunContextWrapper[TContext], agent: Agent[TContext], tool: Tool, result: str
     ) -> None:
-        pass
+        start = self._pending.pop(self._get_call_key(context, tool), None)
+        if start is None:
+            logger.warning(f"Tool `{tool.name}` ended without a recorded start! Skipping...")
+            return
+        self.record(tool.name, time.perf_counter() - start, result)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self._schedule_flush()
+
+    def record(self, name: str, latency: float, result: Any) -> None:
+        """Record a finished tool call."""
+        output = result if isinstance(result, str) else str(result)
+        is_error = output.startswith(TOOL_ERROR_PREFIX)
+        for stats in (self._delta, self._total):
+            if name not in stats:
+                stats[name] = ToolCallStat()
+            stats[name].add(latency, len(output), is_error)
+
+    def summary(self) -> dict[str, dict]:
+        """Stats of all tools since start, sorted by total latency (the bottleneck comes first)."""
+        items = sorted(self._total.items(), key=lambda x: x[1].total_latency, reverse=True)
+        return {name: stat.as_dict() for name, stat in items}
+
+    def flush(self) -> None:
+        """Flush the stats since last flush synchronously."""
+        delta = self._swap_delta()
+        if delta:
+            self._export(delta)
+
+    async def aflush(self) -> None:
+        """Wait for the pending flush and flush the remaining stats."""
+        if self._flush_task is not None:
+            await self._flush_task
+        delta = self._swap_delta()
+        if delta:
+            await asyncio.to_thread(self._export, delta)
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            return  # the previous flush is still running, stats will be flushed next time
+        delta = self._swap_delta()
+        if delta:
+            self._flush_task = asyncio.create_task(asyncio.to_thread(self._export, delta))
+
+    def _swap_delta(self) -> dict[str, ToolCallStat]:
+        delta, self._delta = self._delta, {}
+        self._last_flush = time.monotonic()
+        return delta
+
+    def _export(self, delta: dict[str, ToolCallStat]) -> None:
+        if self.exporter is not None:
+            try:
+                self.exporter(self.run_id, delta)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.error(f"Error exporting tool call stats: {e}", exc_info=True)
+        if self.save_to_db:
+            self._save_to_db(delta)
+
+    def _save_to_db(self, delta: dict[str, ToolCallStat]) -> None:
+        timestamp = time.time()
+        try:
+            with SQLModelUtils.create_session() as session:
+                session.add_all(
+                    [
+                        ToolCallStatModel(
+                            run_id=self.run_id,
+                            timestamp=timestamp,
+                            name=name,
+                            count=stat.count,
+                            error_count=stat.error_count,
+                            total_latency=stat.total_latency,
+                            max_latency=stat.max_latency,
+                            latency_histogram=stat.histogram_dict(),
+                            total_output_size=stat.total_output_size,
+                            max_output_size=stat.max_output_size,
+                        )
+                        for name, stat in delta.items()
+                    ]
+                )
+                session.commit()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error(f"Error saving tool call stats into db: {e}", exc_info=True)
+
+    @staticmethod
+    def _get_call_key(context: RunContextWrapper[TContext], tool: Tool) -> tuple:
+        # function tools are called with a `ToolContext` which carries the tool_call_id
+        call_id = getattr(context, "tool_call_id", None)
+        return (tool.name, call_id if call_id is not None else id(context))
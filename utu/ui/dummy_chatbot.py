@@ -1,5 +1,4 @@
 import asyncio
-import pickle
 import time
 
 import agents as ag
@@ -17,18 +16,21 @@ from .common import (
     TextDeltaContent,
     WorkerItem,
 )
+from .event_log import EventLogWriter
 
-event_list = []
-start_time = time.time()
+event_log: EventLogWriter | None = None
 
 
 async def send_event(event: Event):
-    event_list.append({"timestamp": time.time() - start_time, "event": event})
+    global event_log
+    if event_log is None:  # events are written as they come, see `scripts/utils/replay_server.py` for replay
+        event_log = EventLogWriter(f"event_list_{time.time()}.evlog.zst")
+    event_log.write(event)
 
 
 def save_event_list():
-    with open(f"event_list_{time.time()}.pkl", "wb") as f:
-        pickle.dump(event_list, f)
+    if event_log is not None:
+        event_log.close()
 
 
 async def run(agent: SimpleAgent | OrchestraAgent, query: str):
@@ -0,0 +1,150 @@
+"""Coalesce the events streamed to a websocket client.
+
+Models stream text & reasoning in tiny deltas, sending each as a websocket message floods the browser and the tornado
+write buffer with thousands of frames. `EventCoalescer` buffers the events of a connection and writes them from a
+background task:
+
+- consecutive in-progress text / reasoning deltas of the same type are merged into one event, flushed every
+  `flush_interval` seconds or once `max_delta_size` chars are buffered; other events (tool calls, orchestra events,
+  finish, ...) are flushed immediately, in order;
+- each write waits until tornado has flushed the previous message to the socket (backpressure), events arriving
+  meanwhile are merged, so a slow client gets fewer and larger messages instead of a growing write buffer;
+- a client which does not keep up at all (more than `max_backlog_size` chars buffered) is dropped via `on_stalled`.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .common import Event
+
+MERGEABLE_DELTA_TYPES = ("text", "reason")
+
+
+class EventCoalescer:
+    def __init__(
+        self,
+        write: Callable[[dict], Awaitable[Any] | None],
+        flush_interval: float = 0.05,
+        max_delta_size: int = 4096,
+        max_backlog_size: int = 4 * 1024 * 1024,
+        on_stalled: Callable[[], Any] | None = None,
+    ) -> None:
+        """
+        Args:
+            write (Callable): send a message, e.g. `WebSocketHandler.write_message`. The returned awaitable (if any)
+                should resolve when the message is flushed.
+            flush_interval (float): max delay of a buffered delta, in seconds
+            max_delta_size (int): flush a merged delta once it reaches this many chars
+            max_backlog_size (int): call `on_stalled` and stop sending when more chars are buffered
+            on_stalled (Callable): called when the client does not keep up, e.g. close the connection
+        """
+        self.write = write
+        self.flush_interval = flush_interval
+        self.max_delta_size = max_delta_size
+        self.max_backlog_size = max_backlog_size
+        self.on_stalled = on_stalled
+        self.stats = {"events": 0, "messages": 0, "merged": 0}
+
+        self._buffer: list[Event] = []
+        self._backlog_size = 0
+        self._first_buffered_at: float | None = None
+        self._urgent = False
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._closed = False
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def put(self, event: Event) -> None:
+        """Queue an event, it never blocks."""
+        if self._closed:
+            return
+        self.stats["events"] += 1
+        last = self._buffer[-1] if self._buffer else None
+        if self._is_mergeable(event):
+            size = len(event.data.delta)
+            if last is not None and self._is_mergeable(last) and last.data.type == event.data.type:
+                last.data.delta += event.data.delta
+                self.stats["merged"] += 1
+                last_size = len(last.data.delta)
+            else:
+                self._buffer.append(event.model_copy(deep=True))  # the buffered delta is extended in place
+                last_size = size
+            if last_size >= self.max_delta_size:
+                self._urgent = True
+        else:
+            size = len(event.data.delta) if event.type == "raw" and event.data else 0
+            self._buffer.append(event)
+            self._urgent = True
+        self._backlog_size += size
+        if self._first_buffered_at is None:
+            self._first_buffered_at = time.monotonic()
+        self._idle.clear()
+        self._wakeup.set()
+
+        if self._backlog_size > self.max_backlog_size:
+            logging.warning(f"Websocket client is too slow, dropping it ({self._backlog_size} chars buffered)")
+            self.close()
+            if self.on_stalled is not None:
+                self.on_stalled()
+
+    async def drain(self) -> None:
+        """Wait until all the queued events are written."""
+        self._urgent = True
+        self._wakeup.set()
+        await self._idle.wait()
+
+    def close(self) -> None:
+        """Stop sending, the buffered events are discarded, e.g. when the connection is closed."""
+        self._closed = True
+        self._buffer = []
+        self._flush_task.cancel()
+        self._idle.set()
+
+    @staticmethod
+    def _is_mergeable(event: Event) -> bool:
+        return (
+            event.type == "raw"
+            and event.data.type in MERGEABLE_DELTA_TYPES
+            and event.data.inprogress
+            and event.data.delta != ""
+        )
+
+    async def _flush_loop(self) -> None:
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                if not self._buffer:
+                    self._idle.set()
+                    continue
+                if not self._urgent:  # wait for more deltas to merge, up to the flush interval
+                    delay = self._first_buffered_at + self.flush_interval - time.monotonic()
+                    if delay > 0:
+                        try:
+                            await asyncio.wait_for(self._wait_urgent(), delay)
+                        except TimeoutError:
+                            pass
+                events, self._buffer = self._buffer, []
+                self._backlog_size, self._first_buffered_at, self._urgent = 0, None, False
+                for event in events:
+                    res = self.write(event.model_dump())
+                    self.stats["messages"] += 1
+                    if res is not None:
+                        await res  # backpressure, new events are merged meanwhile
+                self._wakeup.set()  # check the events buffered during the writes
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:  # pylint: disable=broad-except
+            # e.g. tornado.websocket.WebSocketClosedError, the connection is going away
+            logging.debug(f"Stop sending websocket events: {e!r}")
+            self._closed = True
+            self._idle.set()
+
+    async def _wait_urgent(self) -> None:
+        while not self._urgent:
+            await self._wakeup.wait()
+            self._wakeup.clear()
@@ -0,0 +1,123 @@
+"""Recording of web UI events, as a zstd compressed event log.
+
+The log is a zstd stream of length-prefixed records, each a 4-byte big-endian length followed by the json of
+`{"timestamp": seconds since the recording started, "event": Event}`. Unlike pickle it is safe to load, and both
+sides are streaming:
+
+- `EventLogWriter` appends events as they are sent, compressed blocks are flushed every `flush_every` events and at
+  the end of each answer, so the log of a running UI can already be read;
+- `read_event_log` yields the records lazily, a truncated log (e.g. still being written) ends at the last complete
+  record.
+
+The web UI records the events of each connection under `UTU_WEBUI_RECORD_DIR` if set, see
+`EventLogWriter.for_connection`.
+"""
+
+import json
+import pathlib
+import struct
+import time
+import uuid
+from collections.abc import Iterator
+
+from ..utils import get_logger
+from .common import Event
+
+try:
+    import zstandard
+except ImportError as e:
+    raise ImportError("Please install zstandard first: `uv pip install zstandard`") from e
+
+logger = get_logger(__name__)
+
+LENGTH_PREFIX = struct.Struct("!I")
+READ_SIZE = 64 * 1024
+
+
+class EventLogWriter:
+    """Write events to a compressed event log incrementally."""
+
+    def __init__(self, path: str | pathlib.Path, level: int = 3, flush_every: int = 64) -> None:
+        """
+        Args:
+            path (str | Path): path of the log, usually with `.evlog.zst` suffix
+            level (int): zstd compression level
+            flush_every (int): flush a compressed block every this many events
+        """
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+        self.num_events = 0
+        self._start_time = time.time()
+        self._num_unflushed = 0
+        self._file = open(self.path, "wb")  # noqa: SIM115
+        self._writer = zstandard.ZstdCompressor(level=level).stream_writer(self._file, closefd=False)
+
+    @classmethod
+    def for_connection(cls, record_dir: str | pathlib.Path) -> "EventLogWriter":
+        """Open the event log of a new web UI connection in `record_dir`."""
+        name = f"events_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.evlog.zst"
+        logger.info(f"Recording websocket events to {pathlib.Path(record_dir) / name}")
+        return cls(pathlib.Path(record_dir) / name)
+
+    def write(self, event: Event, timestamp: float | None = None) -> None:
+        """Append an event, `timestamp` defaults to the seconds since the writer was opened."""
+        if timestamp is None:
+            timestamp = time.time() - self._start_time
+        data = json.dumps({"timestamp": timestamp, "event": event.model_dump()}, ensure_ascii=False).encode()
+        self._writer.write(LENGTH_PREFIX.pack(len(data)) + data)
+        self.num_events += 1
+        self._num_unflushed += 1
+        if self._num_unflushed >= self.flush_every or event.type == "finish":
+            self.flush()
+
+    def flush(self) -> None:
+        """Make the written events readable."""
+        self._writer.flush(zstandard.FLUSH_BLOCK)
+        self._file.flush()
+        self._num_unflushed = 0
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._writer.flush(zstandard.FLUSH_FRAME)
+        self._writer.close()
+        self._file.close()
+
+    def __enter__(self) -> "EventLogWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_event_log(path: str | pathlib.Path) -> Iterator[dict]:
+    """Read the records `{"timestamp", "event"}` of an event log lazily."""
+    with open(path, "rb") as f:
+        reader = zstandard.ZstdDecompressor().stream_reader(f, read_size=READ_SIZE, read_across_frames=True)
+        while True:
+            header = _read_exact(reader, LENGTH_PREFIX.size)
+            if header is None:
+                return
+            (size,) = LENGTH_PREFIX.unpack(header)
+            data = _read_exact(reader, size)
+            if data is None:
+                logger.warning(f"Event log {path} is truncated")
+                return
+            record = json.loads(data)
+            yield {"timestamp": record["timestamp"], "event": Event.model_validate(record["event"])}
+
+
+def _read_exact(reader, size: int) -> bytes | None:
+    """Read `size` bytes, None at the end of the (possibly truncated) stream."""
+    chunks = []
+    while size > 0:
+        try:
+            chunk = reader.read(size)
+        except zstandard.ZstdError:  # incomplete block at the end
+            return None
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
@@ -17,7 +17,8 @@ from utu.agents.simple_agent import SimpleAgent
 from utu.config import AgentConfig
 from utu.config.loader import ConfigLoader
 from utu.meta.simple_agent_generator import SimpleAgentGeneratedEvent, SimpleAgentGenerator
-from utu.utils import EnvUtils
+from utu.tools.search.http_session import HTTPSessionPool
+from utu.utils import EnvUtils, OpenAIClientRegistry
 
 from .common import (
     AskContent,
@@ -36,6 +37,7 @@ from .common import (
     handle_raw_stream_events,
     handle_tool_call_output,
 )
+from .event_coalescer import EventCoalescer
 
 CONFIG_PATH = "configs/agents"
 
@@ -102,6 +104,12 @@ class WebSocketHandler(tornado.websocket.WebSocketHandler):
         }
 
     async def open(self):
+        self.coalescer = EventCoalescer(self.write_message, on_stalled=lambda: self.close(1013, "Client too slow"))
+        self.event_log = None
+        if record_dir := EnvUtils.get_env("UTU_WEBUI_RECORD_DIR", ""):
+            from .event_log import EventLogWriter  # requires zstandard
+
+            self.event_log = EventLogWriter.for_connection(record_dir)
         # start query worker
         self.query_worker_task = asyncio.create_task(self.handle_query_worker())
         self.answer_queue = asyncio.Queue()
@@ -111,7 +119,10 @@ class WebSocketHandler(tornado.websocket.WebSocketHandler):
 
     async def send_event(self, event: Event):
         logging.debug(f"Sending event: {event.model_dump()}")
-        self.write_message(event.model_dump())
+        if self.event_log:
+            self.event_log.write(event)
+        # deltas are merged, see `EventCoalescer`
+        self.coalescer.put(event)
 
     async def _handle_error(self, message: str):
         await self.send_event(Event(type="error", data=ErrorContent(type="error", message=message)))
@@ -295,6 +306,10 @@ class WebSocketHandler(tornado.websocket.WebSocketHandler):
 
     def on_close(self):
         logging.debug("WebSocket closed")
+        if hasattr(self, "coalescer"):
+            self.coalescer.close()
+        if getattr(self, "event_log", None):
+            self.event_log.close()
 
 
 class WebUIAgents:
@@ -328,7 +343,11 @@ class WebUIAgents:
         app = self.make_app(autoload=autoload)
         app.listen(port, address=ip)
         logging.info(f"Server started at http://{ip}:{port}/")
-        await asyncio.Event().wait()
+        try:
+            await asyncio.Event().wait()
+        finally:  # cancelled on shutdown, close the shared connections of the loop
+            await HTTPSessionPool.aclose()
+            await OpenAIClientRegistry.aclose()
 
     async def launch_async(self, port: int = 8848, ip: str = "127.0.0.1", autoload: bool | None = None):
         await self.__launch(port=port, ip=ip, autoload=autoload)
@@ -10,7 +10,8 @@ import tornado.websocket
 from utu.agents.orchestra import OrchestraStreamEvent
 from utu.agents.orchestra_agent import OrchestraAgent
 from utu.agents.simple_agent import SimpleAgent
-from utu.utils import EnvUtils
+from utu.tools.search.http_session import HTTPSessionPool
+from utu.utils import EnvUtils, OpenAIClientRegistry
 
 from .common import (
     Event,
@@ -21,6 +22,7 @@ from .common import (
     handle_raw_stream_events,
     handle_tool_call_output,
 )
+from .event_coalescer import EventCoalescer
 
 
 class WebSocketHandler(tornado.websocket.WebSocketHandler):
@@ -34,15 +36,22 @@ class WebSocketHandler(tornado.websocket.WebSocketHandler):
 
     def open(self):
         # print("WebSocket opened")
+        self.coalescer = EventCoalescer(self.write_message, on_stalled=lambda: self.close(1013, "Client too slow"))
+        self.event_log = None
+        if record_dir := EnvUtils.get_env("UTU_WEBUI_RECORD_DIR", ""):
+            from .event_log import EventLogWriter  # requires zstandard
+
+            self.event_log = EventLogWriter.for_connection(record_dir)
         # send example query
-        self.write_message(
-            Event(type="example", data=ExampleContent(type="example", query=self.example_query)).model_dump()
-        )
+        self.coalescer.put(Event(type="example", data=ExampleContent(type="example", query=self.example_query)))
 
     async def send_event(self, event: Event):
         # print in green color
         print(f"\033[92mSending event: {event.model_dump()}\033[0m")
-        self.write_message(event.model_dump())
+        if self.event_log:
+            self.event_log.write(event)
+        # deltas are merged, see `EventCoalescer`
+        self.coalescer.put(event)
 
     async def on_message(self, message: str):
         try:
@@ -114,7 +123,10 @@ class WebSocketHandler(tornado.websocket.WebSocketHandler):
 
     def on_close(self):
         # print("WebSocket closed")
-        pass
+        if hasattr(self, "coalescer"):
+            self.coalescer.close()
+        if getattr(self, "event_log", None):
+            self.event_log.close()
 
 
 class WebUIChatbot:
@@ -151,7 +163,11 @@ class WebUIChatbot:
         app = self.make_app()
         app.listen(port, address=ip)
         print(f"Server started at http://{ip}:{port}/")
-        await asyncio.Event().wait()
+        try:
+            await asyncio.Event().wait()
+        finally:  # cancelled on shutdown, close the shared connections of the loop
+            await HTTPSessionPool.aclose()
+            await OpenAIClientRegistry.aclose()
 
     async def launch_async(self, port: int = 8848, ip: str = "127.0.0.1", autoload: bool | None = None):
         await self.__launch(port=port, ip=ip, autoload=autoload)
@@ -3,9 +3,10 @@ from .common import get_event_loop, load_class_from_file, schema_to_basemodel
 from .env import EnvUtils
 from .llm_output_parser import LLMOutputParser
 from .log import get_logger, oneline_object, setup_logging
-from .openai_utils import OpenAIUtils, SimplifiedAsyncOpenAI
+from .openai_utils import OpenAIClientRegistry, OpenAIUtils, SimplifiedAsyncOpenAI
 from .path import CACHE_DIR, DIR_ROOT, FileUtils
 from .print_utils import PrintUtils
+from .retrieval import BM25Index, RetrievalUtils
 from .sqlmodel_utils import SQLModelUtils
 from .token import TokenUtils
 from .tool_cache import async_file_cache
@@ -13,6 +14,7 @@ from .tool_cache import async_file_cache
 __all__ = [
     "PrintUtils",
     "SimplifiedAsyncOpenAI",
+    "OpenAIClientRegistry",
     "OpenAIUtils",
     "AgentsUtils",
     "ChatCompletionConverter",
@@ -30,4 +32,6 @@ __all__ = [
     "get_event_loop",
     "EnvUtils",
     "LLMOutputParser",
+    "BM25Index",
+    "RetrievalUtils",
 ]
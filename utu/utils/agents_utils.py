@@ -26,11 +26,10 @@ from agents import (
 from agents.models.chatcmpl_converter import Converter
 from agents.stream_events import AgentUpdatedStreamEvent, RawResponsesStreamEvent, RunItemStreamEvent
 from agents.tracing import Trace, gen_trace_id, get_current_trace
-from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolParam
 from openai.types.responses import ResponseFunctionToolCall
 
-from .openai_utils import OpenAIChatCompletionParams
+from .openai_utils import OpenAIChatCompletionParams, OpenAIClientRegistry
 from .print_utils import PrintUtils
 
 logger = logging.getLogger(__name__)
@@ -129,11 +128,8 @@ class AgentsUtils:
         api_key = api_key or os.getenv("UTU_LLM_API_KEY")
         if not api_key or not base_url:
             raise ValueError("UTU_LLM_API_KEY and UTU_LLM_BASE_URL must be set")
-        openai_client = AsyncOpenAI(
-            api_key=api_key,
-            base_url=base_url,
-            timeout=100,
-        )
+        # shared by all agent models talking to the same endpoint, see `OpenAIClientRegistry`
+        openai_client = OpenAIClientRegistry.get_client(base_url=base_url, api_key=api_key, type=type, timeout=100)
         if type == "chat.completions":
             return OpenAIChatCompletionsModel(model=model, openai_client=openai_client)
         elif type == "responses":
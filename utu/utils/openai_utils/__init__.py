@@ -1,5 +1,13 @@
+from .client_registry import HTTPPoolConfig, OpenAIClientRegistry
 from .openai_utils import OpenAIUtils
 from .simplified_client import SimplifiedAsyncOpenAI
 from .types import OpenAIChatCompletionParams, OpenAIResponsesParams
 
-__all__ = ["OpenAIUtils", "SimplifiedAsyncOpenAI", "OpenAIChatCompletionParams", "OpenAIResponsesParams"]
+__all__ = [
+    "OpenAIUtils",
+    "SimplifiedAsyncOpenAI",
+    "OpenAIClientRegistry",
+    "HTTPPoolConfig",
+    "OpenAIChatCompletionParams",
+    "OpenAIResponsesParams",
+]
@@ -0,0 +1,218 @@
+import asyncio
+import os
+import threading
+import weakref
+from dataclasses import dataclass, field
+
+import httpx
+from openai import DEFAULT_CONNECTION_LIMITS, AsyncOpenAI
+
+from ..log import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class HTTPPoolConfig:
+    """Connection pool config of the shared http clients. Defaults can be overridden by env vars (read when the first
+    client is created, after `.env` is loaded). The connection limits default to the ones of the openai SDK, since one
+    pool serves all the clients of an endpoint (e.g. rollout agents and judges)."""
+
+    max_connections: int = field(
+        default_factory=lambda: int(
+            os.getenv("UTU_LLM_MAX_CONNECTIONS", str(DEFAULT_CONNECTION_LIMITS.max_connections))
+        )
+    )
+    """Max number of concurrent connections per endpoint"""
+    max_keepalive_connections: int = field(
+        default_factory=lambda: int(
+            os.getenv("UTU_LLM_MAX_KEEPALIVE_CONNECTIONS", str(DEFAULT_CONNECTION_LIMITS.max_keepalive_connections))
+        )
+    )
+    """Max number of idle connections kept alive per endpoint"""
+    keepalive_expiry: float = field(default_factory=lambda: float(os.getenv("UTU_LLM_KEEPALIVE_EXPIRY", "30")))
+    """Seconds before an idle connection is closed"""
+    http2: bool = field(default_factory=lambda: os.getenv("UTU_LLM_HTTP2", "false").lower() in ("1", "true"))
+    """Whether to enable HTTP/2, requires `h2` to be installed"""
+    timeout: float = field(default_factory=lambda: float(os.getenv("UTU_LLM_TIMEOUT", "600")))
+    """Default request timeout in seconds"""
+
+
+class _InflightStream(httpx.AsyncByteStream):
+    """Response stream that decreases the in-flight gauge once the response is consumed or closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close) -> None:
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._on_close()
+        await self._stream.aclose()
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Pooled transport shared by all clients of one endpoint.
+
+    Connections are bound to the event loop they are opened in, so one inner pool is kept per running loop (e.g.
+    separate `asyncio.run` calls in scripts and tests do not reuse dead connections).
+    """
+
+    def __init__(self, endpoint: str, config: HTTPPoolConfig) -> None:
+        self.endpoint = endpoint
+        self.config = config
+        self._transports: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _get_transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(
+                http2=self.config.http2,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry,
+                ),
+            )
+            self._transports[loop] = transport
+        return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        OpenAIClientRegistry._inc_inflight(self.endpoint)
+        try:
+            response = await self._get_transport().handle_async_request(request)
+        except BaseException:
+            OpenAIClientRegistry._dec_inflight(self.endpoint)
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_InflightStream(response.stream, lambda: OpenAIClientRegistry._dec_inflight(self.endpoint)),
+            extensions=response.extensions,
+        )
+
+    async def close_pool(self) -> None:
+        """Close the pooled connections opened in the current event loop."""
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+class _SharedAsyncClient(httpx.AsyncClient):
+    async def aclose(self) -> None:
+        # shared by multiple clients, keep it open when one of them is closed
+        pass
+
+
+class OpenAIClientRegistry:
+    """Process-wide registry of pooled http clients for OpenAI-compatible endpoints.
+
+    Clients of the same (base_url, api_key, type) share one connection pool, so that toolkits, judges and agent
+    models talking to the same endpoint reuse connections instead of each opening its own pool.
+
+    Usage:
+        OpenAIClientRegistry.configure(max_connections=2000)  # optional, before creating clients
+        http_client = OpenAIClientRegistry.get_http_client(base_url, api_key, type)
+        client = OpenAIClientRegistry.get_client(base_url, api_key, type)  # a shared AsyncOpenAI
+        OpenAIClientRegistry.get_inflight()  # {base_url: number of in-flight requests}
+    """
+
+    _config: HTTPPoolConfig | None = None
+    _lock = threading.Lock()
+    _http_clients: dict[tuple, httpx.AsyncClient] = {}
+    _clients: dict[tuple, AsyncOpenAI] = {}
+    _inflight: dict[str, int] = {}
+    _peak_inflight: dict[str, int] = {}
+
+    @classmethod
+    def configure(cls, **kwargs) -> None:
+        """Update the pool config (see `HTTPPoolConfig`). Only affects clients created afterwards."""
+        config = cls._get_config()
+        for k, v in kwargs.items():
+            if not hasattr(config, k):
+                raise ValueError(f"Unknown pool config: {k}")
+            setattr(config, k, v)
+
+    @classmethod
+    def get_http_client(cls, base_url: str, api_key: str, type: str = "chat.completions") -> httpx.AsyncClient:
+        """Get the shared http client of an endpoint, to be passed to `AsyncOpenAI(http_client=...)`."""
+        key = (str(base_url).rstrip("/"), api_key, type)
+        with cls._lock:
+            if key not in cls._http_clients:
+                config = HTTPPoolConfig(**cls._get_config().__dict__)
+                if config.http2 and not cls._check_http2():
+                    logger.warning("HTTP/2 requires `h2`, install it by `uv pip install httpx[http2]`. Using HTTP/1.1.")
+                    config.http2 = False
+                cls._http_clients[key] = _SharedAsyncClient(
+                    transport=_SharedTransport(key[0], config),
+                    timeout=httpx.Timeout(config.timeout, connect=10.0),
+                    follow_redirects=True,
+                )
+            return cls._http_clients[key]
+
+    @classmethod
+    def get_client(
+        cls, base_url: str, api_key: str, type: str = "chat.completions", timeout: float | None = None
+    ) -> AsyncOpenAI:
+        """Get a shared AsyncOpenAI client of an endpoint."""
+        key = (str(base_url).rstrip("/"), api_key, type, timeout)
+        with cls._lock:
+            client = cls._clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=timeout if timeout is not None else cls._get_config().timeout,
+                http_client=cls.get_http_client(base_url, api_key, type),
+            )
+            with cls._lock:
+                client = cls._clients.setdefault(key, client)
+        return client
+
+    @classmethod
+    def get_inflight(cls) -> dict[str, int]:
+        """Number of in-flight requests per endpoint (base_url)."""
+        return dict(cls._inflight)
+
+    @classmethod
+    def get_peak_inflight(cls) -> dict[str, int]:
+        """Max number of concurrent in-flight requests per endpoint (base_url) since start."""
+        return dict(cls._peak_inflight)
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close the pooled connections opened in the current event loop."""
+        for http_client in list(cls._http_clients.values()):
+            await http_client._transport.close_pool()
+
+    @classmethod
+    def _get_config(cls) -> HTTPPoolConfig:
+        if cls._config is None:
+            cls._config = HTTPPoolConfig()
+        return cls._config
+
+    @classmethod
+    def _inc_inflight(cls, endpoint: str) -> None:
+        cls._inflight[endpoint] = cls._inflight.get(endpoint, 0) + 1
+        cls._peak_inflight[endpoint] = max(cls._peak_inflight.get(endpoint, 0), cls._inflight[endpoint])
+
+    @classmethod
+    def _dec_inflight(cls, endpoint: str) -> None:
+        cls._inflight[endpoint] = cls._inflight.get(endpoint, 1) - 1
+
+    @staticmethod
+    def _check_http2() -> bool:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            return False
+        return True
@@ -6,6 +6,7 @@ from openai import AsyncOpenAI, AsyncStream
 from openai.types.chat import ChatCompletion, ChatCompletionChunk
 from openai.types.responses import Response, ResponseStreamEvent
 
+from .client_registry import OpenAIClientRegistry
 from .types import (
     OpenAIChatCompletionParams,
     OpenAIChatCompletionParamsKeys,
@@ -30,10 +31,13 @@ class SimplifiedAsyncOpenAI(AsyncOpenAI):
         **kwargs: dict,
     ) -> None:
         logger.info(f"> type: {type}, base_url: {base_url}, kwargs: {kwargs}")
-        super().__init__(
-            api_key=api_key or os.getenv("UTU_LLM_API_KEY") or "xxx", base_url=base_url or os.getenv("UTU_LLM_BASE_URL")
-        )
-        self.type = type or os.getenv("UTU_LLM_TYPE", "chat.completions")
+        api_key = api_key or os.getenv("UTU_LLM_API_KEY") or "xxx"
+        base_url = base_url or os.getenv("UTU_LLM_BASE_URL")
+        type = type or os.getenv("UTU_LLM_TYPE", "chat.completions")
+        # share the connection pool with other clients of the same endpoint
+        http_client = OpenAIClientRegistry.get_http_client(base_url=base_url, api_key=api_key, type=type)
+        super().__init__(api_key=api_key, base_url=base_url, http_client=http_client)
+        self.type = type
         self.type_create_params = (
             OpenAIChatCompletionParamsKeys if self.type == "chat.completions" else OpenAIResponsesParamsKeys
         )
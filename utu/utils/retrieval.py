@@ -0,0 +1,93 @@
+import math
+import re
+from collections import Counter
+
+# words, or single CJK characters (no whitespace between CJK words)
+TOKEN_PATTERN = re.compile(r"[一-鿿぀-ヿ가-힯]|[^\W_]+", re.UNICODE)
+
+
+class RetrievalUtils:
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        return TOKEN_PATTERN.findall(text.lower())
+
+    @staticmethod
+    def split_text(text: str, chunk_size: int = 2_000) -> list[str]:
+        """Split text into chunks of at most `chunk_size` chars, at paragraph (then line) boundaries when possible.
+        Joining the chunks with "\\n\\n" gives back the text, except for the split points of oversized paragraphs."""
+        chunks: list[str] = []
+        current: list[str] = []
+        current_size = 0
+        for paragraph in text.split("\n\n"):
+            pieces = [paragraph] if len(paragraph) <= chunk_size else RetrievalUtils._split_long(paragraph, chunk_size)
+            for piece in pieces:
+                if current and current_size + len(piece) + 2 > chunk_size:
+                    chunks.append("\n\n".join(current))
+                    current, current_size = [], 0
+                current.append(piece)
+                current_size += len(piece) + 2
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+
+    @staticmethod
+    def _split_long(paragraph: str, chunk_size: int) -> list[str]:
+        pieces, current = [], ""
+        for line in paragraph.split("\n"):
+            while len(line) > chunk_size:
+                if current:
+                    pieces.append(current)
+                    current = ""
+                pieces.append(line[:chunk_size])
+                line = line[chunk_size:]
+            if current and len(current) + len(line) + 1 > chunk_size:
+                pieces.append(current)
+                current = line
+            else:
+                current = f"{current}\n{line}" if current else line
+        if current:
+            pieces.append(current)
+        return pieces
+
+
+class BM25Index:
+    """Okapi BM25 over a list of documents, e.g. chunks of a long text."""
+
+    def __init__(self, documents: list[str], k1: float = 1.5, b: float = 0.75) -> None:
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        self.term_freqs: list[Counter] = [Counter(RetrievalUtils.tokenize(doc)) for doc in documents]
+        self.doc_lens = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_doc_len = sum(self.doc_lens) / len(documents) if documents else 0.0
+        doc_freqs = Counter(term for tf in self.term_freqs for term in tf)
+        n = len(documents)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freqs.items()}
+
+    def get_scores(self, query: str) -> list[float]:
+        terms = [t for t in set(RetrievalUtils.tokenize(query)) if t in self.idf]
+        scores = []
+        for tf, doc_len in zip(self.term_freqs, self.doc_lens, strict=True):
+            norm = self.k1 * (1 - self.b + self.b * doc_len / self.avg_doc_len) if self.avg_doc_len else self.k1
+            score = 0.0
+            for term in terms:
+                if freq := tf.get(term):
+                    score += self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            scores.append(score)
+        return scores
+
+    def search(self, query: str, top_k: int = 5) -> list[int]:
+        """Indexes of the `top_k` most relevant documents, best first. Documents without any query term are skipped."""
+        scores = self.get_scores(query)
+        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        return [i for i in ranked[:top_k] if scores[i] > 0]
+
+    def select(self, query: str, max_chars: int) -> list[int]:
+        """Indexes of the most relevant documents fitting in `max_chars`, in their original order."""
+        selected, total = [], 0
+        for i in self.search(query, top_k=len(self.documents)):
+            if total + len(self.documents[i]) > max_chars:
+                continue
+            selected.append(i)
+            total += len(self.documents[i])
+        return sorted(selected)
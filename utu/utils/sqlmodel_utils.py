@@ -47,7 +47,8 @@ class SQLModelUtils:
     @staticmethod
     def _init_db_schema(engine):
         """
-        Import all SQLModel table definitions and create tables if they do not exist.
+        Import all SQLModel table definitions, create tables if they do not exist, then apply pending migrations
+        (e.g. indexes on existing tables), see `utu.db.migrations`.
         """
         # Import models so SQLModel knows about all tables
         try:
@@ -64,3 +65,12 @@ class SQLModelUtils:
             logger.info("Database schema ensured (tables created if missing).")
         except Exception as e:
             logger.warning(f"SQLModel metadata create_all failed: {e}")
+
+        # Apply schema migrations
+        try:
+            from utu.db.migrations import migrate
+
+            version = migrate(engine)
+            logger.info(f"Database schema migrated to version {version}.")
+        except Exception as e:
+            logger.warning(f"Database schema migration failed: {e}")
@@ -1,6 +1,12 @@
+import functools
+
 import tiktoken
 
-_tokenizer = tiktoken.get_encoding("cl100k_base")
+
+@functools.cache
+def _get_tokenizer() -> tiktoken.Encoding:
+    # loading the encoding is slow, do it on first use
+    return tiktoken.get_encoding("cl100k_base")
 
 
 class TokenUtils:
@@ -9,13 +15,34 @@ class TokenUtils:
         """Truncate text to a given token limit with tiktoken."""
         if limit <= 0 or not text:
             return text
-        tokens = _tokenizer.encode(text)
+        tokens = _get_tokenizer().encode(text)
         if len(tokens) <= limit:
             return text
         truncated_tokens = tokens[:limit]
-        truncated_text = _tokenizer.decode(truncated_tokens)
+        truncated_text = _get_tokenizer().decode(truncated_tokens)
         return truncated_text + "..."
 
     @staticmethod
     def count_tokens(text: str) -> int:
-        return len(_tokenizer.encode(text))
+        return len(_get_tokenizer().encode(text))
+
+    @staticmethod
+    def split_text_by_token(text: str, chunk_tokens: int) -> list[str]:
+        """Split text into chunks of about `chunk_tokens` tokens, at paragraph boundaries when possible."""
+        tokenizer = _get_tokenizer()
+        chunks, current, current_tokens = [], [], 0
+        for paragraph in text.split("\n\n"):
+            tokens = tokenizer.encode(paragraph)
+            if len(tokens) > chunk_tokens:  # oversized paragraph, split by tokens
+                pieces = [tokens[i : i + chunk_tokens] for i in range(0, len(tokens), chunk_tokens)]
+            else:
+                pieces = [tokens]
+            for piece in pieces:
+                if current and current_tokens + len(piece) > chunk_tokens:
+                    chunks.append("\n\n".join(current))
+                    current, current_tokens = [], 0
+                current.append(paragraph if piece is tokens else tokenizer.decode(piece))
+                current_tokens += len(piece)
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks